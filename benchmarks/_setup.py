@@ -0,0 +1,20 @@
+""" Makes the library and the test settings importable when a benchmark is run from a source checkout:
+
+    python -m benchmarks.<benchmark_module>
+"""
+import os
+import sys
+
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    src_dir = os.path.join(repo_dir, 'src')
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+    if repo_dir not in sys.path:
+        sys.path.insert(0, repo_dir)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+    import django
+    django.setup()
@@ -0,0 +1,73 @@
+""" Reports the memory retained by the view class decoration data structures of a synthetic hierarchy of 5,000
+decorated view classes. The hierarchy consists of 250 branches of 20 classes. Every branch starts from a common
+decorated base class and each class of a branch inherits from the previous one and adds a decorator to the ones it
+has inherited.
+
+The memory allocated by this library is measured with tracemalloc (the allocations of the view classes themselves
+are excluded).
+
+    python -m benchmarks.bench_accumulated_decorators_memory
+"""
+from __future__ import print_function
+
+import functools
+import gc
+import os
+import tracemalloc
+
+from ._setup import setup_django
+
+
+NUM_BRANCHES = 250
+BRANCH_DEPTH = 20
+NUM_BASE_DECORATORS = 5
+
+
+def pass_through_decorator(wrapped):
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+def create_hierarchy():
+    from django.views.generic import View
+    from django_universal_view_decorator import universal_view_decorator
+
+    base = universal_view_decorator(*[pass_through_decorator] * NUM_BASE_DECORATORS)(type('Base', (View,), {}))
+    view_classes = []
+    for branch in range(NUM_BRANCHES):
+        view_class = base
+        for level in range(BRANCH_DEPTH):
+            view_class = type('View{}_{}'.format(branch, level), (view_class,), {})
+            view_class = universal_view_decorator(pass_through_decorator)(view_class)
+            view_classes.append(view_class)
+    return view_classes
+
+
+def main():
+    setup_django()
+    import django_universal_view_decorator
+
+    library_dir = os.path.dirname(django_universal_view_decorator.__file__)
+    gc.collect()
+    tracemalloc.start()
+    view_classes = create_hierarchy()
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(True, os.path.join(library_dir, '*'))])
+    statistics = snapshot.statistics('lineno')
+    total = sum(statistic.size for statistic in statistics)
+    print('{:,} decorated view classes: {:,} bytes retained by {} ({:,.0f} bytes per class)'.format(
+        len(view_classes), total, django_universal_view_decorator.__name__, total / len(view_classes)))
+    print('\nTop allocations:')
+    for statistic in statistics[:8]:
+        frame = statistic.traceback[0]
+        print('{:>12,} bytes {:>8,} blocks  {}:{}'.format(
+            statistic.size, statistic.count, os.path.relpath(frame.filename, library_dir), frame.lineno))
+
+
+if __name__ == '__main__':
+    main()
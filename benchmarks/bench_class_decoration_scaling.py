@@ -0,0 +1,81 @@
+""" Measures how the time of decorating a view class depends on the depth of its decorated view class hierarchy.
+Each view class in the hierarchy inherits from the previous one and it is decorated with:
+
+- a decorator that has a unique `duplicate_id`
+- a decorator that has a `duplicate_id` shared by all levels so a duplicate is resolved at every level
+- a decorator without `duplicate_id`
+
+Prints the total time of creating the whole hierarchy and the time of decorating the deepest class. With `--lazy`
+the view classes are decorated with `UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=True` and the time of the first
+`as_view()` call (that resolves the decorations of the whole hierarchy) is printed too.
+
+    python -m benchmarks.bench_class_decoration_scaling
+    python -m benchmarks.bench_class_decoration_scaling --lazy
+"""
+from __future__ import print_function
+
+import argparse
+import functools
+import time
+
+from ._setup import setup_django
+
+
+DEPTHS = (10, 20, 40, 60, 80, 100)
+
+
+def pass_through_decorator(wrapped):
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+def create_hierarchy(depth):
+    from django.views.generic import View
+    from django_universal_view_decorator import universal_view_decorator
+
+    view_class = View
+    last_decoration_time = None
+    for level in range(depth):
+        view_class = type('View{}'.format(level), (view_class,), {})
+        decorate = universal_view_decorator(pass_through_decorator, duplicate_id='level-{}'.format(level))
+        decorate_shared = universal_view_decorator(pass_through_decorator, duplicate_id='shared')
+        decorate_plain = universal_view_decorator(pass_through_decorator)
+        start = time.perf_counter()
+        view_class = decorate(decorate_shared(decorate_plain(view_class)))
+        last_decoration_time = time.perf_counter() - start
+    return view_class, last_decoration_time
+
+
+def main(args=None, repeat=5):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--lazy', action='store_true',
+                        help='decorate with UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=True')
+    options = parser.parse_args(args)
+    setup_django()
+
+    from django.test import override_settings
+
+    for depth in DEPTHS:
+        best_total = best_last = best_first_as_view = None
+        for _ in range(repeat):
+            with override_settings(UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=options.lazy):
+                start = time.perf_counter()
+                view_class, last_decoration_time = create_hierarchy(depth)
+                total = time.perf_counter() - start
+            start = time.perf_counter()
+            view_class.as_view()
+            first_as_view = time.perf_counter() - start
+            best_total = total if best_total is None else min(best_total, total)
+            best_last = last_decoration_time if best_last is None else min(best_last, last_decoration_time)
+            best_first_as_view = first_as_view if best_first_as_view is None else min(best_first_as_view,
+                                                                                       first_as_view)
+        print('depth {:>3}: hierarchy {:>8.2f} ms, deepest class {:>7.1f} us, first as_view() {:>8.2f} ms '
+              '({} accumulated decorators)'.format(depth, best_total * 1000, best_last * 1000000,
+                                                   best_first_as_view * 1000,
+                                                   len(view_class._view_class_decorator_chain)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+""" Compares the generic wrappers with the wrappers generated when the `UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS`
+setting is True. Measures calls per second of a decorated view function and a decorated view class method with
+1 and 4 stacked `ViewDecoratorBase` decorators. The views receive only the request: wrappers are generated only for
+these views.
+
+    python -m benchmarks.bench_compiled_wrappers
+"""
+from __future__ import print_function
+
+import timeit
+
+from ._setup import setup_django
+
+
+def create_views(num_decorators):
+    from django.views.generic import View
+    from django_universal_view_decorator import ViewDecoratorBase
+
+    class PassThroughDecorator(ViewDecoratorBase):
+        pass
+
+    def decorate(view):
+        for _ in range(num_decorators):
+            view = PassThroughDecorator.universal_decorator(view)
+        return view
+
+    @decorate
+    def view_function(request):
+        return request
+
+    class ViewClass(View):
+        @decorate
+        def get(self, request):
+            return request
+
+    return view_function, ViewClass()
+
+
+def main(number=200000, repeat=5):
+    setup_django()
+
+    from django.test import override_settings
+
+    for num_decorators in (1, 4):
+        for compile_wrappers in (False, True):
+            with override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=compile_wrappers):
+                view_function, view_class_instance = create_views(num_decorators)
+            statements = [
+                ('view function', 'view_function("request")'),
+                ('view class method', 'view_class_instance.get("request")'),
+            ]
+            for name, statement in statements:
+                namespace = dict(view_function=view_function, view_class_instance=view_class_instance)
+                best = min(timeit.repeat(statement, globals=namespace, number=number, repeat=repeat))
+                print('{} decorator(s) {:<18} {:<9} {:>12,.0f} per second'.format(
+                    num_decorators, name, 'compiled' if compile_wrappers else 'generic', number / best))
+
+
+if __name__ == '__main__':
+    main()
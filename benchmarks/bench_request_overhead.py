@@ -0,0 +1,299 @@
+""" Measures the per-request overhead of the decoration techniques of this library and compares them with the
+techniques provided by django.
+
+Every benchmark calls a decorated view with the same request object. The views return a prebuilt response and the
+decorators are pass-through decorators so the results show the cost of the decoration machinery. Decorated view
+functions (FBVs), view classes (CBVs called through the view function returned by their `as_view()`) and decorated
+view class methods are measured with 1-16 decorators:
+
+- `universal_view_decorator`: a single `@universal_view_decorator(*decorators)` with all decorators
+- `universal_view_decorator_with_args`: stacked decorators created by a `universal_view_decorator_with_args`
+- `view_decorator_base`: stacked `ViewDecoratorBase` subclass decorators
+- `django_urlconf`: the view (or the return value of `as_view()`) decorated the way you would do it in a URLconf
+- `django_method_decorator`: view class methods decorated with django's `@method_decorator`
+
+For each benchmark the results contain the number of calls per second (best of `--repeat` runs) and the peak of the
+memory allocated by a call (measured with tracemalloc, not measured before python 3.4). The results can be written
+to a JSON file and compared with the JSON file of an earlier run. The exit code is 1 if a benchmark got slower (or
+allocates more) than the baseline by more than the tolerance.
+
+    python -m benchmarks.bench_request_overhead --output results.json
+    python -m benchmarks.bench_request_overhead --baseline results.json
+"""
+from __future__ import print_function
+
+import argparse
+import functools
+import json
+import platform
+import sys
+import time
+import timeit
+
+from ._setup import setup_django
+
+
+DEPTHS = (1, 2, 4, 8, 16)
+
+
+# Decorators
+
+
+def pass_through_decorator(wrapped):
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+def pass_through_decorator_with_args(arg):
+    return pass_through_decorator
+
+
+def create_view_decorator_base_subclass():
+    from django_universal_view_decorator import ViewDecoratorBase
+
+    class PassThroughViewDecorator(ViewDecoratorBase):
+        pass
+    return PassThroughViewDecorator
+
+
+def get_latency_budgets(latency_budget):
+    from django_universal_view_decorator.five import full_qualname
+
+    if latency_budget is None:
+        return None
+    return {full_qualname(pass_through_decorator): latency_budget,
+            full_qualname(create_view_decorator_base_subclass()): latency_budget}
+
+
+# Benchmarks
+
+
+class Benchmark(object):
+    def __init__(self, view_type, technique, depth, view):
+        super(Benchmark, self).__init__()
+        self.view_type = view_type
+        self.technique = technique
+        self.depth = depth
+        self.view = view
+
+    @property
+    def name(self):
+        return '{}/{}/{}'.format(self.view_type, self.technique, self.depth)
+
+
+def create_benchmarks(depths, response):
+    from django.utils.decorators import method_decorator
+    from django.views.generic import View
+    from django_universal_view_decorator import universal_view_decorator, universal_view_decorator_with_args
+
+    PassThroughViewDecorator = create_view_decorator_base_subclass()
+
+    def stack(decorator_factory, depth):
+        def decorate(view):
+            for i in range(depth):
+                view = decorator_factory(i)(view)
+            return view
+        return decorate
+
+    # Each technique is a function that receives the depth and returns a decorator that can be applied to the
+    # decorated object (view function, view class or view class method).
+    techniques = [
+        ('universal_view_decorator', lambda depth: universal_view_decorator(*[pass_through_decorator] * depth)),
+        ('universal_view_decorator_with_args', lambda depth: stack(
+            universal_view_decorator_with_args(pass_through_decorator_with_args), depth)),
+        ('view_decorator_base', lambda depth: stack(
+            lambda i: PassThroughViewDecorator.universal_decorator, depth)),
+    ]
+
+    def view_function(request):
+        return response
+
+    def create_view_class(method_decorator=None):
+        method_decorator = method_decorator or (lambda method: method)
+
+        class ViewClass(View):
+            @method_decorator
+            def get(self, request):
+                return response
+        return ViewClass
+
+    benchmarks = [
+        Benchmark('fbv', 'undecorated', 0, view_function),
+        Benchmark('cbv', 'undecorated', 0, create_view_class().as_view()),
+    ]
+    for depth in depths:
+        for technique, create_decorator in techniques:
+            benchmarks += [
+                Benchmark('fbv', technique, depth, create_decorator(depth)(view_function)),
+                Benchmark('cbv', technique, depth, create_decorator(depth)(create_view_class()).as_view()),
+                Benchmark('cbv_method', technique, depth, create_view_class(create_decorator(depth)).as_view()),
+            ]
+        django_urlconf = stack(lambda i: pass_through_decorator, depth)
+        benchmarks += [
+            Benchmark('fbv', 'django_urlconf', depth, django_urlconf(view_function)),
+            Benchmark('cbv', 'django_urlconf', depth, django_urlconf(create_view_class().as_view())),
+            Benchmark('cbv_method', 'django_method_decorator', depth, create_view_class(
+                stack(lambda i: method_decorator(pass_through_decorator), depth)).as_view()),
+        ]
+    return benchmarks
+
+
+def measure_calls_per_second(view, request, number, repeat):
+    best = min(timeit.repeat(functools.partial(view, request), number=number, repeat=repeat))
+    return number / best
+
+
+def measure_peak_bytes_per_call(view, request, samples=5):
+    """ Returns the smallest peak of the memory allocated by a call during `samples` calls or None if tracemalloc isn't
+    available (python<3.4). The first call isn't measured because it may initialize caches. """
+    try:
+        import tracemalloc
+    except ImportError:
+        return None
+    view(request)
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(samples):
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            else:
+                # python<3.9: clearing the traces resets the peak too
+                tracemalloc.clear_traces()
+            before, _ = tracemalloc.get_traced_memory()
+            view(request)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        return min(peaks)
+    finally:
+        tracemalloc.stop()
+
+
+def run(benchmarks, request, number, repeat):
+    results = []
+    for benchmark in benchmarks:
+        result = dict(
+            name=benchmark.name,
+            view_type=benchmark.view_type,
+            technique=benchmark.technique,
+            depth=benchmark.depth,
+            calls_per_second=measure_calls_per_second(benchmark.view, request, number, repeat),
+            peak_bytes_per_call=measure_peak_bytes_per_call(benchmark.view, request),
+        )
+        print('{:<52} {:>12,.0f} calls/s {:>8} bytes/call'.format(
+            result['name'], result['calls_per_second'], format_bytes(result['peak_bytes_per_call'])))
+        results.append(result)
+    return results
+
+
+def format_bytes(num_bytes, sign=''):
+    return '?' if num_bytes is None else '{:{},}'.format(num_bytes, sign)
+
+
+def get_environment_info():
+    import django
+    import django_universal_view_decorator
+    return dict(
+        python=platform.python_version(),
+        python_implementation=platform.python_implementation(),
+        django=django.get_version(),
+        django_universal_view_decorator=django_universal_view_decorator.__version__,
+        platform=platform.platform(),
+        date=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    )
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """ Prints the change relative to the baseline and returns the names of the benchmarks that have regressed. """
+    baseline_results = dict((result['name'], result) for result in baseline['results'])
+    regressions = []
+    print('\nComparison with baseline ({}, tolerance {:.0%}):'.format(baseline['environment'].get('date'), tolerance))
+    for result in results:
+        baseline_result = baseline_results.get(result['name'])
+        if baseline_result is None:
+            continue
+        speed = result['calls_per_second'] / baseline_result['calls_per_second'] - 1
+        memory = None
+        if result['peak_bytes_per_call'] is not None and baseline_result['peak_bytes_per_call'] is not None:
+            memory = result['peak_bytes_per_call'] - baseline_result['peak_bytes_per_call']
+        regressed = speed < -tolerance or (memory is not None and
+                                           memory > baseline_result['peak_bytes_per_call'] * tolerance)
+        if regressed:
+            regressions.append(result['name'])
+        print('{:<52} {:>+8.1%} calls/s {:>8} bytes/call{}'.format(
+            result['name'], speed, format_bytes(memory, '+'), '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--depths', type=lambda value: tuple(int(depth) for depth in value.split(',')),
+                        default=DEPTHS, help='comma separated list of decorator counts (default: %(default)s)')
+    parser.add_argument('--filter', default='', help='run only the benchmarks that contain this string in their name')
+    parser.add_argument('--number', type=int, default=20000, help='number of calls per timing run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timing runs')
+    parser.add_argument('--compile-wrappers', action='store_true',
+                        help='decorate the views with UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=True')
+    parser.add_argument('--compose-view-method-chains-once', action='store_true',
+                        help='decorate the views with UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True')
+    parser.add_argument('--instrumentation', action='store_true',
+                        help='decorate the views with UNIVERSAL_VIEW_DECORATOR_INSTRUMENTATION=True and a '
+                             'HistogramSink')
+    parser.add_argument('--trace-sample-rate', type=int,
+                        help='decorate the views with this UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE')
+    parser.add_argument('--latency-budget', type=float,
+                        help='decorate the views with this UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGETS value (in seconds) '
+                             'for the pass-through decorators')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file written by an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='relative slowdown or allocation growth reported as regression (default: %(default)s)')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    options = parse_args(args)
+    setup_django()
+
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from django_universal_view_decorator.instrumentation import HistogramSink, add_sink
+
+    if options.instrumentation:
+        add_sink(HistogramSink())
+    with override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=options.compile_wrappers,
+                           UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=(
+                               options.compose_view_method_chains_once),
+                           UNIVERSAL_VIEW_DECORATOR_INSTRUMENTATION=options.instrumentation,
+                           UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE=options.trace_sample_rate,
+                           UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGETS=get_latency_budgets(options.latency_budget)):
+        benchmarks = create_benchmarks(options.depths, HttpResponse())
+    benchmarks = [benchmark for benchmark in benchmarks if options.filter in benchmark.name]
+
+    results = run(benchmarks, RequestFactory().get('/'), options.number, options.repeat)
+    output = dict(environment=get_environment_info(), options=dict(compile_wrappers=options.compile_wrappers,
+                                                                    compose_view_method_chains_once=(
+                                                                        options.compose_view_method_chains_once),
+                                                                    instrumentation=options.instrumentation,
+                                                                    trace_sample_rate=options.trace_sample_rate,
+                                                                    latency_budget=options.latency_budget),
+                  results=results)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, options.tolerance)
+        if regressions:
+            print('\n{} benchmark(s) regressed'.format(len(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
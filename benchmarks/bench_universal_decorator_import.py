@@ -0,0 +1,70 @@
+""" Simulates the import of view modules that decorate their views with `ViewDecoratorBase.universal_decorator`.
+Every simulated module accesses the `universal_decorator` of the same few decorator classes many times like a large
+project does at startup. Prints the time it takes to import all the modules.
+
+    python -m benchmarks.bench_universal_decorator_import
+"""
+from __future__ import print_function
+
+import timeit
+
+from ._setup import setup_django
+
+
+VIEW_MODULE_SOURCE = """
+@NoArgDecorator.universal_decorator
+def view_0(request):
+    pass
+
+@OptionalArgDecorator.universal_decorator
+def view_1(request):
+    pass
+
+@OptionalArgDecorator.universal_decorator(arg=1)
+def view_2(request):
+    pass
+
+@RequiredArgDecorator.universal_decorator(1)
+def view_3(request):
+    pass
+
+class ViewClass(View):
+    @RequiredArgDecorator.universal_decorator(1)
+    @OptionalArgDecorator.universal_decorator
+    def get(self, request):
+        pass
+"""
+
+
+def main(num_modules=500, repeat=5):
+    setup_django()
+
+    from django.views.generic import View
+    from django_universal_view_decorator import ViewDecoratorBase
+
+    class NoArgDecorator(ViewDecoratorBase):
+        pass
+
+    class OptionalArgDecorator(ViewDecoratorBase):
+        def __init__(self, arg=None):
+            super(OptionalArgDecorator, self).__init__()
+
+    class RequiredArgDecorator(ViewDecoratorBase):
+        def __init__(self, arg, arg2=None):
+            super(RequiredArgDecorator, self).__init__()
+
+    code = compile(VIEW_MODULE_SOURCE, '<view_module>', 'exec')
+    module_globals = dict(View=View, NoArgDecorator=NoArgDecorator, OptionalArgDecorator=OptionalArgDecorator,
+                          RequiredArgDecorator=RequiredArgDecorator)
+
+    def import_modules():
+        for _ in range(num_modules):
+            exec(code, dict(module_globals))
+
+    best = min(timeit.repeat(import_modules, number=1, repeat=repeat))
+    print('importing {} view modules: {:.1f} ms ({:.1f} us per module)'.format(
+        num_modules, best * 1000, best * 1000000 / num_modules))
+
+
+if __name__ == '__main__':
+    main()
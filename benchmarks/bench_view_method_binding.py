@@ -0,0 +1,44 @@
+""" Measures how fast a view method decorated with a `ViewDecoratorBase` subclass can be looked up on a view class
+instance (`self.get`) and how fast it can be called through the looked up bound method.
+
+    python -m benchmarks.bench_view_method_binding
+"""
+from __future__ import print_function
+
+import timeit
+
+from ._setup import setup_django
+
+
+def main(number=200000, repeat=5):
+    setup_django()
+
+    from django.views.generic import View
+    from django_universal_view_decorator import ViewDecoratorBase
+
+    class PassThroughDecorator(ViewDecoratorBase):
+        pass
+
+    class ViewClass(View):
+        @PassThroughDecorator.universal_decorator
+        def get(self, request, *args, **kwargs):
+            return request
+
+        def undecorated_get(self, request, *args, **kwargs):
+            return request
+
+    view_class_instance = ViewClass()
+    statements = [
+        ('undecorated lookup', 'view_class_instance.undecorated_get'),
+        ('undecorated lookup+call', 'view_class_instance.undecorated_get("request")'),
+        ('decorated lookup', 'view_class_instance.get'),
+        ('decorated lookup+call', 'view_class_instance.get("request")'),
+    ]
+    for name, statement in statements:
+        best = min(timeit.repeat(statement, globals=dict(view_class_instance=view_class_instance),
+                                 number=number, repeat=repeat))
+        print('{:<26} {:>12,.0f} per second'.format(name, number / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class UniversalViewDecoratorConfig(AppConfig):
+    """ Add `'django_universal_view_decorator.apps.UniversalViewDecoratorConfig'` to your `INSTALLED_APPS` and set
+    `UNIVERSAL_VIEW_DECORATOR_WARM_UP = True` if you want the decorated views to be warmed up at startup. """
+    name = 'django_universal_view_decorator'
+    verbose_name = 'Django universal view decorator'
+
+    def ready(self):
+        from .warm_up import warm_up_if_enabled
+        warm_up_if_enabled()
@@ -0,0 +1,64 @@
+from django.conf import settings
+
+
+# When True the wrappers of decorated view functions and view class methods are generated with the exact parameter
+# list of the decorated view (if the view receives only the request) at decoration time. This way calling them doesn't
+# pack the positional args into a tuple and the keyword args into a dict at the entry point.
+# Views are decorated when their modules are imported so changing this setting has no effect on already decorated
+# views.
+COMPILE_WRAPPERS = 'UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS'
+
+# When True the decorator chain of `universal_view_decorator` applied to a view class method is composed only once
+# around a trampoline that calls the bound method of the current request (passed in a context variable) instead of
+# being composed around the bound method for every request. The wrapped decorators receive the trampoline instead of a
+# bound method so it works only with decorators that call the view function in the context of the request (not on
+# another thread). The setting is checked when the method is decorated. The chains of view functions are always
+# composed only once.
+COMPOSE_VIEW_METHOD_CHAINS_ONCE = 'UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE'
+
+# When True decorating a view class only records the decorators. Combining them with the decorators of the base
+# classes (duplicate handling included) and hooking the as_view() method of the view class are deferred until the
+# first access of as_view() on the view class or on one of its subclasses. This moves the work out of the import time
+# of view modules whose view classes aren't used by the process.
+LAZY_CLASS_DECORATION = 'UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION'
+
+# When True the `UniversalViewDecoratorConfig` app config warms up the decorated views of the ROOT_URLCONF in its
+# ready() method. See `django_universal_view_decorator.warm_up`.
+WARM_UP = 'UNIVERSAL_VIEW_DECORATOR_WARM_UP'
+
+# When True the decorator chains built by the library contain timing code that reports the exclusive time of each
+# layer to the sinks of `django_universal_view_decorator.instrumentation`. When False (the default) the chains don't
+# contain timing code. The setting is checked when the chains are built.
+INSTRUMENTATION = 'UNIVERSAL_VIEW_DECORATOR_INSTRUMENTATION'
+
+# An integer N: the decorator chains built by the library trace every Nth request (0: only the requests forced by
+# `django_universal_view_decorator.tracing.sampling()`). None (the default) disables tracing: the chains don't contain
+# tracing code. The setting is checked when the chains are built.
+TRACE_SAMPLE_RATE = 'UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE'
+
+# The maximum number of traces kept in the in-process ring buffer of `django_universal_view_decorator.tracing`.
+TRACE_BUFFER_SIZE = 'UNIVERSAL_VIEW_DECORATOR_TRACE_BUFFER_SIZE'
+
+# The path of a file the finished traces of `django_universal_view_decorator.tracing` are appended to (one JSON object
+# per line) or None (the default). The file is rotated when it holds TRACE_BUFFER_SIZE traces. The
+# `view_decorator_traces` management command reads this file.
+TRACE_FILE = 'UNIVERSAL_VIEW_DECORATOR_TRACE_FILE'
+
+# When True the decorator chains built by the library attribute the database queries to the layers of the chain. See
+# `django_universal_view_decorator.query_accounting`. The setting is checked when the chains are built.
+QUERY_ACCOUNTING = 'UNIVERSAL_VIEW_DECORATOR_QUERY_ACCOUNTING'
+
+# A dict that maps layer names (the qualified names of decorators) to latency budgets in seconds. It overrides the
+# `decorator_latency_budget` attribute of the decorators. See `django_universal_view_decorator.latency_budgets`.
+LATENCY_BUDGETS = 'UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGETS'
+
+# The minimum number of seconds between two warnings about the same layer of the same view exceeding its budget.
+LATENCY_BUDGET_WARNING_INTERVAL = 'UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGET_WARNING_INTERVAL'
+
+
+def get_setting(name, default=None):
+    """ Returns the value of a django setting or the default when the setting is missing or django settings haven't
+    been configured (e.g.: when views are decorated outside of a django project). """
+    if not settings.configured:
+        return default
+    return getattr(settings, name, default)
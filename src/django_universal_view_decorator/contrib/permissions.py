@@ -0,0 +1,159 @@
+""" A universal permission decorator that checks the permission requirements of a view with a single `has_perms()`
+call.
+
+`permission_required` has the same parameters and the same behavior as django's
+`django.contrib.auth.decorators.permission_required` but it can be applied to view functions, view classes and view
+class methods and the permission checks of the layers of a view are batched:
+
+- The `permission_required` decorators applied to a view class (and inherited from its base classes) are merged into
+  one decorator (with the duplicate merge protocol of `ViewClassDecorator`).
+- When the decorator chain of a view is built, the outermost `permission_required` layer gathers the permissions of
+  the inner `permission_required` layers. The class level layer of a view class also gathers the permissions of the
+  `permission_required` decorators applied directly to the handler method of each HTTP method.
+- The gathered permissions are checked with a single `user.has_perms()` call and the granted permissions are cached on
+  the request so the inner layers (and the view through `has_permissions()`) don't check them again.
+
+If the user lacks one of the gathered permissions then the outermost layer rejects the request with its own
+`login_url` and `raise_exception` settings. The permissions are checked synchronously so the decorator can't be used
+with async views.
+
+.. code-block:: python
+
+    from django_universal_view_decorator.contrib.permissions import permission_required
+
+    @permission_required('app.view_item')
+    class ItemView(UpdateView):
+        @permission_required('app.change_item')
+        def post(self, request, *args, **kwargs):
+            ...
+"""
+import inspect
+
+from django.conf import settings
+from django.contrib.auth import REDIRECT_FIELD_NAME
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import resolve_url
+
+from ..decorators.view_decorator_base import ViewDecoratorBase, _ViewDecoration
+from ..five import string_types
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+# The name of the request attribute that holds the frozenset of the permissions that have already been granted to
+# the user of the request.
+_GRANTED_PERMISSIONS_ATTRIBUTE = '_universal_view_decorator_granted_permissions'
+
+
+def get_granted_permissions(request):
+    """ Returns the frozenset of the permissions that have already been checked and granted to the user of the
+    request. """
+    return getattr(request, _GRANTED_PERMISSIONS_ATTRIBUTE, frozenset())
+
+
+def has_permissions(request, perms):
+    """ Returns True if the user of the request has all of the specified permissions. Only the permissions that
+    haven't yet been granted in the request are checked (with one `user.has_perms()` call). """
+    granted = get_granted_permissions(request)
+    missing = frozenset(perms) - granted
+    if not missing:
+        return True
+    if not request.user.has_perms(sorted(missing)):
+        return False
+    setattr(request, _GRANTED_PERMISSIONS_ATTRIBUTE, granted | missing)
+    return True
+
+
+class PermissionRequired(ViewDecoratorBase):
+    """ Checks whether the user of the request has all of the specified permissions. `perm` is a permission name or
+    an iterable of permission names. If the user doesn't have the permissions then the request is redirected to the
+    login page or a `PermissionDenied` exception is raised if `raise_exception` is True. """
+
+    decorator_duplicate_id = 'django_universal_view_decorator.contrib.permissions.PermissionRequired'
+
+    def __init__(self, perm, login_url=None, raise_exception=False):
+        super(PermissionRequired, self).__init__()
+        self.perms = frozenset((perm,) if isinstance(perm, string_types) else perm)
+        self.login_url = login_url
+        self.raise_exception = raise_exception
+
+    @staticmethod
+    def decorator_duplicate_merge_func(duplicate_id, decorators):
+        """ Merges the `PermissionRequired` decorators of a view class and its bases into one decorator that
+        requires all permissions. The other settings are taken from the newest decorator. """
+        newest = decorators[-1]
+        perms = frozenset(perm for decorator in decorators for perm in decorator.perms)
+        return type(newest)(perms, login_url=newest.login_url, raise_exception=newest.raise_exception)
+
+    def _on_decoration_instance_created(self, decoration_instance):
+        # The permissions of our layer and the inner (fused) `PermissionRequired` layers.
+        decoration_instance.required_permissions = _get_decoration_permissions(decoration_instance)
+        # In case of a decorated view class the view function is the one returned by `as_view()` and we gather the
+        # permissions of the decorated handler methods too.
+        view_class = getattr(decoration_instance.view_function, 'view_class', None)
+        decoration_instance.required_permissions_by_method = None if view_class is None else \
+            _get_required_permissions_by_method(view_class, decoration_instance.required_permissions)
+
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        request = args[0]
+        perms = decoration_instance.required_permissions
+        if decoration_instance.required_permissions_by_method is not None:
+            perms = decoration_instance.required_permissions_by_method.get(request.method.lower(), perms)
+        if not has_permissions(request, perms):
+            return self._handle_no_permission(request)
+        return view_function(*args, **kwargs)
+
+    def _handle_no_permission(self, request):
+        """ The same as the behavior of django's `permission_required` in case of missing permissions. """
+        if self.raise_exception:
+            raise PermissionDenied
+        # imported here because the module can be imported only if `django.contrib.auth` is installed
+        from django.contrib.auth.views import redirect_to_login
+
+        path = request.build_absolute_uri()
+        resolved_login_url = resolve_url(self.login_url or settings.LOGIN_URL)
+        # If the login url is the same scheme and net location then just use the path as the "next" url.
+        login_scheme, login_netloc = urlparse(resolved_login_url)[:2]
+        current_scheme, current_netloc = urlparse(path)[:2]
+        if (not login_scheme or login_scheme == current_scheme) and \
+                (not login_netloc or login_netloc == current_netloc):
+            path = request.get_full_path()
+        return redirect_to_login(path, resolved_login_url, REDIRECT_FIELD_NAME)
+
+
+permission_required = PermissionRequired.universal_decorator
+
+
+def _get_decoration_permissions(decoration_instance):
+    """ Returns the permissions of the `PermissionRequired` stages of a `_ViewDecoration`. """
+    return frozenset(perm for stage_decoration_instance, _ in decoration_instance.stages
+                     if isinstance(stage_decoration_instance.view_decorator, PermissionRequired)
+                     for perm in stage_decoration_instance.view_decorator.perms)
+
+
+def _get_required_permissions_by_method(view_class, class_permissions):
+    """ Returns a dict that maps the lowercase HTTP method names handled by the view class to the union of the
+    class level permissions and the permissions of the `PermissionRequired` decorators of the handler method. """
+    result = {}
+    for method in view_class.http_method_names:
+        handler = _get_class_attribute(view_class, method)
+        # django's `View.setup()` uses the get() handler for HEAD requests if the view has no head() method
+        if handler is None and method == 'head':
+            handler = _get_class_attribute(view_class, 'get')
+        if handler is None:
+            continue
+        handler_permissions = _get_decoration_permissions(handler) if isinstance(handler, _ViewDecoration) \
+            else frozenset()
+        result[method] = class_permissions | handler_permissions
+    return result
+
+
+def _get_class_attribute(cls, name):
+    # the attribute without invoking the descriptor protocol
+    for base in inspect.getmro(cls):
+        if name in base.__dict__:
+            return base.__dict__[name]
+    return None
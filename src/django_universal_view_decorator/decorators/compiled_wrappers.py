@@ -0,0 +1,119 @@
+""" Code generation for the wrappers of decorated views.
+
+The generic wrappers receive the arguments of the view with `*args, **kwargs` so each wrapper layer packs the args
+into a new tuple and dict. When the `UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS` setting is True we generate (with
+`compile()` and `exec()`, the same way attrs and dataclasses generate methods) wrappers that have the exact
+parameter list of the decorated view.
+
+The generated wrappers pass their arguments positionally to the `_call_view_function()` of the decorator so they
+mustn't change how the arguments reach the decorators: django passes the request positionally but the URL arguments
+are passed positionally (unnamed regex groups) or as keyword arguments depending on the URL pattern. For this reason
+wrappers are generated only for the views that receive nothing but the request: view functions with a single
+parameter and view class methods with two parameters (the view class instance and the request). Other views (e.g.:
+views with URL arguments, `*args`, `**kwargs`, default values or keyword-only parameters) use the generic wrappers.
+
+Only the entry point is compiled: the `_call_view_function()` of the decorators is part of the public API of
+`ViewDecoratorBase` with a `*args, **kwargs` signature so the arguments are packed when the generated wrapper calls
+it and the inner layers receive them the same way as in case of the generic wrappers.
+
+The generated code depends only on the parameter names of the view so it is compiled only once per parameter list.
+"""
+import inspect
+import linecache
+import threading
+
+from ..conf import COMPILE_WRAPPERS, get_setting
+from ..five import getfullargspec
+
+
+# The names we use in the generated code. Views that have a parameter with this prefix use the generic wrappers.
+_NAME_PREFIX = '_uvd_'
+
+_lock = threading.Lock()
+_view_method_wrapper_factories = {}
+_view_decoration_call_methods = {}
+
+
+def is_enabled():
+    return bool(get_setting(COMPILE_WRAPPERS, False))
+
+
+def get_parameter_names(view_function):
+    """ Returns the parameter names of the view function as a tuple if we can generate wrappers for it, None
+    otherwise. """
+    if not inspect.isfunction(view_function):
+        # e.g.: a builtin or a functools.partial object
+        return None
+    argspec = getfullargspec(view_function)
+    if argspec.varargs or argspec.varkw or argspec.defaults or argspec.kwonlyargs:
+        return None
+    # (request) or (self, request), see the module docstring
+    if len(argspec.args) not in (1, 2):
+        return None
+    if any(name.startswith(_NAME_PREFIX) for name in argspec.args):
+        return None
+    return tuple(argspec.args)
+
+
+def get_view_method_wrapper_factory(parameter_names):
+    """ Returns a factory that creates the `view_method_wrapper` of a `_ViewDecoration` or None if the view can't be
+    a view class method that receives only the request. The first parameter of a view method is the view class
+    instance. """
+    if len(parameter_names) != 2:
+        return None
+    return _get_cached(_view_method_wrapper_factories, parameter_names, _compile_view_method_wrapper_factory)
+
+
+def get_view_decoration_call_method(parameter_names):
+    """ Returns the `__call__()` method of a `_ViewDecoration` subclass that decorates a view function or None if the
+    view can't be a view function that receives only the request. """
+    if len(parameter_names) != 1:
+        return None
+    return _get_cached(_view_decoration_call_methods, parameter_names, _compile_view_decoration_call_method)
+
+
+def _get_cached(cache, parameter_names, compile_function):
+    try:
+        return cache[parameter_names]
+    except KeyError:
+        pass
+    with _lock:
+        if parameter_names not in cache:
+            cache[parameter_names] = compile_function(parameter_names)
+        return cache[parameter_names]
+
+
+def _compile_view_method_wrapper_factory(parameter_names):
+    view_class_instance = parameter_names[0]
+    source = '''\
+def create_view_method_wrapper(_uvd_decoration_instance, _uvd_view_function, _uvd_inner_stages_reversed,
+                               _uvd_call_view_function, _uvd_stage_class, _uvd_type=type):
+    def view_method_wrapper({parameters}):
+        _uvd_bound_view_method = _uvd_view_function.__get__({view_class_instance}, _uvd_type({view_class_instance}))
+        for _uvd_stage_decoration_instance, _uvd_inner_call_view_function in _uvd_inner_stages_reversed:
+            _uvd_bound_view_method = _uvd_stage_class(_uvd_inner_call_view_function, _uvd_stage_decoration_instance,
+                                                      {view_class_instance}, _uvd_bound_view_method)
+        return _uvd_call_view_function(_uvd_decoration_instance, {view_class_instance}, _uvd_bound_view_method,
+                                       {arguments})
+    return view_method_wrapper
+'''.format(parameters=', '.join(parameter_names), view_class_instance=view_class_instance,
+           arguments=', '.join(parameter_names[1:]))
+    return _compile(source, 'create_view_method_wrapper', parameter_names)
+
+
+def _compile_view_decoration_call_method(parameter_names):
+    source = '''\
+def __call__({parameters}):
+    return _uvd_self.call_view_function({arguments})
+'''.format(parameters=', '.join(('_uvd_self',) + parameter_names),
+           arguments=', '.join(('_uvd_self', 'None', '_uvd_self.inner_view_function') + parameter_names))
+    return _compile(source, '__call__', parameter_names)
+
+
+def _compile(source, function_name, parameter_names):
+    # A unique filename for each generated source makes the tracebacks readable.
+    filename = '<django_universal_view_decorator generated {}({})>'.format(function_name, ', '.join(parameter_names))
+    namespace = {}
+    exec(compile(source, filename, 'exec'), namespace)
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    return namespace[function_name]
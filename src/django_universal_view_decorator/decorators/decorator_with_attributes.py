@@ -0,0 +1,26 @@
+class DecoratorWithAttributes(object):
+    """ Attaches extra attributes (e.g.: `decorator_duplicate_id`) to a decorator without wrapping it into another
+    decorator function. The view routine and view class decorators of this library unwrap it when they compose
+    their decorator chains so the original decorator is applied to the views without an extra call layer. Reading
+    any other attribute returns the attribute of the original decorator. """
+    def __init__(self, decorator, attributes):
+        super(DecoratorWithAttributes, self).__init__()
+        self.decorator = decorator
+        self.__dict__.update(attributes)
+
+    def __call__(self, view_function):
+        return self.decorator(view_function)
+
+    def __getattr__(self, name):
+        # __getattr__ is called only if the attribute isn't found in self.__dict__ and in the class
+        if name == 'decorator':
+            raise AttributeError(name)
+        return getattr(self.decorator, name)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.decorator)
+
+
+def unwrap_decorator(decorator):
+    """ Returns the original decorator of a `DecoratorWithAttributes` or the received decorator otherwise. """
+    return decorator.decorator if isinstance(decorator, DecoratorWithAttributes) else decorator
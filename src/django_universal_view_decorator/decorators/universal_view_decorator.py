@@ -1,8 +1,8 @@
 import inspect
 
+from .decorator_with_attributes import DecoratorWithAttributes
 from .view_class_decorator import view_class_decorator
 from .view_routine_decorator import view_routine_decorator
-from ..five import wraps
 
 
 def universal_view_decorator(*decorators, **duplicate_params):
@@ -11,7 +11,7 @@ def universal_view_decorator(*decorators, **duplicate_params):
     def decorate(view):
         if not decorators:
             return view
-        decorator_wrapper = view_routine_decorator if inspect.isroutine(view) else view_class_decorator
+        decorator_wrapper = _get_decorator_wrapper(view, duplicate_params)
         return decorator_wrapper(*decorators)(view)
     return decorate
 
@@ -22,20 +22,39 @@ def universal_view_decorator_with_args(decorator, **duplicate_params):
         parametrized_decorator = _wrap_decorators_if_needed((parametrized_decorator,), **duplicate_params)[0]
 
         def decorate(view):
-            decorator_wrapper = view_routine_decorator if inspect.isroutine(view) else view_class_decorator
+            decorator_wrapper = _get_decorator_wrapper(view, duplicate_params)
             return decorator_wrapper(parametrized_decorator)(view)
         return decorate
     return receive_decorator_args
 
 
+def _get_decorator_wrapper(view, duplicate_params):
+    if not inspect.isroutine(view):
+        return view_class_decorator
+    for name in ('methods', 'reject_disallowed_methods'):
+        if duplicate_params.get(name) is not None:
+            raise TypeError('The {!r} parameter can be used only with view classes, got {!r} instead.'.format(
+                name, view))
+    return view_routine_decorator
+
+
 def _wrap_decorators_if_needed(decorators, duplicate_id=None, duplicate_handler_func=None,
-                               duplicate_keep_newest=None, duplicate_priority=None):
-    if duplicate_id is None and duplicate_handler_func is None and \
-            duplicate_keep_newest is None and duplicate_priority is None:
+                               duplicate_keep_newest=None, duplicate_priority=None, duplicate_merge_func=None,
+                               latency_budget=None, methods=None, reject_disallowed_methods=None):
+    if duplicate_id is None and duplicate_handler_func is None and duplicate_keep_newest is None and \
+            duplicate_priority is None and duplicate_merge_func is None and latency_budget is None and \
+            methods is None and reject_disallowed_methods is None:
         return decorators
-    if duplicate_id is None:
+    if duplicate_id is None and (duplicate_handler_func is not None or duplicate_keep_newest is not None or
+                                 duplicate_priority is not None or duplicate_merge_func is not None):
         raise ValueError("You have used duplicate decorator related parameters without the 'duplicate_id' parameter")
     attributes = {}
+    if latency_budget is not None:
+        attributes['decorator_latency_budget'] = latency_budget
+    if methods is not None:
+        attributes['decorator_methods'] = methods
+    if reject_disallowed_methods is not None:
+        attributes['decorator_reject_disallowed_methods'] = reject_disallowed_methods
     if duplicate_id is not None:
         attributes['decorator_duplicate_id'] = duplicate_id
     if duplicate_handler_func is not None:
@@ -44,12 +63,6 @@ def _wrap_decorators_if_needed(decorators, duplicate_id=None, duplicate_handler_
         attributes['decorator_duplicate_keep_newest'] = duplicate_keep_newest
     if duplicate_priority is not None:
         attributes['decorator_duplicate_priority'] = duplicate_priority
-    return tuple(_wrap_decorator_with_attributes(decorator, attributes) for decorator in decorators)
-
-
-def _wrap_decorator_with_attributes(decorator, attributes):
-    @wraps(decorator)
-    def wrapper(*args, **kwargs):
-        return decorator(*args, **kwargs)
-    wrapper.__dict__.update(attributes)
-    return wrapper
+    if duplicate_merge_func is not None:
+        attributes['decorator_duplicate_merge_func'] = duplicate_merge_func
+    return tuple(DecoratorWithAttributes(decorator, attributes) for decorator in decorators)
@@ -1,12 +1,22 @@
 import collections
 import inspect
 import logging
+import threading
 import types
+import weakref
 
-from ..five import update_wrapper, wraps
+from django.http import HttpResponseNotAllowed
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.generic import View
+
+from .. import instrumentation, latency_budgets
+from ..conf import LAZY_CLASS_DECORATION, get_setting
+from ..five import async_return, string_types, update_wrapper, wraps, iscoroutinefunction, markcoroutinefunction
+from .decorator_with_attributes import DecoratorWithAttributes, unwrap_decorator
 
 
 logger = logging.getLogger(__name__)
+django_request_logger = logging.getLogger('django.request')
 
 
 class ViewClassDecorator(object):
@@ -25,13 +35,22 @@ class ViewClassDecorator(object):
         # your view class will inherit decorators only from the first one (that was listed first in the base class
         # list).
 
+        if get_setting(LAZY_CLASS_DECORATION, False):
+            _defer_view_class_decoration(self, class_to_decorate)
+            return class_to_decorate
+
+        # Our decorators have to be combined with the already resolved decorators of the view class and its bases.
+        resolve_pending_view_class_decorations(class_to_decorate)
+        return self._decorate(class_to_decorate)
+
+    def _decorate(self, class_to_decorate):
         # `accumulated_decorators` contains all view class decorators that have already been applied to this view class
         # along with the decorators it inherited from its view base class (if any). The decorators are in the correct
         # order in this tuple and the duplicates have already been eliminated from it. We are going to prepend our own
         # decorators to this list by eliminating any duplicate decorators if necessary.
         accumulated_decorators = getattr(class_to_decorate, '_accumulated_view_class_decorators', None)
         if accumulated_decorators is None:
-            accumulated_decorators = ()
+            accumulated_decorators = AccumulatedViewClassDecorators()
             # This view class or one of its view bases haven't yet been decorated. For this reason we decorate/hook
             # the as_view() classmethod of this view class.
             self.__decorate_the_as_view_method(class_to_decorate)
@@ -40,8 +59,10 @@ class ViewClassDecorator(object):
             logger.debug('Before decorating %(cls)r with %(decorators)r it already has decorators %(accumulated)r',
                          dict(cls=class_to_decorate, decorators=self.decorators, accumulated=accumulated_decorators))
 
-        setattr(class_to_decorate, '_accumulated_view_class_decorators',
-                self._combine_our_decorators_with_accumulated_ones(class_to_decorate, accumulated_decorators))
+        accumulated_decorators = self._combine_our_decorators_with_accumulated_ones(class_to_decorate,
+                                                                                   accumulated_decorators)
+        setattr(class_to_decorate, '_accumulated_view_class_decorators', accumulated_decorators)
+        setattr(class_to_decorate, '_view_class_decorator_chain', ViewClassDecoratorChain(accumulated_decorators))
 
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug('After decorating %(cls)r with %(decorators)r it has decorators %(accumulated)r',
@@ -54,6 +75,10 @@ class ViewClassDecorator(object):
     def __decorate_the_as_view_method(class_to_decorate):
         for base_class in inspect.getmro(class_to_decorate):
             as_view = base_class.__dict__.get('as_view')
+            if isinstance(as_view, _LazyAsViewDecorator):
+                # The lazy decoration of the class is being resolved: the hooked as_view() replaces the lazy hook so
+                # the class never exposes its undecorated as_view() to other threads.
+                as_view = as_view.wrapped_as_view
             if as_view:
                 class_to_decorate.as_view = _AsViewDecorator(as_view)
                 break
@@ -64,58 +89,77 @@ class ViewClassDecorator(object):
     def _combine_our_decorators_with_accumulated_ones(self, class_to_decorate, accumulated_decorators):
         """ Combines our decorators with the already accumulated ones. Accumulated decorators include decorators
         inherited from the base class along with decorators that have already been added to the currently decorated
-        class using another `ViewClassDecorator` instance. """
-
-        # creating a list of new and old/accumulated decorators
-        decorators = [dict(decorator=decorator, view_class=class_to_decorate, group='new')
-                      for decorator in self.decorators]
-        for item in accumulated_decorators:
-            item = item.copy()
-            item['group'] = 'old'
-            decorators.append(item)
-
-        # collecting decorators that have the `decorator_duplicate_id` attribute
-        duplicates = collections.defaultdict(list)
-        for index, item in enumerate(decorators):
-            duplicate_id = getattr(item['decorator'], 'decorator_duplicate_id', None)
+        class using another `ViewClassDecorator` instance. Returns a new `AccumulatedViewClassDecorators` object.
+
+        The accumulated decorators are shared with the base class: the returned object references them instead of
+        copying them unless a duplicate handler deletes or replaces one of them. The duplicates of our decorators
+        are looked up in the `duplicate_index` of the accumulated decorators. """
+        new_records = [AccumulatedViewClassDecorator(decorator, class_to_decorate) for decorator in self.decorators]
+        num_new = len(new_records)
+        num_total = num_new + len(accumulated_decorators)
+
+        # collecting the positions of our decorators that have the `decorator_duplicate_id` attribute
+        new_duplicates = collections.OrderedDict()
+        for index, decorator in enumerate(self.decorators):
+            duplicate_id = getattr(decorator, 'decorator_duplicate_id', None)
             if duplicate_id is not None:
-                item = item.copy()
-                item['index'] = index
-                duplicates[duplicate_id].append(item)
-
-        # handling duplicate_ids one-by-one by calling a resolver function on them
-        for duplicate_id, duplicates in duplicates.items():
-            # skipping duplicate_id that has no new decorator or has less than 2 decorators in total
-            if len(duplicates) < 2 or duplicates[0]['group'] != 'new':
+                new_duplicates.setdefault(duplicate_id, []).append(index)
+
+        # Handling duplicate_ids one-by-one by calling a resolver function on them. Only the duplicate_ids of our
+        # decorators can have unhandled duplicates because the accumulated ones have already been handled.
+        # `replaced_accumulated_records` maps the positions of the deleted (None) and replaced accumulated decorators
+        # to their new records.
+        replaced_accumulated_records = {}
+        for duplicate_id, new_indexes in new_duplicates.items():
+            duplicate_records = [(index, new_records[index]) for index in new_indexes]
+            duplicate_records += [(num_total - position, record) for position, record
+                                  in accumulated_decorators.duplicate_index.get(duplicate_id, ())]
+            # skipping duplicate_id that has less than 2 decorators in total
+            if len(duplicate_records) < 2:
                 continue
-            self._handle_duplicate_id(duplicate_id, duplicates, decorators)
-
-        # Simplifying the items in the decorators array and dropping deleted/None items.
-        return tuple(
-            dict(decorator=item['decorator'], view_class=item['view_class'])
-            for item in decorators if item is not None
-        )
-
-    def _handle_duplicate_id(self, duplicate_id, duplicates, decorators):
-        # we create a copy because we will need it and the duplicates array
-        # might be modified by the duplicate handler func
-        duplicates_copy = [item.copy() for item in duplicates]
-
-        duplicate_handler_func = self._get_decorator_attribute(duplicates, 'decorator_duplicate_handler_func',
-                                                               self._default_duplicate_handler_func)
+            decorators = self._handle_duplicate_id(duplicate_id, [
+                dict(record, group='new' if index < num_new else 'old', index=index)
+                for index, record in duplicate_records
+            ])
+            for (index, record), decorator in zip(duplicate_records, decorators):
+                if decorator is record.decorator:
+                    continue
+                if decorator is not None:
+                    decorator = AccumulatedViewClassDecorator(decorator, record.view_class)
+                if index < num_new:
+                    new_records[index] = decorator
+                else:
+                    replaced_accumulated_records[index] = decorator
+
+        new_records = [record for record in new_records if record is not None]
+        if not replaced_accumulated_records:
+            return accumulated_decorators.prepend(new_records)
+
+        # The accumulated decorators have been modified so we can't share them with the base class.
+        records = [replaced_accumulated_records.get(index, record)
+                   for index, record in enumerate(accumulated_decorators, num_new)]
+        return AccumulatedViewClassDecorators().prepend(new_records + [record for record in records
+                                                                       if record is not None])
+
+    def _handle_duplicate_id(self, duplicate_id, duplicates):
+        """ Calls the duplicate handler func on the duplicates and returns the list of the resulting decorators. The
+        Nth item of the returned list is None if the duplicate handler has deleted the Nth duplicate. """
+        duplicate_handler_func = self._get_decorator_attribute(duplicates, 'decorator_duplicate_handler_func', None)
+        if duplicate_handler_func is None:
+            if self._get_decorator_attribute(duplicates, 'decorator_duplicate_merge_func', None) is not None:
+                duplicate_handler_func = self._merge_duplicate_handler_func
+            else:
+                duplicate_handler_func = self._default_duplicate_handler_func
+        num_duplicates = len(duplicates)
         duplicate_handler_func(duplicate_id, duplicates)
-        assert len(duplicates) == len(duplicates_copy)
+        assert len(duplicates) == num_duplicates
 
         # after the duplicate_handler_func() call each item in the duplicates array can be one of the following things:
         # 1. None: This means that the duplicate handler deleted this decorator.
         # 2. A dict that has a 'decorator' key: The duplicate handler either left this item unmodified or
         #    changed the value associated with the 'decorator' key.
         # 3. A decorator: The duplicate handler wants us to use this decorator instead of the old one.
-
-        duplicates = [item['decorator'] if isinstance(item, dict) else item for item in duplicates]
-        for i, decorator in enumerate(duplicates):
-            decorators[duplicates_copy[i]['index']] = None if decorator is None else dict(
-                decorator=decorator, view_class=duplicates_copy[i]['view_class'])
+        return [item['decorator'] if isinstance(item, dict) else item for item in duplicates]
 
     def _default_duplicate_handler_func(self, duplicate_id, duplicates):
         """ This default duplicate handler func gets the priority of each duplicate and deletes all duplicates
@@ -147,6 +191,37 @@ class ViewClassDecorator(object):
             if index != index_to_keep:
                 duplicates[index] = None
 
+    # The attributes of the original decorators that are copied to the merged decorator if it doesn't have a
+    # `decorator_duplicate_id` attribute so the decorators of derived view classes are merged into it.
+    _merged_decorator_attributes = ('decorator_duplicate_id', 'decorator_duplicate_merge_func',
+                                    'decorator_duplicate_keep_newest', 'decorator_latency_budget', 'decorator_methods',
+                                    'decorator_reject_disallowed_methods')
+
+    def _merge_duplicate_handler_func(self, duplicate_id, duplicates):
+        """ This duplicate handler func is used instead of the default one if one of the duplicates has a
+        `decorator_duplicate_merge_func` attribute (and none of them has a `decorator_duplicate_handler_func`). It
+        calls `decorator_duplicate_merge_func(duplicate_id, decorators)` with the decorators ordered from the oldest
+        to the newest one. The returned decorator replaces the duplicate the default handler would keep (the oldest or
+        the newest one in case of `decorator_duplicate_keep_newest = True`) and the other duplicates are deleted.
+        This way a decorator (e.g.: a permission check) inherited from several base classes becomes a single layer.
+
+        If the merged decorator doesn't have a `decorator_duplicate_id` attribute then the duplicate attributes of the
+        kept decorator are attached to it so the decorators of derived view classes are merged into it. """
+        merge_func = self._get_decorator_attribute(duplicates, 'decorator_duplicate_merge_func', None)
+        keep_newest = self._get_decorator_attribute(duplicates, 'decorator_duplicate_keep_newest', False)
+        index_to_keep = 0 if keep_newest else len(duplicates) - 1
+        kept_decorator = duplicates[index_to_keep]['decorator']
+
+        merged_decorator = merge_func(duplicate_id, [unwrap_decorator(item['decorator'])
+                                                     for item in reversed(duplicates)])
+        if getattr(merged_decorator, 'decorator_duplicate_id', None) is None:
+            attributes = dict((name, getattr(kept_decorator, name)) for name in self._merged_decorator_attributes
+                              if getattr(kept_decorator, name, None) is not None)
+            merged_decorator = DecoratorWithAttributes(merged_decorator, attributes)
+
+        for index in range(len(duplicates)):
+            duplicates[index] = merged_decorator if index == index_to_keep else None
+
     __not_found = object()
 
     def _get_decorator_attribute(self, duplicates, attribute_name, default_value):
@@ -160,9 +235,338 @@ class ViewClassDecorator(object):
 view_class_decorator = ViewClassDecorator
 
 
+class AccumulatedViewClassDecorator(object):
+    """ An immutable record of a decorator that has been applied to a view class or to one of its base classes. The
+    fields can also be accessed as `record['decorator']` and `record['view_class']` and `dict(record)` converts the
+    record into a dict. """
+    __slots__ = ('decorator', 'view_class')
+
+    def __init__(self, decorator, view_class):
+        object.__setattr__(self, 'decorator', decorator)
+        object.__setattr__(self, 'view_class', view_class)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, AccumulatedViewClassDecorator):
+            return NotImplemented
+        return self.decorator == other.decorator and self.view_class is other.view_class
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash((self.decorator, self.view_class))
+
+    def __repr__(self):
+        return '{}(decorator={!r}, view_class={!r})'.format(type(self).__name__, self.decorator, self.view_class)
+
+
+class AccumulatedViewClassDecorators(object):
+    """ The immutable sequence of the `AccumulatedViewClassDecorator` records of a decorated view class. The first
+    item is the decorator that has been applied last (the outermost one) and the duplicates have already been
+    eliminated from the sequence.
+
+    This is a persistent data structure: decorating a derived view class prepends the records of the new decorators
+    to the accumulated decorators of the base class without copying the records of the base class. Each object
+    stores only its own records (the ones prepended by `prepend()`) and a reference to the object that contains the
+    rest of the records (`tail`) so a view class shares the records of all of its decorated base classes.
+
+    `duplicate_index` maps the `duplicate_id` of the decorators to a tuple of `(position, record)` pairs (in the order
+    of the records in the sequence). The positions are counted from the end of the sequence (the last record is at
+    position 1) so the index of the tail remains valid in the objects that prepend records to it. """
+    __slots__ = ('records', 'tail', 'duplicate_index', 'length')
+
+    def __init__(self, records=(), tail=None, duplicate_index=None):
+        object.__setattr__(self, 'records', tuple(records))
+        object.__setattr__(self, 'tail', tail)
+        object.__setattr__(self, 'length', len(self.records) + (0 if tail is None else tail.length))
+        object.__setattr__(self, 'duplicate_index', {} if duplicate_index is None else duplicate_index)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def prepend(self, records):
+        """ Returns a new object that contains the specified records followed by the records of this object. """
+        if not records:
+            return self
+        duplicate_index = self.duplicate_index
+        length = len(records) + self.length
+        for index in reversed(range(len(records))):
+            duplicate_id = getattr(records[index].decorator, 'decorator_duplicate_id', None)
+            if duplicate_id is not None:
+                if duplicate_index is self.duplicate_index:
+                    duplicate_index = dict(duplicate_index)
+                duplicate_index[duplicate_id] = ((length - index, records[index]),) + \
+                    duplicate_index.get(duplicate_id, ())
+        return type(self)(records, self if self.length else None, duplicate_index)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        node = self
+        while node is not None:
+            for record in node.records:
+                yield record
+            node = node.tail
+
+    def __reversed__(self):
+        nodes = []
+        node = self
+        while node is not None:
+            nodes.append(node)
+            node = node.tail
+        for node in reversed(nodes):
+            for record in reversed(node.records):
+                yield record
+
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            return tuple(self)[index]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('{} index out of range'.format(type(self).__name__))
+        node = self
+        while index >= len(node.records):
+            index -= len(node.records)
+            node = node.tail
+        return node.records[index]
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, list(self))
+
+
+class ViewClassDecoratorChain(object):
+    """ The compiled form of the accumulated decorators of a decorated view class. `ViewClassDecorator` creates it
+    after the duplicate decorators have been eliminated and the hooked `as_view()` of the view class applies it to
+    the view function returned by the original `as_view()`. The chain is immutable: decorating the view class again
+    creates a new chain object. The chain shares the `AccumulatedViewClassDecorators` of the view class.
+
+    Everything `apply()` needs that doesn't depend on the view function (the records in application order and their
+    groupings by HTTP method) is computed once when the chain is created so `as_view()` calls don't walk the
+    accumulated decorators. """
+    __slots__ = ('accumulated_decorators', 'records', 'decorators', 'view_classes', 'rejects_disallowed_methods',
+                 'default_records', 'method_records', 'head_records')
+
+    def __init__(self, accumulated_decorators):
+        object.__setattr__(self, 'accumulated_decorators', accumulated_decorators)
+        # the first record is the innermost one
+        records = tuple(reversed(accumulated_decorators))
+        object.__setattr__(self, 'records', records)
+        object.__setattr__(self, 'decorators', tuple(unwrap_decorator(record.decorator) for record in records))
+        object.__setattr__(self, 'view_classes', tuple(record.view_class for record in records))
+        object.__setattr__(self, 'rejects_disallowed_methods', any(
+            getattr(record.decorator, 'decorator_reject_disallowed_methods', False) for record in records))
+
+        records_methods = [get_decorator_methods(record.decorator) for record in records]
+
+        def get_method_records(request_methods):
+            return tuple(record for record, methods in zip(records, records_methods)
+                         if methods is None or not methods.isdisjoint(request_methods))
+
+        # `method_records` maps the HTTP methods that have restricted decorators to their records. It is empty if
+        # none of the decorators are restricted. `head_records` is used for HEAD requests if the view class handles
+        # them with its get() method.
+        restricted_methods = frozenset(method for methods in records_methods if methods for method in methods)
+        object.__setattr__(self, 'default_records', get_method_records(frozenset()))
+        object.__setattr__(self, 'method_records', dict((method, get_method_records(frozenset((method,))))
+                                                        for method in restricted_methods))
+        head_methods = frozenset(('HEAD', 'GET'))
+        object.__setattr__(self, 'head_records', None if restricted_methods.isdisjoint(head_methods) else
+                           get_method_records(head_methods))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.decorators)
+
+    def apply(self, view_function, initkwargs=None):
+        """ Applies the decorators to the view function returned by `as_view(**initkwargs)`. If some of the decorators
+        are restricted to HTTP methods (with a `decorator_methods` attribute, e.g.: the `methods` parameter of
+        `universal_view_decorator`) then a separate chain is built for each of these methods along with a default
+        chain (for the other methods) and the returned function selects the chain by `request.method`. """
+        decorated_view_function = self._apply_method_chains(view_function)
+        # If one of the decorators has a `decorator_reject_disallowed_methods` attribute (the
+        # `reject_disallowed_methods` parameter of `universal_view_decorator`) then the disallowed methods are rejected
+        # in front of all decorators of the chain.
+        view_class = getattr(view_function, 'view_class', None)
+        if view_class is not None and self.rejects_disallowed_methods:
+            if initkwargs is None:
+                initkwargs = getattr(view_function, 'view_initkwargs', None) or {}
+            decorated_view_function = reject_disallowed_methods(decorated_view_function, view_class, initkwargs)
+        return decorated_view_function
+
+    def _apply_method_chains(self, view_function):
+        if not self.method_records:
+            return self._apply_records(view_function, self.records)
+
+        method_records = self.method_records
+        # django's `View.setup()` calls the get() handler for HEAD requests if the view class has no head() method so
+        # these requests have to pass the decorators restricted to GET too (we play safe if we don't know the class).
+        view_class = getattr(view_function, 'view_class', None)
+        head_uses_get = view_class is None or (hasattr(view_class, 'get') and not hasattr(view_class, 'head'))
+        if head_uses_get and self.head_records is not None:
+            method_records = dict(method_records, HEAD=self.head_records)
+        default_chain = self._apply_records(view_function, self.default_records)
+        chains = dict((method, self._apply_records(view_function, records))
+                      for method, records in method_records.items())
+        # The middlewares read the attributes of the view function before the chain is selected so the attributes set
+        # by the decorators of the method chains (e.g.: `csrf_exempt`) are merged into the ones of the default chain.
+        attributes = {}
+        for chain in chains.values():
+            attributes.update(vars(chain))
+        attributes.update(vars(default_chain))
+        if attributes.get('csrf_exempt'):
+            # The CSRF middleware skips the whole view function so the chains that aren't exempt check CSRF themselves.
+            default_chain, chains = _csrf_protect(default_chain), dict(
+                (method, _csrf_protect(chain)) for method, chain in chains.items())
+
+        def method_chain_selector(request, *args, **kwargs):
+            return chains.get(request.method, default_chain)(request, *args, **kwargs)
+        # The attributes of the view function (e.g.: `view_class`) and the chains (e.g.: `csrf_exempt`)
+        update_wrapper(method_chain_selector, default_chain)
+        for name, value in attributes.items():
+            if name not in ('__wrapped__', 'method_chains'):
+                setattr(method_chain_selector, name, value)
+        method_chain_selector.method_chains = chains
+        if iscoroutinefunction(view_function):
+            markcoroutinefunction(method_chain_selector)
+        return method_chain_selector
+
+    def _apply_records(self, view_function, records):
+        is_async = iscoroutinefunction(view_function)
+        # imported here because of the circular import
+        from .view_decorator_base import ViewDecoratorBase
+
+        instrumentation_options = None if is_async else instrumentation.get_options()
+        view_name = instrumentation.get_view_name(view_function)
+        if instrumentation_options is not None:
+            view_function = instrumentation.instrument_view(view_function, instrumentation_options, view_name)
+        for record in records:
+            decorator = unwrap_decorator(record.decorator)
+            # `ViewDecoratorBase` decorators check the budget of their own `_call_view_function()`
+            latency_budget = None
+            if not is_async and not isinstance(decorator, ViewDecoratorBase):
+                layer_name = instrumentation.get_layer_name(decorator)
+                latency_budget = latency_budgets.get_latency_budget(record.decorator, layer_name)
+            if latency_budget is None:
+                view_function = decorator(view_function)
+            else:
+                view_function = latency_budgets.apply_decorator(decorator, view_function, view_name, layer_name,
+                                                                latency_budget)
+            # `ViewDecoratorBase` decorators report their own measurements
+            if instrumentation_options is not None and not instrumentation.is_instrumented(view_function):
+                view_function = instrumentation.instrument_layer(view_function, view_name,
+                                                                 instrumentation.get_layer_name(decorator),
+                                                                 instrumentation_options)
+        # Decorators that don't copy the attributes of the wrapped view function lose the coroutine function marker
+        # of async views. Without the marker django would call our async view in a worker thread.
+        if is_async and not iscoroutinefunction(view_function):
+            markcoroutinefunction(view_function)
+        return view_function
+
+
+def get_allowed_methods(view_class, initkwargs=None):
+    """ Returns the list of the uppercase HTTP method names the view function returned by
+    `view_class.as_view(**initkwargs)` handles (in the order of its `http_method_names`, the same as the `Allow`
+    header of django's 405 responses) or None if the view has a custom `http_method_not_allowed()` implementation. """
+    initkwargs = initkwargs or {}
+    http_method_not_allowed = initkwargs.get('http_method_not_allowed', view_class.http_method_not_allowed)
+    http_method_not_allowed = getattr(http_method_not_allowed, '__func__', http_method_not_allowed)
+    if http_method_not_allowed is not getattr(View.http_method_not_allowed, '__func__', View.http_method_not_allowed):
+        return None
+
+    def has_handler(method):
+        return method in initkwargs or hasattr(view_class, method)
+    # django's `View.setup()` uses the get() handler for HEAD requests if the view has no head() method
+    return [method.upper() for method in initkwargs.get('http_method_names', view_class.http_method_names)
+            if has_handler(method) or (method == 'head' and has_handler('get'))]
+
+
+def _csrf_protect(view_function):
+    """ Returns a wrapper that runs the CSRF check of django's `CsrfViewMiddleware` in front of the view function unless
+    the view function is CSRF exempt. Unlike django's `csrf_protect()` this works with async view functions too. """
+    if getattr(view_function, 'csrf_exempt', False):
+        return view_function
+    middleware = CsrfViewMiddleware(lambda request: None)
+    is_async = iscoroutinefunction(view_function)
+
+    def csrf_checker(request, *args, **kwargs):
+        response = middleware.process_view(request, view_function, args, kwargs)
+        if response is None:
+            return view_function(request, *args, **kwargs)
+        return async_return(response) if is_async else response
+    update_wrapper(csrf_checker, view_function)
+    if is_async:
+        markcoroutinefunction(csrf_checker)
+    return csrf_checker
+
+
+def reject_disallowed_methods(view_function, view_class, initkwargs=None):
+    """ Returns a wrapper for the view function returned by `view_class.as_view(**initkwargs)` (decorated or not) that
+    responds with 405 to the requests of the HTTP methods the view doesn't handle without calling the view function.
+    The allowed methods are calculated only once. """
+    allowed_methods = get_allowed_methods(view_class, initkwargs)
+    if allowed_methods is None:
+        return view_function
+    allowed_method_set = frozenset(allowed_methods)
+    is_async = iscoroutinefunction(view_function)
+
+    def method_checker(request, *args, **kwargs):
+        if request.method in allowed_method_set:
+            return view_function(request, *args, **kwargs)
+        # the same as django's `View.http_method_not_allowed()`
+        django_request_logger.warning('Method Not Allowed (%s): %s', request.method, request.path,
+                                      extra={'status_code': 405, 'request': request})
+        response = HttpResponseNotAllowed(allowed_methods)
+        return async_return(response) if is_async else response
+    update_wrapper(method_checker, view_function)
+    method_checker.allowed_methods = allowed_method_set
+    if is_async:
+        markcoroutinefunction(method_checker)
+    return method_checker
+
+
+def get_decorator_methods(decorator):
+    """ Returns the frozenset of the uppercase HTTP method names the view class decorator is restricted to or None if
+    the decorator has to be applied to every request. """
+    methods = getattr(decorator, 'decorator_methods', None)
+    if methods is None:
+        return None
+    if isinstance(methods, string_types):
+        methods = (methods,)
+    return frozenset(method.upper() for method in methods)
+
+
 class _AsViewDecorator(object):
     """ Used by `ViewClassDecorator` to decorate/hook the `as_view()` method of the decorated view class if necessary.
-    This decorator applies decorator(s) to the view function returned by the decorated `as_view()`. """
+    This decorator applies the `ViewClassDecoratorChain` of the view class to the view function returned by the
+    decorated `as_view()`. """
     def __init__(self, wrapped_as_view):
         super(_AsViewDecorator, self).__init__()
 
@@ -173,12 +577,98 @@ class _AsViewDecorator(object):
         self.wrapped_as_view = wrapped_as_view
 
     def __get__(self, instance, owner=None):
+        owner = owner or type(instance)
+        # a lazily decorated subclass of an already decorated view class or a lazily decorated view class whose
+        # resolution is in progress in another thread
+        resolve_pending_view_class_decorations(owner)
+        chain = getattr(owner, '_view_class_decorator_chain')
+
+        # The hooked as_view() is cached on the owner class along with the decorator chain it has been created for.
+        # Applying another `ViewClassDecorator` to the owner or to one of its bases replaces the chain of that class
+        # so the identity check below invalidates the cache when it is necessary.
+        # Instance access bypasses the cache because django's `classonlymethod` raises an error in that case.
+        cached = owner.__dict__.get('_decorated_as_view_cache')
+        if cached is not None and cached[0] is chain and instance is None:
+            return cached[1]
+
         bound_as_view = self.wrapped_as_view.__get__(instance, owner)
 
         @wraps(bound_as_view)
         def wrapper(cls, **initkwargs):
-            view_function = bound_as_view(**initkwargs)
-            for item in reversed(getattr(cls, '_accumulated_view_class_decorators')):
-                view_function = item['decorator'](view_function)
-            return view_function
-        return types.MethodType(wrapper, owner or type(instance))
+            return chain.apply(bound_as_view(**initkwargs), initkwargs)
+        hooked_as_view = types.MethodType(wrapper, owner)
+        setattr(owner, '_decorated_as_view_cache', (chain, hooked_as_view))
+        return hooked_as_view
+
+
+# Lazy view class decoration (the `UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION` setting).
+#
+# A lazily decorated view class only records its `ViewClassDecorator` instances in its
+# `_pending_view_class_decorators` attribute and its `as_view()` method is hooked by a `_LazyAsViewDecorator`.
+# The pending decorations of a view class and its bases are resolved (with the same code that decorates view
+# classes eagerly) when `as_view()` is first accessed on the view class or on one of its subclasses.
+
+_lazy_decoration_lock = threading.RLock()
+_classes_with_pending_decorations = weakref.WeakSet()
+
+
+def _defer_view_class_decoration(view_class_decorator, view_class):
+    with _lazy_decoration_lock:
+        pending = view_class.__dict__.get('_pending_view_class_decorators', ())
+        setattr(view_class, '_pending_view_class_decorators', pending + (view_class_decorator,))
+        if not pending:
+            view_class.as_view = _LazyAsViewDecorator(view_class)
+            _classes_with_pending_decorations.add(view_class)
+
+
+def resolve_pending_view_class_decorations(view_class=None):
+    """ Applies the deferred (lazy) decorations of the specified view class and its bases or all deferred
+    decorations if `view_class` is None. Returns the number of view classes that have been resolved.
+    Calling this is necessary only if you want to do the work before the first `as_view()` call. """
+    # A view class is removed from `_classes_with_pending_decorations` only after its decorations have been fully
+    # applied so an empty set means there is nothing to wait for. Otherwise we wait on the lock for the resolution
+    # that may be in progress in another thread.
+    if not _classes_with_pending_decorations:
+        return 0
+    with _lazy_decoration_lock:
+        if view_class is None:
+            # bases first: the MRO of a base class is shorter than the MRO of its subclasses
+            classes = sorted(_classes_with_pending_decorations, key=lambda cls: len(inspect.getmro(cls)))
+        else:
+            classes = [cls for cls in reversed(inspect.getmro(view_class)) if cls in _classes_with_pending_decorations]
+        for cls in classes:
+            _resolve_view_class_decorations(cls)
+        return len(classes)
+
+
+def _resolve_view_class_decorations(view_class):
+    # The lazy hook stays in place (and the class stays in `_classes_with_pending_decorations`) until the decorations
+    # have been applied so the other threads that access as_view() in the meantime wait on the lock.
+    try:
+        for view_class_decorator in view_class.__dict__['_pending_view_class_decorators']:
+            view_class_decorator._decorate(view_class)
+    finally:
+        # Restoring the original as_view() of the view class (if any) if `ViewClassDecorator` hasn't replaced the lazy
+        # hook because one of the bases of the view class has already been decorated.
+        lazy_as_view = view_class.__dict__.get('as_view')
+        if isinstance(lazy_as_view, _LazyAsViewDecorator):
+            if lazy_as_view.wrapped_as_view is None:
+                delattr(view_class, 'as_view')
+            else:
+                view_class.as_view = lazy_as_view.wrapped_as_view
+        delattr(view_class, '_pending_view_class_decorators')
+        _classes_with_pending_decorations.discard(view_class)
+
+
+class _LazyAsViewDecorator(object):
+    """ Hooks the `as_view()` method of a lazily decorated view class. Accessing `as_view()` resolves the pending
+    decorations and returns the `as_view()` method of the decorated view class. """
+    def __init__(self, view_class):
+        super(_LazyAsViewDecorator, self).__init__()
+        # the as_view() method defined by the view class itself (if any) that is being replaced by this hook
+        self.wrapped_as_view = view_class.__dict__.get('as_view')
+
+    def __get__(self, instance, owner=None):
+        owner = owner or type(instance)
+        resolve_pending_view_class_decorations(owner)
+        return getattr(owner if instance is None else instance, 'as_view')
@@ -1,9 +1,13 @@
+import functools
 import inspect
 import types
 
-from ..five import getfullargspec, full_qualname, raise_from, update_wrapper, wraps
+from ..five import getfullargspec, full_qualname, raise_from, update_wrapper, wraps, iscoroutinefunction, \
+    markcoroutinefunction
 from ..utils import class_property
 from .view_class_decorator import view_class_decorator
+from . import compiled_wrappers
+from .. import instrumentation, latency_budgets, request_memo
 
 
 class ViewDecoratorBase(object):
@@ -11,6 +15,11 @@ class ViewDecoratorBase(object):
     can also be converted into a "universal decorator" that makes it compatible also with view classes and makes it
     possible to omit the parameter list and the surrounding parents when optional decorator arguments are omitted. """
 
+    # Set this to True in your subclass if its `_call_view_function()` uses the `request_memo` of the
+    # `decoration_instance`. The chains that contain such a decorator open a memo scope for the requests.
+    # See `django_universal_view_decorator.request_memo`.
+    uses_request_memo = False
+
     # We define this empty logicless __init__ because otherwise under python2 the
     # `inspect.getargspec(cls.__init__)` statement fails in our `num_required_args`
     # classproperty implementation.
@@ -21,7 +30,9 @@ class ViewDecoratorBase(object):
 
     def __call__(self, wrapped):
         """ Decorates/wraps a view function or view class method. """
-        decoration_instance = _ViewDecoration(wrapped, self, self._call_view_function)
+        call_view_function = self._async_call_view_function if iscoroutinefunction(wrapped) \
+            else self._call_view_function
+        decoration_instance = _ViewDecoration(wrapped, self, call_view_function)
         self._on_decoration_instance_created(decoration_instance)
         return decoration_instance
 
@@ -34,6 +45,14 @@ class ViewDecoratorBase(object):
         receives the `decoration_instance` parameter. """
         pass
 
+    def _warm_up(self, decoration_instance, view_function):
+        """ Override this if your decorator initializes something lazily on the first call of the decorated view
+        and it can be done in advance. Called by `_ViewDecoration.warm_up()` (e.g.: before the first request) with the
+        `view_function` that `_call_view_function()` receives in case of decorated regular view functions and with
+        None in case of view class methods. Return True if you have initialized something, False if there was
+        nothing to do. """
+        return False
+
     def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
         """
         Override this to handle regular view functions, view classes, and view class methods in a unified way.
@@ -42,6 +61,16 @@ class ViewDecoratorBase(object):
         """
         return view_function(*args, **kwargs)
 
+    def _async_call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        """
+        This is used instead of `_call_view_function()` when the decorated view is a coroutine function (async view).
+        In this case `view_function` is also a coroutine function and the return value has to be awaitable.
+        The default implementation calls `_call_view_function()` that returns the coroutine returned by the
+        view_function if it doesn't do anything with the response. Override this with an `async def` if your
+        decorator has to await something or it has to work with the response of async views.
+        """
+        return self._call_view_function(decoration_instance, view_class_instance, view_function, *args, **kwargs)
+
     @class_property
     def num_required_args(cls):
         """
@@ -53,7 +82,13 @@ class ViewDecoratorBase(object):
         case this property returns -1 indicating that the `()` after the decorator is optional. If you want to make
         the `()` required in case of zero args you can explicitly set the `num_required_args = 0` class attribute on
         your decorator class.
+        The value is calculated only once per decorator class (and `__init__()` implementation).
         """
+        return cls.__get_cached('_view_decorator_num_required_args_cache', (),
+                                cls.__calculate_num_required_args)
+
+    @classmethod
+    def __calculate_num_required_args(cls):
         argspec = getfullargspec(cls.__init__)
         if (len(argspec.args), argspec.varargs, argspec.varkw, argspec.defaults) == (1, None, None, None):
             return None
@@ -65,8 +100,14 @@ class ViewDecoratorBase(object):
     @class_property
     def universal_decorator(cls):
         """ Returns a decorator that can be used to decorate regular view functions, view classes and view class
-        methods. At the same time it handles optional decorator arguments. """
+        methods. At the same time it handles optional decorator arguments. The returned decorator is created only
+        once per decorator class (and `num_required_args` value). """
         num_required_args = cls.num_required_args
+        return cls.__get_cached('_view_decorator_universal_decorator_cache', (num_required_args,),
+                                lambda: cls.__create_universal_decorator(num_required_args))
+
+    @classmethod
+    def __create_universal_decorator(cls, num_required_args):
         if num_required_args is None:
             return cls.__transform_to_universal_decorator()
 
@@ -79,6 +120,20 @@ class ViewDecoratorBase(object):
         decorator_with_optional_args.__name__ = '{}.universal_decorator_with_optional_args'.format(cls.__name__)
         return decorator_with_optional_args
 
+    @classmethod
+    def __get_cached(cls, cache_attribute_name, key, calculate):
+        """ Caches a value in the `__dict__` of `cls`. Subclasses don't see the cached values of their base classes
+        and the cache is invalidated if the `__init__()` of the class changes (e.g.: it gets monkey patched). """
+        init = cls.__init__
+        # python2 creates a new unbound method object every time we access cls.__init__
+        init = getattr(init, '__func__', init)
+        cached = cls.__dict__.get(cache_attribute_name)
+        if cached is not None and cached[0] is init and cached[1] == key:
+            return cached[2]
+        value = calculate()
+        setattr(cls, cache_attribute_name, (init, key, value))
+        return value
+
     @classmethod
     def __transform_to_universal_decorator(cls, *args, **kwargs):
         """ Returns a decorator that auto-detects the type of the decorated object (regular view function, view
@@ -166,11 +221,27 @@ class ViewDecoratorBase(object):
         return False
 
 
+# The default implementation returns the awaitable returned by the view function.
+markcoroutinefunction(ViewDecoratorBase._async_call_view_function)
+
+
 class _ViewDecoration(object):
     """ A decorator/wrapper for view functions and view class methods. An instance of this class is used as a
     wrapper object every time you decorate something with `ViewDecoratorBase`. The `decoration_instance` arg of
     the `ViewDecoratorBase._on_decoration_instance_created()` and `ViewDecoratorBase._call_view_function()` methods
     is an instance of this class. """
+
+    # Set by the subclasses generated for the views that have compiled wrappers (the parameter names of the view).
+    compiled_parameter_names = None
+
+    def __new__(cls, wrapped, view_decorator, call_view_function):
+        if cls is _ViewDecoration and compiled_wrappers.is_enabled():
+            view_function = wrapped.view_function if isinstance(wrapped, _ViewDecoration) else wrapped
+            parameter_names = compiled_wrappers.get_parameter_names(view_function)
+            if parameter_names is not None:
+                cls = _get_compiled_view_decoration_class(parameter_names)
+        return super(_ViewDecoration, cls).__new__(cls)
+
     def __init__(self, wrapped, view_decorator, call_view_function):
         super(_ViewDecoration, self).__init__()
         assert inspect.isroutine(wrapped)
@@ -185,17 +256,169 @@ class _ViewDecoration(object):
         self.wrapped = wrapped
         # self.view_decorator for debugging
         self.view_decorator = view_decorator
+
+        # Stacked decorations are fused: if we wrap another _ViewDecoration then we take over its stages and call its
+        # `call_view_function` directly instead of calling it through the wrapped decoration object. This way the
+        # stages of the stacked decorations are driven by the outermost decoration without the extra call frames
+        # and argument repacking of the inner decorations. `stages` contains (decoration_instance, call_view_function)
+        # pairs, the outermost (our own) stage is the first. `view_function` is the innermost decorated routine.
+        self.view_function = wrapped.view_function if isinstance(wrapped, _ViewDecoration) else wrapped
+
+        # Async views remain async: django checks whether a view is a coroutine function to decide whether to await
+        # it or to run it in a worker thread.
+        self.is_async = iscoroutinefunction(self.view_function)
+        self.stage_class = _AsyncViewDecorationStage if self.is_async else _ViewDecorationStage
+
+        # A view decorator with a latency budget checks the exclusive time of its stage.
+        if not self.is_async:
+            layer_name = instrumentation.get_layer_name(view_decorator)
+            latency_budget = latency_budgets.get_latency_budget(view_decorator, layer_name)
+            if latency_budget is not None:
+                call_view_function = latency_budgets.budget_call_view_function(
+                    call_view_function, instrumentation.get_view_name(self.view_function), layer_name, latency_budget)
+
+        # With the instrumentation settings (see `instrumentation.get_options()`) our stage and the decorated view are
+        # wrapped into instrumented layers. `view_function_to_call` is the (instrumented) view function.
+        self.view_function_to_call = self.view_function
+        instrumentation_options = None if self.is_async else instrumentation.get_options()
+        if instrumentation_options is not None:
+            view_name = instrumentation.get_view_name(self.view_function)
+            call_view_function = instrumentation.instrument_layer(call_view_function, view_name,
+                                                                  instrumentation.get_layer_name(view_decorator),
+                                                                  instrumentation_options)
+            self.view_function_to_call = instrumentation.instrument_view(self.view_function, instrumentation_options,
+                                                                         view_name)
+            instrumentation.mark_instrumented(self)
         self.call_view_function = call_view_function
 
+        if isinstance(wrapped, _ViewDecoration):
+            self.stages = ((self, call_view_function),) + wrapped.stages
+        else:
+            self.stages = ((self, call_view_function),)
+        self.inner_stages_reversed = tuple(reversed(self.stages[1:]))
+
+        # The view_function we pass to our own stage in case of decorated regular view functions.
+        view_function = self.view_function_to_call
+        for decoration_instance, inner_call_view_function in self.inner_stages_reversed:
+            view_function = self.stage_class(inner_call_view_function, decoration_instance, None, view_function)
+        self.inner_view_function = view_function
+
+        # Our stage is the entry point of the fused stages: it opens the request memo scope if one of them uses it.
+        # The inner stages of a wrapping decoration call the original `call_view_function` of our stage.
+        if any(request_memo.uses_request_memo(decoration_instance.view_decorator)
+               for decoration_instance, _ in self.stages):
+            self.call_view_function = request_memo.open_memo_scope(call_view_function, self.is_async)
+
+        self.view_method_wrapper = self.__create_view_method_wrapper()
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __create_view_method_wrapper(self):
+        """ Creates the function that is bound to view class instances in `__get__()`. Every view class instance
+        shares this function so we have to copy the metadata of the wrapped method only once. """
+        view_function = self.view_function_to_call
+        inner_stages_reversed = self.inner_stages_reversed
+        call_view_function = self.call_view_function
+        stage_class = self.stage_class
+
+        create_view_method_wrapper = None
+        if self.compiled_parameter_names:
+            create_view_method_wrapper = compiled_wrappers.get_view_method_wrapper_factory(
+                self.compiled_parameter_names)
+        if create_view_method_wrapper is not None:
+            view_method_wrapper = create_view_method_wrapper(self, view_function, inner_stages_reversed,
+                                                             call_view_function, stage_class)
+        else:
+            def view_method_wrapper(view_class_instance, *args, **kwargs):
+                bound_view_method = view_function.__get__(view_class_instance, type(view_class_instance))
+                for decoration_instance, inner_call_view_function in inner_stages_reversed:
+                    bound_view_method = stage_class(inner_call_view_function, decoration_instance,
+                                                    view_class_instance, bound_view_method)
+                return call_view_function(self, view_class_instance, bound_view_method, *args, **kwargs)
+        update_wrapper(view_method_wrapper, self.wrapped)
+        if self.is_async:
+            markcoroutinefunction(view_method_wrapper)
+        return view_method_wrapper
+
+    @property
+    def request_memo(self):
+        """ The memo dict of the request that is being processed. It is shared by the layers of the decorator chains
+        and the view and it is discarded when the request leaves the chain. Available only if the view decorator (or
+        another decorator of the chain) has the `uses_request_memo = True` class attribute. """
+        memo = request_memo.get_request_memo()
+        if memo is None:
+            raise RuntimeError('The request memo is available only in decorator chains that contain a view '
+                               'decorator with the uses_request_memo = True class attribute.')
+        return memo
+
+    def warm_up(self, is_view_class_method=False):
+        """ Calls the `_warm_up()` of the decorators of all fused stages with the view function they receive when
+        this decoration is called. Returns the number of stages that have initialized something. """
+        num_warmed_up = 0
+        view_function = self.inner_view_function
+        for decoration_instance, _ in self.stages:
+            if decoration_instance.view_decorator._warm_up(decoration_instance,
+                                                           None if is_view_class_method else view_function):
+                num_warmed_up += 1
+            if isinstance(view_function, _ViewDecorationStage):
+                # the partial args are (decoration_instance, view_class_instance, view_function)
+                view_function = view_function.args[2]
+        return num_warmed_up
+
     def __call__(self, *args, **kwargs):
         # This is called when a decorated regular view function is called
-        return self.call_view_function(self, None, self.wrapped, *args, **kwargs)
+        return self.call_view_function(self, None, self.inner_view_function, *args, **kwargs)
 
     def __get__(self, instance, owner=None):
         # This is called when a decorated view method is bound before calling it.
+        if instance is not None:
+            # This is the hot path: view methods are looked up on the view class instance at least once per request.
+            # The only allocation here is the bound method itself - the same as in case of undecorated methods.
+            return types.MethodType(self.view_method_wrapper, instance)
+
         bound_view_method = self.wrapped.__get__(instance, owner)
 
         @wraps(bound_view_method)
         def wrapper(self_2, *args, **kwargs):
             return self.call_view_function(self, self_2, bound_view_method, *args, **kwargs)
-        return types.MethodType(wrapper, instance or owner)
+        if self.is_async:
+            markcoroutinefunction(wrapper)
+        return types.MethodType(wrapper, owner)
+
+
+_compiled_view_decoration_classes = {}
+
+
+def _get_compiled_view_decoration_class(parameter_names):
+    """ Returns a `_ViewDecoration` subclass for the views that have the specified parameters. The subclass has a
+    generated `__call__()` if the view can be a view function that receives only the request. The classes are shared
+    by the decorated views that have the same parameter names. """
+    cls = _compiled_view_decoration_classes.get(parameter_names)
+    if cls is None:
+        namespace = dict(__module__=_ViewDecoration.__module__, compiled_parameter_names=parameter_names)
+        call_method = compiled_wrappers.get_view_decoration_call_method(parameter_names)
+        if call_method is not None:
+            namespace['__call__'] = call_method
+        cls = type(_ViewDecoration.__name__, (_ViewDecoration,), namespace)
+        cls = _compiled_view_decoration_classes.setdefault(parameter_names, cls)
+    return cls
+
+
+class _ViewDecorationStage(functools.partial):
+    # The view_function that is passed to the `call_view_function` of a fused _ViewDecoration stage when there
+    # are inner stages. Calling it calls the `call_view_function` of the next stage without creating an extra python
+    # call frame. The partial args are (decoration_instance, view_class_instance, view_function) and the metadata
+    # of the view function is taken from the decoration instance that has received it with update_wrapper().
+    __slots__ = ()
+
+    __name__ = property(lambda self: self.args[0].__name__)
+    __doc__ = property(lambda self: self.args[0].__doc__)
+    __wrapped__ = property(lambda self: self.args[0].wrapped)
+
+
+class _AsyncViewDecorationStage(_ViewDecorationStage):
+    # The stage of an async view: calling it returns an awaitable.
+    __slots__ = ()
+
+
+markcoroutinefunction(_AsyncViewDecorationStage)
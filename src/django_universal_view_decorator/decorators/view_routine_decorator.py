@@ -1,6 +1,17 @@
+from .. import instrumentation, latency_budgets
+from ..conf import COMPOSE_VIEW_METHOD_CHAINS_ONCE, get_setting
+from ..five import ContextVar, full_qualname, update_wrapper, markcoroutinefunction, call_with_context_var_async
+from .decorator_with_attributes import unwrap_decorator
 from .view_decorator_base import ViewDecoratorBase
 
 
+# The bound view method that is being called through a composed decorator chain. With the
+# `UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE` setting the chain of a decorated view class method is
+# composed only once (per decoration) so the innermost function of the chain has to receive the current bound method
+# through this variable.
+_current_bound_view_method = ContextVar('django_universal_view_decorator.current_bound_view_method')
+
+
 class ViewRoutineDecorator(ViewDecoratorBase):
     # Currently we are using ViewRoutineDecorator directly without transforming it into a universal_decorator
     # but in case someone transformed it to a universal one it is better to make decorator arguments mandatory.
@@ -9,15 +20,134 @@ class ViewRoutineDecorator(ViewDecoratorBase):
     num_required_args = 0
 
     """ Converts a decorator or a list of decorators into a routine decorator that can be applied to both regular view
-    functions and view class methods (for example to `View.dispatch()` or `View.get()`). """
+    functions and view class methods (for example to `View.dispatch()` or `View.get()`).
+
+    The chain of wrapped decorators applied to a regular view function is composed only once per decoration and
+    reused by all subsequent calls. The chain of a view class method is composed around the bound method on every
+    call unless the `UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE` setting was True at decoration time. A
+    legacy decorator that depends on being applied to the view function separately for each call (e.g.: because it
+    does some per-call work outside of the wrapper function it returns) can opt out of the reuse by having a
+    `decorator_compose_per_call` attribute with a True value. If any of the wrapped decorators opts out then the
+    chain is composed on every call - this was the original behavior of this class. """
     def __init__(self, *decorators):
         super(ViewRoutineDecorator, self).__init__()
         self.decorators = decorators
+        # the decorators we actually apply when we compose the chain
+        self.unwrapped_decorators = tuple(unwrap_decorator(decorator) for decorator in decorators)
+        self.compose_per_call = any(getattr(decorator, 'decorator_compose_per_call', False)
+                                    for decorator in decorators)
+        self.compose_view_method_chains_once = bool(get_setting(COMPOSE_VIEW_METHOD_CHAINS_ONCE, False))
+        # the instrumentation settings and the latency budgets (None if no decorator has a budget) at decoration time
+        self.instrumentation_options = instrumentation.get_options()
+        self.latency_budgets = tuple(
+            latency_budgets.get_latency_budget(decorator, instrumentation.get_layer_name(unwrapped_decorator))
+            for decorator, unwrapped_decorator in zip(decorators, self.unwrapped_decorators)
+        )
+        if all(latency_budget is None for latency_budget in self.latency_budgets):
+            self.latency_budgets = None
 
     def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
-        for decorator in reversed(self.decorators):
-            view_function = decorator(view_function)
-        return view_function(*args, **kwargs)
+        if self.compose_per_call:
+            return self._compose(decoration_instance, view_function)(*args, **kwargs)
+
+        if view_class_instance is None:
+            return self._get_composed_view_function(decoration_instance, view_function)(*args, **kwargs)
+
+        if not self.compose_view_method_chains_once:
+            # the decorators receive the bound method (they may call it on another thread)
+            return self._compose(decoration_instance, view_function)(*args, **kwargs)
+
+        token = _current_bound_view_method.set(view_function)
+        try:
+            return self._get_composed_view_method(decoration_instance)(*args, **kwargs)
+        finally:
+            _current_bound_view_method.reset(token)
+
+    def _async_call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        if self.compose_per_call or view_class_instance is None or not self.compose_view_method_chains_once:
+            return self._call_view_function(decoration_instance, view_class_instance, view_function, *args, **kwargs)
+        # Async decorators may call the trampoline after awaiting something so the bound method has to remain
+        # available until the whole chain has been awaited.
+        return call_with_context_var_async(_current_bound_view_method, view_function,
+                                           self._get_composed_view_method(decoration_instance), *args, **kwargs)
+
+    def _warm_up(self, decoration_instance, view_function):
+        if self.compose_per_call:
+            return False
+        if view_function is None:
+            if not self.compose_view_method_chains_once:
+                return False
+            # The first set() and reset() of the context variable replace the variable mapping of the context of the
+            # current thread. Doing this in advance keeps the first request from creating a lasting mapping (in
+            # processes forked after the warm-up too).
+            _current_bound_view_method.reset(_current_bound_view_method.set(None))
+            composed = getattr(decoration_instance, 'composed_view_method', None)
+            return self._get_composed_view_method(decoration_instance) is not (composed and composed[1])
+        composed = getattr(decoration_instance, 'composed_view_function', None)
+        return self._get_composed_view_function(decoration_instance, view_function) is not (composed and composed[1])
+
+    def _get_composed_view_function(self, decoration_instance, view_function):
+        # regular view function: the view_function is the same object in case of every call
+        composed = getattr(decoration_instance, 'composed_view_function', None)
+        if composed is None or composed[0] is not view_function:
+            composed = (view_function, self._compose(decoration_instance, view_function))
+            decoration_instance.composed_view_function = composed
+        return composed[1]
+
+    def _get_composed_view_method(self, decoration_instance):
+        # View class method: view_function is a new bound method in case of every call so we compose the chain
+        # around a trampoline that calls the current bound method. This way the same chain can be used with all
+        # view class instances (and with all subclasses of the view class that inherit the decorated method).
+        # The cache is keyed with self because update_wrapper() copies the attributes of a decoration instance to
+        # the decoration instance that wraps it.
+        composed = getattr(decoration_instance, 'composed_view_method', None)
+        if composed is None or composed[0] is not self:
+            composed = (self, self._compose(decoration_instance,
+                                            self._create_bound_view_method_trampoline(decoration_instance)))
+            decoration_instance.composed_view_method = composed
+        return composed[1]
+
+    def _compose(self, decoration_instance, view_function):
+        if (self.instrumentation_options is None and self.latency_budgets is None) or decoration_instance.is_async:
+            for decorator in reversed(self.unwrapped_decorators):
+                view_function = decorator(view_function)
+            return view_function
+
+        # The decorated view itself is instrumented by the decoration instance.
+        view_name = instrumentation.get_view_name(decoration_instance.view_function)
+        budgets = self.latency_budgets or (None,) * len(self.unwrapped_decorators)
+        for decorator, latency_budget in reversed(tuple(zip(self.unwrapped_decorators, budgets))):
+            layer_name = instrumentation.get_layer_name(decorator)
+            if latency_budget is None:
+                view_function = decorator(view_function)
+            else:
+                view_function = latency_budgets.apply_decorator(decorator, view_function, view_name, layer_name,
+                                                                latency_budget)
+            if self.instrumentation_options is not None:
+                view_function = instrumentation.instrument_layer(view_function, view_name, layer_name,
+                                                                 self.instrumentation_options)
+        return view_function
+
+    @staticmethod
+    def _create_bound_view_method_trampoline(decoration_instance):
+        def bound_view_method_trampoline(*args, **kwargs):
+            try:
+                bound_view_method = _current_bound_view_method.get()
+            except LookupError:
+                raise RuntimeError(
+                    'The view method {} has been called outside of the context of the request (e.g.: on another '
+                    'thread) by a decorator. Decorators that do this require the '
+                    'UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE setting to be False.'.format(
+                        full_qualname(decoration_instance.view_function)))
+            return bound_view_method(*args, **kwargs)
+        # The wrapped decorators see the trampoline as the view function so it should look like the decorated method.
+        update_wrapper(bound_view_method_trampoline, decoration_instance.wrapped)
+        if decoration_instance.is_async:
+            markcoroutinefunction(bound_view_method_trampoline)
+        return bound_view_method_trampoline
+
+
+markcoroutinefunction(ViewRoutineDecorator._async_call_view_function)
 
 
 view_routine_decorator = ViewRoutineDecorator
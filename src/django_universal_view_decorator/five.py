@@ -1,9 +1,11 @@
 import sys
 import inspect
+import threading
 
 
 __all__ = ['PY2', 'PY3', 'qualname', 'full_qualname', 'getfullargspec', 'FullArgSpec', 'raise_from',
-           'update_wrapper', 'wraps']
+           'update_wrapper', 'wraps', 'ContextVar', 'iscoroutinefunction', 'markcoroutinefunction',
+           'call_with_context_var_async', 'async_return', 'string_types']
 
 
 PY2 = sys.version_info.major == 2
@@ -26,6 +28,8 @@ if PY3:
     from inspect import getfullargspec, FullArgSpec
     from functools import update_wrapper, wraps
 
+    string_types = (str,)
+
 
     def qualname(obj):
         if not hasattr(obj, '__name__') and hasattr(type(obj), '__name__'):
@@ -43,6 +47,8 @@ elif PY2:
     from functools import partial, WRAPPER_ASSIGNMENTS, WRAPPER_UPDATES
     import traceback
 
+    string_types = (basestring,)
+
     # Under python2 we simulate the interface of the python3 getfullargspec(). Under python3 we have to use
     # getfullargspec() because getargspec() fails with ValueError in case of functions that have kwonlyargs.
     FullArgSpec = namedtuple('FullArgSpec', 'args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, annotations')
@@ -133,3 +139,90 @@ elif PY2:
         """
         return partial(update_wrapper, wrapped=wrapped,
                        assigned=assigned, updated=updated)
+
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    # Python2 and python3<3.7 don't have contextvars. We emulate the subset of the interface we use with a
+    # thread-local. This is good enough because on these pythons django serves every request on its own thread.
+    class ContextVar(object):
+        __missing = object()
+
+        def __init__(self, name, default=__missing):
+            super(ContextVar, self).__init__()
+            self.name = name
+            self.__default = default
+            self.__local = threading.local()
+
+        def get(self, *default):
+            value = getattr(self.__local, 'value', self.__missing)
+            if value is not self.__missing:
+                return value
+            if default:
+                return default[0]
+            if self.__default is not self.__missing:
+                return self.__default
+            raise LookupError(self)
+
+        def set(self, value):
+            token = _ContextVarToken(getattr(self.__local, 'value', self.__missing))
+            self.__local.value = value
+            return token
+
+        def reset(self, token):
+            if token.old_value is self.__missing:
+                del self.__local.value
+            else:
+                self.__local.value = token.old_value
+
+
+    class _ContextVarToken(object):
+        def __init__(self, old_value):
+            super(_ContextVarToken, self).__init__()
+            self.old_value = old_value
+
+
+try:
+    # asgiref knows about the coroutine function markers of all python versions (django uses these functions too)
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:
+    try:
+        import asyncio
+    except ImportError:
+        # python2: there are no coroutine functions
+        def iscoroutinefunction(func):
+            return False
+
+        def markcoroutinefunction(func):
+            return func
+    else:
+        iscoroutinefunction = asyncio.iscoroutinefunction
+
+        def markcoroutinefunction(func):
+            if hasattr(func, '__func__'):
+                func = func.__func__
+            func._is_coroutine = asyncio.coroutines._is_coroutine
+            return func
+
+
+if sys.version_info >= (3, 5):
+    exec("""async def call_with_context_var_async(context_var, value, coroutine_function, *args, **kwargs):
+    token = context_var.set(value)
+    try:
+        return await coroutine_function(*args, **kwargs)
+    finally:
+        context_var.reset(token)
+
+
+async def async_return(value):
+    return value
+    """)
+else:
+    # The async view support requires the `async def` syntax of python 3.5. These functions are called only with
+    # coroutine functions so they aren't used by the views of the older pythons.
+    def call_with_context_var_async(context_var, value, coroutine_function, *args, **kwargs):
+        raise NotImplementedError('Async views require python 3.5 or newer.')
+
+    def async_return(value):
+        raise NotImplementedError('Async views require python 3.5 or newer.')
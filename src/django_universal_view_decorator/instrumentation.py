@@ -0,0 +1,234 @@
+""" Opt-in per-layer latency instrumentation of decorated views.
+
+When the `UNIVERSAL_VIEW_DECORATOR_INSTRUMENTATION` setting is True the decorator chains are built with timing
+wrappers around each layer: the decorators applied by `universal_view_decorator` (to view functions, view class
+methods and view classes), the `_call_view_function()` of `ViewDecoratorBase` decorators and the decorated view
+itself (with the `VIEW_LAYER_NAME` layer name). The setting is checked when the chains are built (at decoration time,
+in case of view classes when `as_view()` is called) so the chains built with a False setting don't contain timing
+code at all.
+
+Each layer reports its exclusive time: the time spent in the layer minus the time spent in the instrumented layers
+it has called. The measurements are passed to the registered sinks:
+
+.. code-block:: python
+
+    from django_universal_view_decorator.instrumentation import HistogramSink, LoggingSink, add_sink
+
+    histograms = add_sink(HistogramSink())
+    add_sink(LoggingSink())
+
+The instrumented layers are also used by the sampling tracer of `django_universal_view_decorator.tracing` (the
+`UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE` setting) and by the query accounting of
+`django_universal_view_decorator.query_accounting` (the `UNIVERSAL_VIEW_DECORATOR_QUERY_ACCOUNTING` setting). The
+chains of async views aren't instrumented.
+"""
+import array
+import bisect
+import collections
+import logging
+import threading
+import timeit
+
+from . import query_accounting, tracing
+from .conf import INSTRUMENTATION, get_setting
+from .five import ContextVar, full_qualname, update_wrapper, iscoroutinefunction
+
+
+# The layer name of the decorated view itself.
+VIEW_LAYER_NAME = '<view>'
+
+_timer = timeit.default_timer
+
+# The frame of the instrumented layer that is being executed: a list with one item that accumulates the total time of
+# the instrumented layers called by the current layer.
+_current_frame = ContextVar('django_universal_view_decorator.instrumentation.current_frame')
+
+_sinks_lock = threading.Lock()
+_sinks = ()
+
+
+# `timing` is the `UNIVERSAL_VIEW_DECORATOR_INSTRUMENTATION` setting, `trace_sample_rate` is the
+# `UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE` setting and `query_accounting` is the
+# `UNIVERSAL_VIEW_DECORATOR_QUERY_ACCOUNTING` setting. The options are captured when the building of a chain starts
+# because some layers are created later (e.g.: the composed chain of `universal_view_decorator`).
+InstrumentationOptions = collections.namedtuple('InstrumentationOptions', 'timing trace_sample_rate query_accounting')
+
+
+def get_options():
+    """ Returns the `InstrumentationOptions` of the chains built now or None if the chains don't have to be
+    instrumented. """
+    timing = bool(get_setting(INSTRUMENTATION, False))
+    trace_sample_rate = tracing.get_sample_rate()
+    accounting = query_accounting.is_enabled()
+    if not timing and trace_sample_rate is None and not accounting:
+        return None
+    return InstrumentationOptions(timing, trace_sample_rate, accounting)
+
+
+def add_sink(sink):
+    """ Registers a sink that receives the measurements of the instrumented layers. A sink is an object with a
+    `record(view_name, layer_name, seconds)` method. Returns the sink. """
+    global _sinks
+    with _sinks_lock:
+        _sinks += (sink,)
+    return sink
+
+
+def remove_sink(sink):
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+def get_sinks():
+    return _sinks
+
+
+def get_layer_name(decorator):
+    return full_qualname(decorator)
+
+
+def instrument_layer(function, view_name, layer_name, options):
+    """ Returns a wrapper that calls function and reports its exclusive time (`options.timing`), records its spans in
+    sampled traces (`options.trace_sample_rate`) and/or attributes the database queries to the layer
+    (`options.query_accounting`). `options` is returned by `get_options()`. Async functions are returned as is. """
+    if iscoroutinefunction(function):
+        return function
+    instrumented_layer = function
+    if options.query_accounting:
+        instrumented_layer = query_accounting.account_layer(instrumented_layer, view_name, layer_name)
+    if options.timing:
+        instrumented_layer = _time_layer(instrumented_layer, view_name, layer_name)
+    if options.trace_sample_rate is not None:
+        instrumented_layer = tracing.trace_layer(instrumented_layer, view_name, layer_name,
+                                                 layer_name == VIEW_LAYER_NAME, options.trace_sample_rate)
+    mark_instrumented(instrumented_layer)
+    return instrumented_layer
+
+
+def _time_layer(function, view_name, layer_name):
+    def timed_layer(*args, **kwargs):
+        parent_frame = _current_frame.get(None)
+        frame = [0.0]
+        token = _current_frame.set(frame)
+        start = _timer()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            total = _timer() - start
+            _current_frame.reset(token)
+            if parent_frame is not None:
+                parent_frame[0] += total
+            for sink in _sinks:
+                sink.record(view_name, layer_name, total - frame[0])
+    update_wrapper(timed_layer, function)
+    return timed_layer
+
+
+def mark_instrumented(function):
+    """ Marks a function (e.g.: a `_ViewDecoration` object) that reports its own measurements so it isn't wrapped
+    into another instrumented layer. Wrappers that copy the __dict__ of the function get a reference to the function
+    instead of a True flag so they don't look like instrumented functions. """
+    function._uvd_instrumented = function
+
+
+def is_instrumented(function):
+    return getattr(function, '_uvd_instrumented', None) is function
+
+
+def instrument_view(view_function, options, view_name=None):
+    """ Returns the decorated view function wrapped into an instrumented layer with the `VIEW_LAYER_NAME` layer name.
+    Returns the view function as is if it is already instrumented (e.g.: a `ViewDecoratorBase` decorator in the
+    decorator chain of a view class receives the instrumented layers of the chain as view function). """
+    if is_instrumented(view_function):
+        return view_function
+    return instrument_layer(view_function, view_name or get_view_name(view_function), VIEW_LAYER_NAME, options)
+
+
+def get_view_name(view_function):
+    # the function returned by `View.as_view()` has a view_class attribute
+    view_class = getattr(view_function, 'view_class', None)
+    return full_qualname(view_class if view_class is not None else view_function)
+
+
+# Sinks
+
+
+class LayerHistogram(object):
+    """ A histogram with fixed bucket boundaries. `counts[i]` is the number of measurements that are less than or
+    equal to `buckets[i]`, the last item of `counts` is the number of larger measurements. """
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets):
+        super(LayerHistogram, self).__init__()
+        self.buckets = buckets
+        self.counts = array.array('L', [0] * (len(buckets) + 1))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """ Returns the upper boundary of the bucket that contains the specified percentile (or the maximum if the
+        percentile is in the overflow bucket). """
+        threshold = self.count * percent / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return 0.0
+
+    def __repr__(self):
+        return '{}(count={}, mean={:.1f}us, max={:.1f}us)'.format(type(self).__name__, self.count,
+                                                                  self.mean * 1000000, self.max * 1000000)
+
+
+class HistogramSink(object):
+    """ Aggregates the measurements in-process into a `LayerHistogram` per (view_name, layer_name) pair. """
+
+    # upper bucket boundaries in seconds: 1us ... 10s
+    DEFAULT_BUCKETS = tuple(base * 10 ** exponent for exponent in range(-6, 1) for base in (1, 2, 5)) + (10.0,)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        super(HistogramSink, self).__init__()
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, layer_name, seconds):
+        with self._lock:
+            histogram = self.histograms.get((view_name, layer_name))
+            if histogram is None:
+                histogram = self.histograms[(view_name, layer_name)] = LayerHistogram(self.buckets)
+            histogram.add(seconds)
+
+    def get_histogram(self, view_name, layer_name):
+        return self.histograms.get((view_name, layer_name))
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+
+class LoggingSink(object):
+    """ Logs every measurement. """
+    def __init__(self, logger=None, level=logging.DEBUG):
+        super(LoggingSink, self).__init__()
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def record(self, view_name, layer_name, seconds):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, '%(view)s %(layer)s %(microseconds).1fus',
+                            dict(view=view_name, layer=layer_name, microseconds=seconds * 1000000))
@@ -0,0 +1,216 @@
+""" Describes the decorator chains the library has built for the views of a URLconf.
+
+Used by the `view_decorator_chains` management command. The descriptions contain only the layers created by this
+library: the class-level chain of decorated view classes (the result of duplicate handling), the `_ViewDecoration`
+layers of decorated view functions and view class methods and the decorators of `universal_view_decorator` inside
+them. The number of python frames is an estimate: it assumes that a legacy decorator adds one frame.
+"""
+import collections
+import inspect
+import timeit
+
+from .decorators.view_class_decorator import resolve_pending_view_class_decorations
+from .decorators.view_decorator_base import ViewDecoratorBase, _ViewDecoration
+from .decorators.view_routine_decorator import ViewRoutineDecorator
+from .five import full_qualname
+
+try:
+    from django.urls import get_resolver
+except ImportError:
+    # django<1.10
+    from django.core.urlresolvers import get_resolver
+
+
+# `pattern` is the full pattern of a URL (the patterns of the including URLconfs are prefixed), `name` is the
+# (namespaced) URL name or None, `url_patterns` contains the including resolvers and the URL pattern itself.
+URLPatternView = collections.namedtuple('URLPatternView', 'pattern name callback url_patterns')
+
+# A layer of a decorator chain: `name` is the qualified name of the decorator and `view_class` is the view class the
+# decorator has been applied to (only in case of class-level chains).
+Layer = collections.namedtuple('Layer', 'name view_class')
+
+# `layers` lists the layers from the outermost to the innermost one. `decoration` is the `_ViewDecoration` object of
+# decorated view functions and view class methods, None in case of class-level chains.
+Chain = collections.namedtuple('Chain', 'name layers num_frames decoration')
+
+ViewDescription = collections.namedtuple('ViewDescription', 'view_name view_class chains')
+
+
+def iter_url_pattern_views(urlconf=None):
+    """ Yields a `URLPatternView` for each URL pattern of the URLconf (`ROOT_URLCONF` by default). """
+    return _iter_url_pattern_views(get_resolver(urlconf).url_patterns, '', '', ())
+
+
+def _iter_url_pattern_views(url_patterns, prefix, namespace_prefix, parents):
+    for url_pattern in url_patterns:
+        pattern = prefix + _get_pattern_string(url_pattern)
+        # A resolver has url_patterns (`include()`), a pattern has a callback.
+        if hasattr(url_pattern, 'url_patterns'):
+            namespace = getattr(url_pattern, 'namespace', None)
+            included_namespace_prefix = namespace_prefix + namespace + ':' if namespace else namespace_prefix
+            for url_pattern_view in _iter_url_pattern_views(url_pattern.url_patterns, pattern,
+                                                            included_namespace_prefix, parents + (url_pattern,)):
+                yield url_pattern_view
+        else:
+            name = namespace_prefix + url_pattern.name if url_pattern.name else None
+            yield URLPatternView(pattern, name, url_pattern.callback, parents + (url_pattern,))
+
+
+def _get_pattern_string(url_pattern):
+    pattern = getattr(url_pattern, 'pattern', None)
+    if pattern is not None:
+        # django>=2.0
+        return str(pattern)
+    return url_pattern.regex.pattern
+
+
+def get_stub_url_kwargs(url_pattern_view):
+    """ Returns keyword arguments for the view of the URL pattern: a '1' for each named group or path converter
+    (converted to python by the converter if possible) along with the extra kwargs of the URL patterns. """
+    kwargs = {}
+    for url_pattern in url_pattern_view.url_patterns:
+        pattern = getattr(url_pattern, 'pattern', None)
+        regex = pattern.regex if pattern is not None else url_pattern.regex
+        converters = getattr(pattern, 'converters', {})
+        for name in regex.groupindex:
+            try:
+                kwargs[name] = converters[name].to_python('1') if name in converters else '1'
+            except ValueError:
+                kwargs[name] = '1'
+        kwargs.update(getattr(url_pattern, 'default_args', None) or getattr(url_pattern, 'default_kwargs', {}))
+    return kwargs
+
+
+def describe_view(callback):
+    """ Returns a `ViewDescription` that contains the chains of the view: the chain of a decorated view function, the
+    class-level chain of a decorated view class and the chains of its decorated handler methods (and `dispatch()`).
+    The view class is found through the `view_class` attribute of the view function returned by `as_view()` so the
+    decorators applied to that view function (e.g.: in the URLconf) have to copy its attributes and they aren't
+    described. """
+    view_class = _find_view_class(callback)
+    chains = []
+    decoration = _find_view_decoration(callback)
+    if view_class is None:
+        if decoration is not None:
+            chains.append(describe_view_decoration('view function', decoration, is_view_class_method=False))
+        return ViewDescription(full_qualname(callback), None, chains)
+
+    resolve_pending_view_class_decorations(view_class)
+    class_chain = getattr(view_class, '_view_class_decorator_chain', None)
+    if class_chain is not None:
+        chains.append(describe_view_class_decorator_chain(class_chain))
+    for method_name, decoration in _iter_decorated_methods(view_class):
+        chains.append(describe_view_decoration(method_name, decoration, is_view_class_method=True))
+    return ViewDescription(full_qualname(view_class), view_class, chains)
+
+
+def describe_view_class_decorator_chain(chain):
+    layers = [Layer(full_qualname(decorator), view_class)
+              for decorator, view_class in zip(chain.decorators, chain.view_classes)]
+    # Stacked `ViewDecoratorBase` decorators are fused into one `_ViewDecoration` object that adds one frame plus one
+    # frame per decorator.
+    num_frames = 0
+    previous_is_view_decorator_base = False
+    for decorator in chain.decorators:
+        is_view_decorator_base = isinstance(decorator, ViewDecoratorBase)
+        num_frames += 1 + (is_view_decorator_base and not previous_is_view_decorator_base)
+        previous_is_view_decorator_base = is_view_decorator_base
+    return Chain('class', list(reversed(layers)), num_frames, None)
+
+
+def describe_view_decoration(name, decoration, is_view_class_method):
+    layers = []
+    # the __call__() of the decoration or the view_method_wrapper
+    num_frames = 1
+    for decoration_instance, _ in decoration.stages:
+        view_decorator = decoration_instance.view_decorator
+        # the call_view_function of the stage
+        num_frames += 1
+        if isinstance(view_decorator, ViewRoutineDecorator):
+            layers += [Layer(full_qualname(decorator), None) for decorator in view_decorator.unwrapped_decorators]
+            num_frames += len(view_decorator.unwrapped_decorators) + is_view_class_method
+        else:
+            layers.append(Layer(full_qualname(view_decorator), None))
+    return Chain(name, layers, num_frames, decoration)
+
+
+def _find_view_class(view):
+    # The view function returned by `View.as_view()` has a `view_class` attribute that is copied by most decorators.
+    for wrapper in _iter_wrappers(view):
+        view_class = getattr(wrapper, 'view_class', None)
+        if inspect.isclass(view_class):
+            return view_class
+    return None
+
+
+def _find_view_decoration(view):
+    for wrapper in _iter_wrappers(view):
+        if isinstance(wrapper, _ViewDecoration):
+            return wrapper
+    return None
+
+
+def _iter_wrappers(view):
+    """ Follows the `__wrapped__` chain of the decorators applied to the view (e.g.: in the URLconf). """
+    visited = set()
+    while view is not None and id(view) not in visited:
+        yield view
+        visited.add(id(view))
+        view = getattr(view, '__wrapped__', None)
+
+
+def _iter_decorated_methods(view_class):
+    method_names = ['dispatch'] + list(getattr(view_class, 'http_method_names', ()))
+    for method_name in method_names:
+        for cls in inspect.getmro(view_class):
+            if method_name in cls.__dict__:
+                if isinstance(cls.__dict__[method_name], _ViewDecoration):
+                    yield method_name, cls.__dict__[method_name]
+                break
+
+
+# Benchmark
+
+
+def benchmark_view(view_description, request, kwargs=None, number=1000):
+    """ Measures the overhead of the chains of the view with `benchmark_chain()`. Returns a dict that maps chain
+    names to the overhead. """
+    return collections.OrderedDict((chain.name, benchmark_chain(view_description, chain, request, kwargs, number))
+                                   for chain in view_description.chains)
+
+
+def benchmark_chain(view_description, chain, request, kwargs=None, number=1000):
+    """ Measures the overhead of a chain of the view in seconds per call. The chain is rebuilt around a stub view
+    that returns immediately so the code of the view isn't executed. The stub view is called with the request and
+    the keyword arguments (see `get_stub_url_kwargs()`). Decorators may short-circuit (e.g.: redirect) or fail with
+    the stub request. The chains of view class methods are called without the class-level chain. """
+    kwargs = kwargs or {}
+    view_class = view_description.view_class
+    if chain.decoration is None:
+        stub = view_class._view_class_decorator_chain.apply(_stub_view)
+        baseline = _stub_view
+    else:
+        # applying the decorators of the fused stages from the innermost one
+        stub = _stub_view if view_class is None else _stub_view_method
+        for decoration_instance, _ in reversed(chain.decoration.stages):
+            stub = decoration_instance.view_decorator(stub)
+        baseline = _stub_view
+        if view_class is not None:
+            instance = view_class.__new__(view_class)
+            instance.request, instance.args, instance.kwargs = request, (), kwargs
+            stub = stub.__get__(instance, view_class)
+            baseline = _stub_view_method.__get__(instance, view_class)
+    return _measure(stub, request, kwargs, number) - _measure(baseline, request, kwargs, number)
+
+
+def _measure(function, request, kwargs, number):
+    # The decorators may modify the kwargs.
+    return min(timeit.repeat(lambda: function(request, **dict(kwargs)), number=number, repeat=3)) / number
+
+
+def _stub_view(request, *args, **kwargs):
+    return None
+
+
+def _stub_view_method(self, request, *args, **kwargs):
+    return None
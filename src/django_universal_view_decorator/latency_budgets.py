@@ -0,0 +1,122 @@
+""" Per-layer latency budgets of the decorator chains.
+
+A decorator can declare the maximum exclusive time (in seconds) it is expected to spend in a request with a
+`decorator_latency_budget` attribute (a function attribute, a class attribute of `ViewDecoratorBase` subclasses or the
+`latency_budget` parameter of `universal_view_decorator`) or with the `UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGETS`
+setting that maps layer names (the qualified name of the decorator, see
+`django_universal_view_decorator.instrumentation.get_layer_name()`) to budgets. The setting overrides the attribute.
+
+Only the layers that have a budget are measured: the layer is wrapped into a timing wrapper and the view function
+passed to the decorator is wrapped into a wrapper that excludes the time spent in the inner layers. When a layer
+exceeds its budget a warning is logged by the `django_universal_view_decorator.latency_budgets` logger, at most once
+per `UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGET_WARNING_INTERVAL` seconds (60 by default) for each (view, layer) pair.
+The budgets are looked up when the chains are built. The chains of async views aren't measured.
+"""
+import logging
+import threading
+import timeit
+
+from .conf import LATENCY_BUDGETS, LATENCY_BUDGET_WARNING_INTERVAL, get_setting
+from .five import ContextVar, update_wrapper
+
+
+DEFAULT_WARNING_INTERVAL = 60.0
+
+logger = logging.getLogger(__name__)
+
+_timer = timeit.default_timer
+
+# The frame of the budgeted decorator layer that is being executed: a list with one item that accumulates the time
+# spent in the view function received by the decorator.
+_current_frame = ContextVar('django_universal_view_decorator.latency_budgets.current_frame')
+
+_warnings_lock = threading.Lock()
+# (view_name, layer_name) => [time of the last warning, number of suppressed warnings]
+_last_warnings = {}
+
+
+def get_latency_budget(decorator, layer_name):
+    """ Returns the budget of a decorator in seconds or None. """
+    budgets = get_setting(LATENCY_BUDGETS) or {}
+    if layer_name in budgets:
+        return budgets[layer_name]
+    return getattr(decorator, 'decorator_latency_budget', None)
+
+
+def apply_decorator(decorator, view_function, view_name, layer_name, budget):
+    """ Applies the decorator to the view function and returns the resulting layer wrapped into a wrapper that checks
+    the exclusive time of the layer against the budget. """
+    def budgeted_view_function(*args, **kwargs):
+        start = _timer()
+        try:
+            return view_function(*args, **kwargs)
+        finally:
+            frame = _current_frame.get(None)
+            if frame is not None:
+                frame[0] += _timer() - start
+    update_wrapper(budgeted_view_function, view_function)
+    layer = decorator(budgeted_view_function)
+
+    def budgeted_layer(*args, **kwargs):
+        frame = [0.0]
+        token = _current_frame.set(frame)
+        start = _timer()
+        try:
+            return layer(*args, **kwargs)
+        finally:
+            seconds = _timer() - start - frame[0]
+            _current_frame.reset(token)
+            if seconds > budget:
+                report(view_name, layer_name, seconds, budget)
+    update_wrapper(budgeted_layer, layer)
+    return budgeted_layer
+
+
+def budget_call_view_function(call_view_function, view_name, layer_name, budget):
+    """ Returns a wrapper for the `_call_view_function()` of a `ViewDecoratorBase` decorator that checks its exclusive
+    time (without the time spent in the view function it receives) against the budget. """
+    def budgeted_call_view_function(decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        frame = [0.0]
+
+        def budgeted_view_function(*args, **kwargs):
+            view_function_start = _timer()
+            try:
+                return view_function(*args, **kwargs)
+            finally:
+                frame[0] += _timer() - view_function_start
+
+        start = _timer()
+        try:
+            return call_view_function(decoration_instance, view_class_instance, budgeted_view_function,
+                                      *args, **kwargs)
+        finally:
+            seconds = _timer() - start - frame[0]
+            if seconds > budget:
+                report(view_name, layer_name, seconds, budget)
+    update_wrapper(budgeted_call_view_function, call_view_function)
+    return budgeted_call_view_function
+
+
+def report(view_name, layer_name, seconds, budget):
+    """ Logs a warning about a layer that has exceeded its budget unless the same layer of the same view has been
+    reported within the warning interval. """
+    now = _timer()
+    interval = get_setting(LATENCY_BUDGET_WARNING_INTERVAL, DEFAULT_WARNING_INTERVAL)
+    key = (view_name, layer_name)
+    with _warnings_lock:
+        last_warning = _last_warnings.get(key)
+        if last_warning is not None and now - last_warning[0] < interval:
+            last_warning[1] += 1
+            return
+        num_suppressed = last_warning[1] if last_warning is not None else 0
+        _last_warnings[key] = [now, 0]
+    logger.warning('Layer %(layer)s of view %(view)s took %(milliseconds).3fms (budget: %(budget).3fms, '
+                   '%(num_suppressed)d suppressed warnings)',
+                   dict(layer=layer_name, view=view_name, milliseconds=seconds * 1000, budget=budget * 1000,
+                        num_suppressed=num_suppressed))
+
+
+def reset_warnings():
+    """ Forgets the time of the last warnings. """
+    with _warnings_lock:
+        _last_warnings.clear()
@@ -0,0 +1,80 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from ...five import full_qualname
+from ...introspection import benchmark_chain, describe_view, get_stub_url_kwargs, iter_url_pattern_views
+
+
+class Command(BaseCommand):
+    help = ('Prints the decorator chains built by django_universal_view_decorator for the views of the URL patterns '
+            'along with the estimated number of python frames they add to a request.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf', help='the URLconf module (default: ROOT_URLCONF)')
+        parser.add_argument('--filter', default='',
+                            help='show only the URL patterns that contain this string in their pattern, name or view')
+        parser.add_argument('--bench', action='store_true',
+                            help='measure the overhead of the chains with a stub request (the views are not called)')
+        parser.add_argument('--number', type=int, default=1000, help='number of calls per measurement of --bench')
+        parser.add_argument('--sort', choices=('pattern', 'frames', 'overhead'), default='pattern',
+                            help='sort the URL patterns (overhead requires --bench, the largest is the first)')
+
+    def handle(self, *args, **options):
+        if options['sort'] == 'overhead' and not options['bench']:
+            raise CommandError('--sort=overhead requires --bench')
+        request = self._create_stub_request() if options['bench'] else None
+
+        entries = []
+        for url_pattern_view in iter_url_pattern_views(options['urlconf']):
+            view_description = describe_view(url_pattern_view.callback)
+            if not any(options['filter'] in text for text in (url_pattern_view.pattern, url_pattern_view.name or '',
+                                                                  view_description.view_name)):
+                continue
+            overheads = None
+            if request is not None:
+                overheads = self._benchmark(view_description, request, get_stub_url_kwargs(url_pattern_view),
+                                            options['number'])
+            entries.append((url_pattern_view, view_description, overheads))
+
+        if options['sort'] == 'frames':
+            entries.sort(key=lambda entry: -sum(chain.num_frames for chain in entry[1].chains))
+        elif options['sort'] == 'overhead':
+            entries.sort(key=lambda entry: -sum(value for value in entry[2].values() if value is not None))
+
+        for url_pattern_view, view_description, overheads in entries:
+            self._write_view(url_pattern_view, view_description, overheads)
+
+    def _write_view(self, url_pattern_view, view_description, overheads):
+        name = ' [{}]'.format(url_pattern_view.name) if url_pattern_view.name else ''
+        num_frames = sum(chain.num_frames for chain in view_description.chains)
+        self.stdout.write('{}{} -> {} ({} frames)'.format(url_pattern_view.pattern, name, view_description.view_name,
+                                                          num_frames))
+        for chain in view_description.chains:
+            overhead = ''
+            if overheads is not None:
+                overhead = ', bench failed' if overheads[chain.name] is None else \
+                    ', {:.2f} us/call'.format(overheads[chain.name] * 1000000)
+            self.stdout.write('    {} ({} frames{}):'.format(chain.name, chain.num_frames, overhead))
+            for layer in chain.layers:
+                view_class = ' (from {})'.format(full_qualname(layer.view_class)) if layer.view_class else ''
+                self.stdout.write('        {}{}'.format(layer.name, view_class))
+
+    def _benchmark(self, view_description, request, kwargs, number):
+        overheads = {}
+        for chain in view_description.chains:
+            try:
+                overheads[chain.name] = benchmark_chain(view_description, chain, request, kwargs, number)
+            except Exception as ex:
+                self.stderr.write('Benchmarking the {} chain of {} failed: {!r}'.format(
+                    chain.name, view_description.view_name, ex))
+                overheads[chain.name] = None
+        return overheads
+
+    @staticmethod
+    def _create_stub_request():
+        request = RequestFactory().get('/')
+        if apps.is_installed('django.contrib.auth'):
+            from django.contrib.auth.models import AnonymousUser
+            request.user = AnonymousUser()
+        return request
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import tracing
+from ...conf import TRACE_FILE, get_setting
+
+
+class Command(BaseCommand):
+    help = ('Prints the traces of the decorator chains written to the UNIVERSAL_VIEW_DECORATOR_TRACE_FILE by the '
+            'processes that serve the requests.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='the trace file, the default is UNIVERSAL_VIEW_DECORATOR_TRACE_FILE')
+        parser.add_argument('--last', type=int, help='print only the last N traces')
+
+    def handle(self, *args, **options):
+        trace_file = options['file'] or get_setting(TRACE_FILE)
+        if trace_file is None:
+            raise CommandError('There is no trace file. Set UNIVERSAL_VIEW_DECORATOR_TRACE_FILE (along with '
+                               'UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE) or use the --file option.')
+        try:
+            traces = tracing.read_traces(trace_file)
+        except EnvironmentError as ex:
+            raise CommandError('Failed to read the trace file: {}'.format(ex))
+        if options['last'] is not None:
+            traces = traces[-options['last']:] if options['last'] > 0 else []
+        for trace in traces:
+            self.stdout.write(tracing.format_trace(trace))
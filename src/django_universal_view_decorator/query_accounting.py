@@ -0,0 +1,159 @@
+""" Per-layer database query accounting of the decorator chains.
+
+With the `UNIVERSAL_VIEW_DECORATOR_QUERY_ACCOUNTING = True` setting the decorator chains are built with the
+instrumented layers of `django_universal_view_decorator.instrumentation` and every database query is attributed to the
+innermost layer that is being executed: to a decorator (the decorators applied by `universal_view_decorator` and the
+`_call_view_function()` of `ViewDecoratorBase` decorators) or to the view itself (`VIEW_LAYER_NAME`). The queries are
+captured with `connection.execute_wrapper()` installed on the database connections by the outermost layer of the
+request (with django 2.0+, the older versions don't capture the queries).
+
+The number and the total time of the queries are accumulated per (view name, layer name) pair in `query_stats` and in
+the `QueryStats` objects of the active `recording_queries()` blocks. `assert_max_layer_queries()` fails a test when a
+decorator layer runs too many queries:
+
+.. code-block:: python
+
+    from django_universal_view_decorator.query_accounting import assert_max_layer_queries
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_QUERY_ACCOUNTING=True)
+    def test_permission_checks(self):
+        with assert_max_layer_queries(1):
+            self.client.get('/items/')
+
+The setting is checked when the chains are built (like the other instrumentation settings) so the views have to be
+decorated with the setting enabled. The chains of async views aren't instrumented.
+"""
+import contextlib
+import threading
+import timeit
+
+from django.db import connections
+
+from .conf import QUERY_ACCOUNTING, get_setting
+from .five import ContextVar, update_wrapper
+
+
+_timer = timeit.default_timer
+
+# The (view_name, layer_name) pair of the innermost instrumented layer that is being executed.
+_current_layer = ContextVar('django_universal_view_decorator.query_accounting.current_layer')
+
+# The `QueryStats` objects of the active `recording_queries()` blocks.
+_recorders = ContextVar('django_universal_view_decorator.query_accounting.recorders')
+
+
+def is_enabled():
+    return bool(get_setting(QUERY_ACCOUNTING, False))
+
+
+class QueryStats(object):
+    """ The number and the total duration (in seconds) of database queries per (view_name, layer_name) pair. """
+    def __init__(self):
+        super(QueryStats, self).__init__()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, view_name, layer_name, seconds):
+        with self._lock:
+            stats = self._stats.get((view_name, layer_name))
+            if stats is None:
+                stats = self._stats[(view_name, layer_name)] = [0, 0.0]
+            stats[0] += 1
+            stats[1] += seconds
+
+    def get(self, view_name, layer_name):
+        """ Returns a (count, seconds) pair. """
+        with self._lock:
+            return tuple(self._stats.get((view_name, layer_name), (0, 0.0)))
+
+    def items(self):
+        """ Returns a sorted list of ((view_name, layer_name), (count, seconds)) pairs. """
+        with self._lock:
+            return sorted((key, tuple(value)) for key, value in self._stats.items())
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, dict(self.items()))
+
+
+# The process-wide stats of all instrumented requests.
+query_stats = QueryStats()
+
+
+@contextlib.contextmanager
+def recording_queries():
+    """ Returns a context manager that yields a `QueryStats` object that receives the queries of the requests
+    executed in the block. """
+    stats = QueryStats()
+    token = _recorders.set(_recorders.get(()) + (stats,))
+    try:
+        yield stats
+    finally:
+        _recorders.reset(token)
+
+
+@contextlib.contextmanager
+def assert_max_layer_queries(max_queries, layer_names=None):
+    """ Fails with an AssertionError if a decorator layer (or one of the specified layers) of the requests executed
+    in the block has run more than `max_queries` database queries. The view layers are checked only if they are listed
+    in `layer_names`. """
+    from .instrumentation import VIEW_LAYER_NAME
+
+    with recording_queries() as stats:
+        yield stats
+    violations = [
+        '{} {}: {} queries'.format(view_name, layer_name, count)
+        for (view_name, layer_name), (count, _) in stats.items()
+        if count > max_queries and (layer_name in layer_names if layer_names is not None
+                                    else layer_name != VIEW_LAYER_NAME)
+    ]
+    if violations:
+        raise AssertionError('{} layer(s) exceeded the limit of {} queries:\n{}'.format(
+            len(violations), max_queries, '\n'.join(violations)))
+
+
+def account_layer(function, view_name, layer_name):
+    """ Returns a wrapper that attributes the database queries run by function (and not by its instrumented inner
+    layers) to the layer. Used by `django_universal_view_decorator.instrumentation.instrument_layer()`. """
+    layer = (view_name, layer_name)
+
+    def accounted_layer(*args, **kwargs):
+        outermost = _current_layer.get(None) is None
+        token = _current_layer.set(layer)
+        try:
+            if outermost:
+                return _call_with_execute_wrappers(function, args, kwargs)
+            return function(*args, **kwargs)
+        finally:
+            _current_layer.reset(token)
+    update_wrapper(accounted_layer, function)
+    return accounted_layer
+
+
+def _call_with_execute_wrappers(function, args, kwargs):
+    # the same as `connection.execute_wrapper()` for every connection of the thread
+    wrapped_connections = [connection for connection in connections.all()
+                           if hasattr(connection, 'execute_wrappers')]
+    for connection in wrapped_connections:
+        connection.execute_wrappers.append(_execute_wrapper)
+    try:
+        return function(*args, **kwargs)
+    finally:
+        for connection in wrapped_connections:
+            connection.execute_wrappers.pop()
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    start = _timer()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        layer = _current_layer.get(None)
+        if layer is not None:
+            seconds = _timer() - start
+            query_stats.record(layer[0], layer[1], seconds)
+            for stats in _recorders.get(()):
+                stats.record(layer[0], layer[1], seconds)
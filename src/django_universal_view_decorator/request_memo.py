@@ -0,0 +1,69 @@
+""" A request-scoped memo store shared by the layers of the decorator chains and the view.
+
+Decorators often compute the same things (the user, the tenant, the parsed body, feature flags...) in one request.
+A `ViewDecoratorBase` subclass with the `uses_request_memo = True` class attribute opens a memo scope when a request
+enters a chain that contains it: a dict stored in a context variable that is visible to the inner layers and the view
+and it is discarded when the request leaves the chain (inner chains, e.g.: the decorated methods of a view class
+called by the class level chain, use the scope of the outer chain). The decorators access the dict through the
+`request_memo` property of the `decoration_instance` they receive and any code can use `memoized()`:
+
+.. code-block:: python
+
+    class TenantRequired(ViewDecoratorBase):
+        uses_request_memo = True
+
+        def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+            tenant = memoized('tenant', lambda: resolve_tenant(args[0]))
+            ...
+
+Because the store is a context variable it behaves the same way in WSGI threads and ASGI tasks (asgiref copies the
+context when it runs the sync parts of async views in threads and vice versa).
+"""
+from .five import ContextVar, call_with_context_var_async, update_wrapper
+
+
+# The memo dict of the request that is being processed or None outside of the memo scopes.
+_current_memo = ContextVar('django_universal_view_decorator.request_memo.current_memo')
+
+
+def get_request_memo():
+    """ Returns the memo dict of the current request or None if it is called outside of a memo scope. """
+    return _current_memo.get(None)
+
+
+def memoized(key, compute):
+    """ Returns the value stored under `key` in the memo of the current request. If the key isn't in the memo then
+    `compute()` is called and its return value is stored. Outside of the memo scopes the value isn't stored. """
+    memo = _current_memo.get(None)
+    if memo is None:
+        return compute()
+    try:
+        return memo[key]
+    except KeyError:
+        value = memo[key] = compute()
+        return value
+
+
+def uses_request_memo(view_decorator):
+    return bool(getattr(view_decorator, 'uses_request_memo', False))
+
+
+def open_memo_scope(call_view_function, is_async):
+    """ Returns a wrapper for the outermost `call_view_function` of a `_ViewDecoration` that opens a memo scope for
+    the request if it isn't in one already. """
+    if is_async:
+        def scoped_call_view_function(*args, **kwargs):
+            if _current_memo.get(None) is not None:
+                return call_view_function(*args, **kwargs)
+            return call_with_context_var_async(_current_memo, {}, call_view_function, *args, **kwargs)
+    else:
+        def scoped_call_view_function(*args, **kwargs):
+            if _current_memo.get(None) is not None:
+                return call_view_function(*args, **kwargs)
+            token = _current_memo.set({})
+            try:
+                return call_view_function(*args, **kwargs)
+            finally:
+                _current_memo.reset(token)
+    update_wrapper(scoped_call_view_function, call_view_function)
+    return scoped_call_view_function
@@ -0,0 +1,319 @@
+""" Sampling request tracer of the decorator chains.
+
+When the `UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE` setting is an integer the decorator chains are built with the
+instrumented layers of `django_universal_view_decorator.instrumentation` (the decorators applied by
+`universal_view_decorator`, the `_call_view_function()` of `ViewDecoratorBase` decorators and the decorated views).
+The outermost layer of a request decides whether the request is sampled: every Nth request is traced (0 traces only
+the requests forced by `sampling()`). A trace contains a span for each executed layer with its duration, the
+exception it has raised and whether it has short-circuited the request (returned without calling its inner layer,
+e.g.: `login_required` redirecting). The finished traces are stored in a bounded in-process ring buffer:
+
+.. code-block:: python
+
+    from django_universal_view_decorator import tracing
+
+    with tracing.sampling():
+        response = view(request)
+    for trace in tracing.get_traces():
+        print(tracing.format_trace(trace))
+
+The ring buffer is visible only in the process that has served the requests. With the
+`UNIVERSAL_VIEW_DECORATOR_TRACE_FILE` setting the finished traces are appended to a file too (one JSON object per
+line) where the `view_decorator_traces` management command can read them. The file is rotated when it holds
+`UNIVERSAL_VIEW_DECORATOR_TRACE_BUFFER_SIZE` traces so the file and its rotated copy hold at most twice as many.
+
+The layers of requests that aren't sampled only check a context variable. The setting is checked when the chains
+are built so the chains built without the setting don't contain tracing code at all.
+"""
+import collections
+import contextlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import timeit
+
+from django.http import HttpRequest
+
+from .conf import TRACE_BUFFER_SIZE, TRACE_FILE, TRACE_SAMPLE_RATE, get_setting
+from .five import ContextVar, update_wrapper
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 100
+
+# The trace file is renamed to this name (replacing the previous one) when it holds `TRACE_BUFFER_SIZE` traces.
+ROTATED_FILE_SUFFIX = '.1'
+
+_timer = timeit.default_timer
+
+# The span of the traced layer that is being executed or `_NOT_SAMPLED` if the current request isn't traced.
+_current_span = ContextVar('django_universal_view_decorator.tracing.current_span')
+_NOT_SAMPLED = object()
+
+# None: sampling by the sample rate, True/False: forced by `sampling()`.
+_sampling_override = ContextVar('django_universal_view_decorator.tracing.sampling_override')
+
+_request_counter = itertools.count()
+
+_traces_lock = threading.Lock()
+_traces = None
+
+
+def get_sample_rate():
+    """ Returns the sample rate setting: None if tracing is disabled, 0 if only the forced requests are traced. """
+    sample_rate = get_setting(TRACE_SAMPLE_RATE)
+    return None if sample_rate is None else int(sample_rate)
+
+
+def is_enabled():
+    return get_sample_rate() is not None
+
+
+@contextlib.contextmanager
+def sampling(enabled=True):
+    """ Forces (or suppresses with `enabled=False`) the tracing of the requests started in this context regardless
+    of the sample rate. Has effect only on the chains built with tracing enabled. """
+    token = _sampling_override.set(enabled)
+    try:
+        yield
+    finally:
+        _sampling_override.reset(token)
+
+
+def get_traces():
+    """ Returns the traces of the ring buffer from the oldest to the newest one. """
+    with _traces_lock:
+        return list(_traces) if _traces is not None else []
+
+
+def clear_traces():
+    global _traces
+    with _traces_lock:
+        _traces = None
+
+
+def _store_trace(trace):
+    global _traces
+    buffer_size = get_setting(TRACE_BUFFER_SIZE, DEFAULT_BUFFER_SIZE)
+    with _traces_lock:
+        if _traces is None:
+            _traces = collections.deque(maxlen=buffer_size)
+        _traces.append(trace)
+    # The file is written after releasing the lock so the file I/O doesn't block the other threads.
+    trace_file = get_setting(TRACE_FILE)
+    if trace_file is not None:
+        _write_trace(trace_file, trace, buffer_size)
+
+
+# (trace file path, inode, the number of bytes whose lines have been counted, the number of lines). The tuple is
+# replaced as a whole so the threads don't need a lock: a racing thread can only miscount the lines of a few traces.
+_trace_file_state = None
+
+
+def _write_trace(trace_file, trace, buffer_size):
+    # The line is written with one write() call to a file opened in append mode so the processes of a server don't
+    # interleave their traces. A failing write mustn't fail the traced request.
+    global _trace_file_state
+    line = json.dumps(trace_to_dict(trace), separators=(',', ':')) + '\n'
+    try:
+        with open(trace_file, 'ab+') as f:
+            f.write(line.encode('utf-8'))
+            f.flush()
+            # The lines appended by the other processes since the last write are counted too so the file holds at
+            # most `buffer_size` traces before it is rotated.
+            file_size = f.tell()
+            inode = os.fstat(f.fileno()).st_ino
+            state = _trace_file_state
+            if state is None or state[:2] != (trace_file, inode) or state[2] > file_size:
+                state = (trace_file, inode, 0, 0)
+            f.seek(state[2])
+            num_lines = state[3] + f.read(file_size - state[2]).count(b'\n')
+        _trace_file_state = (trace_file, inode, file_size, num_lines)
+        if num_lines >= buffer_size and os.stat(trace_file).st_ino == inode:
+            os.rename(trace_file, trace_file + ROTATED_FILE_SUFFIX)
+    except EnvironmentError as ex:
+        logger.warning('Failed to write the trace to %s: %s', trace_file, ex)
+
+
+def read_traces(trace_file):
+    """ Returns the traces written to the file by the `UNIVERSAL_VIEW_DECORATOR_TRACE_FILE` setting (and to its rotated
+    copy) from the oldest to the newest one. Lines that aren't valid JSON (e.g.: the line that is being written) are
+    skipped. """
+    traces = []
+    paths = [trace_file]
+    if os.path.exists(trace_file + ROTATED_FILE_SUFFIX):
+        paths.insert(0, trace_file + ROTATED_FILE_SUFFIX)
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                traces.append(trace_from_dict(data))
+    return traces
+
+
+def trace_to_dict(trace):
+    """ Converts the trace into a dict that can be serialized to JSON. """
+    def span_to_dict(span):
+        return dict(view_name=span.view_name, layer_name=span.layer_name, is_view=span.is_view, start=span.start,
+                    duration=span.duration, exception=span.exception,
+                    children=[span_to_dict(child) for child in span.children])
+    return dict(timestamp=trace.timestamp, request=trace.request, root=span_to_dict(trace.root))
+
+
+def trace_from_dict(data):
+    """ The inverse of `trace_to_dict()`. """
+    def span_from_dict(span_data):
+        span = Span(span_data['view_name'], span_data['layer_name'], span_data['is_view'], span_data['start'])
+        span.duration = span_data['duration']
+        span.exception = span_data['exception']
+        span.children = [span_from_dict(child) for child in span_data['children']]
+        return span
+    return Trace(data['timestamp'], data['request'], span_from_dict(data['root']))
+
+
+class Span(object):
+    """ The execution of a layer in a traced request. `start` is relative to the start of the trace, `exception`
+    is the repr of the exception raised by the layer (or None) and `children` contains the spans of the layers called
+    by this layer. `short_circuited` is True if a decorator layer has returned without calling its inner layer. """
+    __slots__ = ('view_name', 'layer_name', 'is_view', 'start', 'duration', 'exception', 'children')
+
+    def __init__(self, view_name, layer_name, is_view, start):
+        super(Span, self).__init__()
+        self.view_name = view_name
+        self.layer_name = layer_name
+        self.is_view = is_view
+        self.start = start
+        self.duration = None
+        self.exception = None
+        self.children = []
+
+    @property
+    def short_circuited(self):
+        return not self.is_view and self.exception is None and not self.children
+
+    def __repr__(self):
+        return '{}({}, {})'.format(type(self).__name__, self.view_name, self.layer_name)
+
+
+class Trace(object):
+    """ A traced request: `timestamp` is the wall clock time of its start, `request` is a `'METHOD path'` string
+    (or None if the outermost layer hasn't received a request) and `root` is the span of the outermost layer. """
+    __slots__ = ('timestamp', 'request', 'root')
+
+    def __init__(self, timestamp, request, root):
+        super(Trace, self).__init__()
+        self.timestamp = timestamp
+        self.request = request
+        self.root = root
+
+    @property
+    def duration(self):
+        return self.root.duration
+
+    def iter_spans(self):
+        """ Yields (depth, span) pairs in call order. """
+        stack = [(0, self.root)]
+        while stack:
+            depth, span = stack.pop()
+            yield depth, span
+            stack.extend((depth + 1, child) for child in reversed(span.children))
+
+    def __repr__(self):
+        return '{}({}, {})'.format(type(self).__name__, self.root.view_name, self.request)
+
+
+def trace_layer(function, view_name, layer_name, is_view, sample_rate):
+    """ Returns a wrapper that calls function and records a span when the current request is sampled. Used by
+    `django_universal_view_decorator.instrumentation.instrument_layer()`. """
+    def traced_layer(*args, **kwargs):
+        parent = _current_span.get(None)
+        if parent is _NOT_SAMPLED:
+            return function(*args, **kwargs)
+        if parent is None:
+            # the outermost layer of the request
+            sampled = _sampling_override.get(None)
+            if sampled is None:
+                sampled = sample_rate > 0 and next(_request_counter) % sample_rate == 0
+            if not sampled:
+                token = _current_span.set(_NOT_SAMPLED)
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    _current_span.reset(token)
+            return _call_traced_root(function, view_name, layer_name, is_view, args, kwargs)
+        return _call_traced(function, view_name, layer_name, is_view, parent, args, kwargs)
+    update_wrapper(traced_layer, function)
+    return traced_layer
+
+
+def _call_traced_root(function, view_name, layer_name, is_view, args, kwargs):
+    trace = Trace(time.time(), _describe_request(args), None)
+    start = _timer()
+    root = trace.root = Span(view_name, layer_name, is_view, start)
+    token = _current_span.set(root)
+    try:
+        return function(*args, **kwargs)
+    except BaseException as ex:
+        root.exception = repr(ex)
+        raise
+    finally:
+        root.duration = _timer() - start
+        _current_span.reset(token)
+        # the spans store their start relative to the trace
+        for _, span in trace.iter_spans():
+            span.start -= start
+        _store_trace(trace)
+
+
+def _call_traced(function, view_name, layer_name, is_view, parent, args, kwargs):
+    start = _timer()
+    span = Span(view_name, layer_name, is_view, start)
+    parent.children.append(span)
+    token = _current_span.set(span)
+    try:
+        return function(*args, **kwargs)
+    except BaseException as ex:
+        span.exception = repr(ex)
+        raise
+    finally:
+        span.duration = _timer() - start
+        _current_span.reset(token)
+
+
+def _describe_request(args):
+    # The outermost layer is either a view function (request is the first arg) or the `_call_view_function()` of a
+    # `ViewDecoratorBase` decorator (the request follows the decoration_instance, view_class_instance and
+    # view_function args).
+    for arg in args[:4]:
+        if isinstance(arg, HttpRequest):
+            return '{} {}'.format(arg.method, arg.path)
+    return None
+
+
+def format_trace(trace):
+    """ Returns a multi-line string that describes the trace with a line per span: the layer name (along with the
+    view name when it differs from the view of the parent span), the start, the duration and the outcome. """
+    lines = ['{} {} ({:.1f}us)'.format(
+        time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trace.timestamp)),
+        trace.request or trace.root.view_name, trace.duration * 1000000,
+    )]
+    view_names = []
+    for depth, span in trace.iter_spans():
+        del view_names[depth:]
+        view_name = '' if view_names and view_names[-1] == span.view_name else ' [{}]'.format(span.view_name)
+        view_names.append(span.view_name)
+        notes = ''
+        if span.exception is not None:
+            notes = ' raised ' + span.exception
+        elif span.short_circuited:
+            notes = ' short-circuited'
+        lines.append('{}{}{} +{:.1f}us {:.1f}us{}'.format('  ' * (depth + 1), span.layer_name, view_name,
+                                                         span.start * 1000000, span.duration * 1000000, notes))
+    return '\n'.join(lines)
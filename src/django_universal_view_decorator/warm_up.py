@@ -0,0 +1,139 @@
+""" Does the lazy work of the decorated views in advance to avoid the latency of the first requests.
+
+Most of the work is done when the views are decorated but some things are done by the first call (or the first
+`as_view()` access) of the decorated views:
+
+- resolving lazily decorated view classes (`UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION`)
+- creating the hooked `as_view()` of decorated view classes
+- composing the decorator chains of `universal_view_decorator` applied to view functions and view class methods (the
+  latter only with `UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE`)
+
+`warm_up()` walks the URL patterns of a URLconf and does this work for every view that can be reached from them.
+`freeze()` does the same for all decorated view classes and moves every object to the permanent generation of the
+garbage collector to prepare the process for forking workers.
+"""
+import collections
+import gc
+import inspect
+import logging
+import timeit
+
+from .conf import WARM_UP, get_setting
+from .decorators.view_class_decorator import resolve_pending_view_class_decorations
+from .decorators.view_decorator_base import _ViewDecoration
+from .introspection import iter_url_pattern_views
+
+
+logger = logging.getLogger(__name__)
+
+
+# The result of `warm_up()`. `num_views` is the number of visited URL pattern views, `num_chains` is the number of
+# decorator chains and view class decorations that have been composed or resolved and `duration` is the duration of
+# the warm-up in seconds. A repeated `warm_up()` returns zero `num_chains`.
+WarmUpResult = collections.namedtuple('WarmUpResult', 'num_views num_chains duration')
+
+
+def warm_up(urlconf=None):
+    """ Warms up the decorated views that can be reached from the URL patterns of the specified URLconf module (or
+    module name). The default is the `ROOT_URLCONF` of the project. Returns a `WarmUpResult`. """
+    start = timeit.default_timer()
+    warmer = _ViewWarmer()
+    num_views = warmer.warm_up_urlconf(urlconf)
+    result = WarmUpResult(num_views=num_views, num_chains=warmer.num_chains,
+                          duration=timeit.default_timer() - start)
+    logger.info('Warmed up %(num_views)s views (%(num_chains)s decorator chains) in %(duration).3f seconds.',
+                result._asdict())
+    return result
+
+
+def freeze(urlconf=None):
+    """ Prepares the process for forking worker processes (e.g.: gunicorn with `preload_app`). Resolves all lazily
+    decorated view classes, warms up the views of the URLconf (`ROOT_URLCONF` by default) along with all decorated
+    view classes (including the ones that aren't reachable from the URLconf) and then calls `gc.freeze()` (on
+    python 3.7+) so the garbage collector of the workers doesn't touch the memory pages shared with the master
+    process. After this serving a request causes no net memory growth in this library (the short-lived objects of a
+    request are still allocated and freed). Call this after importing all your views. Returns a `WarmUpResult`. """
+    from django.views.generic import View
+
+    start = timeit.default_timer()
+    warmer = _ViewWarmer()
+    warmer.num_chains += resolve_pending_view_class_decorations()
+    num_views = warmer.warm_up_urlconf(urlconf)
+    for view_class in _iter_subclasses(View):
+        warmer.warm_up_view_class(view_class)
+
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    result = WarmUpResult(num_views=num_views, num_chains=warmer.num_chains,
+                          duration=timeit.default_timer() - start)
+    logger.info('Froze %(num_views)s views (%(num_chains)s decorator chains) in %(duration).3f seconds.',
+                result._asdict())
+    return result
+
+
+def warm_up_if_enabled(urlconf=None):
+    """ Calls `warm_up()` if the `UNIVERSAL_VIEW_DECORATOR_WARM_UP` setting is True. This can be called from the
+    `ready()` method of an `AppConfig`. Returns the `WarmUpResult` or None if the warm-up is disabled. """
+    if not get_setting(WARM_UP, False):
+        return None
+    return warm_up(urlconf)
+
+
+def _iter_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for subclass_2 in _iter_subclasses(subclass):
+            yield subclass_2
+
+
+class _ViewWarmer(object):
+    def __init__(self):
+        super(_ViewWarmer, self).__init__()
+        self.num_chains = 0
+        self._visited_ids = set()
+        # keeping the visited objects alive because their ids are in `_visited_ids`
+        self._visited = []
+
+    def _visit(self, obj):
+        """ Returns True if the object hasn't been visited yet. """
+        if id(obj) in self._visited_ids:
+            return False
+        self._visited_ids.add(id(obj))
+        self._visited.append(obj)
+        return True
+
+    def warm_up_urlconf(self, urlconf):
+        """ Returns the number of URL pattern views. """
+        num_views = 0
+        for url_pattern_view in iter_url_pattern_views(urlconf):
+            self.warm_up_view(url_pattern_view.callback)
+            num_views += 1
+        return num_views
+
+    def warm_up_view(self, view):
+        # The view may be wrapped by decorators that set the `__wrapped__` attribute (e.g.: decorators applied in the
+        # URLconf or the decorators of a view class). The view function returned by `View.as_view()` has a
+        # `view_class` attribute that is copied by most decorators.
+        while view is not None and self._visit(view):
+            view_class = getattr(view, 'view_class', None)
+            if inspect.isclass(view_class):
+                self.warm_up_view_class(view_class)
+            if isinstance(view, _ViewDecoration):
+                self.num_chains += view.warm_up()
+                # skipping the inner decorations: they are stages of this decoration
+                view = view.view_function
+            else:
+                view = getattr(view, '__wrapped__', None)
+
+    def warm_up_view_class(self, view_class):
+        if not self._visit(view_class):
+            return
+        self.num_chains += resolve_pending_view_class_decorations(view_class)
+        if getattr(view_class, '_view_class_decorator_chain', None) is not None:
+            # creates the cached hooked as_view()
+            getattr(view_class, 'as_view')
+        for cls in inspect.getmro(view_class):
+            for attribute in cls.__dict__.values():
+                if isinstance(attribute, _ViewDecoration) and self._visit(attribute):
+                    self.num_chains += attribute.warm_up(is_view_class_method=True)
@@ -0,0 +1,13 @@
+""" Helpers of the async tests. This module is imported only under python 3.5+. """
+import asyncio
+
+
+def run(coroutine):
+    """ Runs the coroutine in a new event loop (`asyncio.run()` is available only under python 3.7+). """
+    if hasattr(asyncio, 'run'):
+        return asyncio.run(coroutine)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,251 @@
+import asyncio
+import functools
+
+import mock
+from django.test import TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import ViewDecoratorBase, universal_view_decorator
+from django_universal_view_decorator.five import iscoroutinefunction
+
+from .async_utils import run
+
+
+def test_log(*args, **kwargs):
+    pass
+
+
+# Test decorators
+
+
+class Decorator(object):
+    """ A legacy decorator that doesn't know about async views. """
+    def __init__(self, decorator_id):
+        super(Decorator, self).__init__()
+        self.decorator_id = decorator_id
+
+    def __call__(self, wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            test_log('decorator', self.decorator_id)
+            return wrapped(*args, **kwargs)
+        return wrapper
+
+
+decorator = Decorator
+
+
+class AsyncDecorator(object):
+    """ An async legacy decorator that awaits something before calling the view. """
+    def __init__(self, decorator_id):
+        super(AsyncDecorator, self).__init__()
+        self.decorator_id = decorator_id
+
+    def __call__(self, wrapped):
+        assert iscoroutinefunction(wrapped)
+
+        @functools.wraps(wrapped)
+        async def wrapper(*args, **kwargs):
+            await asyncio.sleep(0)
+            test_log('async_decorator', self.decorator_id)
+            return await wrapped(*args, **kwargs)
+        return wrapper
+
+
+async_decorator = AsyncDecorator
+
+
+class SyncViewDecorator(ViewDecoratorBase):
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        test_log(SyncViewDecorator)
+        return view_function(*args, **kwargs)
+
+
+class AsyncViewDecorator(ViewDecoratorBase):
+    def __init__(self, decorator_id=None):
+        super(AsyncViewDecorator, self).__init__()
+        self.decorator_id = decorator_id
+
+    async def _async_call_view_function(self, decoration_instance, view_class_instance, view_function,
+                                        *args, **kwargs):
+        await asyncio.sleep(0)
+        test_log(AsyncViewDecorator, self.decorator_id)
+        response = await view_function(*args, **kwargs)
+        return 'async_decorator({})'.format(response)
+
+
+# Tests
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestAsyncViewFunctions(TestCase):
+    def test_view_decorator_base_with_async_call_view_function(self, mock_test_log):
+        @AsyncViewDecorator.universal_decorator
+        async def view_function(request):
+            test_log('view_function', request)
+            return 'response'
+
+        self.assertTrue(iscoroutinefunction(view_function))
+        self.assertEqual(run(view_function('request')), 'async_decorator(response)')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(AsyncViewDecorator, None),
+            mock.call('view_function', 'request'),
+        ])
+
+    def test_view_decorator_base_with_sync_call_view_function(self, mock_test_log):
+        @SyncViewDecorator.universal_decorator
+        async def view_function(request):
+            test_log('view_function', request)
+            return 'response'
+
+        self.assertTrue(iscoroutinefunction(view_function))
+        self.assertEqual(run(view_function('request')), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(SyncViewDecorator),
+            mock.call('view_function', 'request'),
+        ])
+
+    def test_stacked_view_decorators(self, mock_test_log):
+        @AsyncViewDecorator.universal_decorator(0)
+        @SyncViewDecorator.universal_decorator
+        @AsyncViewDecorator.universal_decorator(1)
+        async def view_function(request):
+            test_log('view_function', request)
+            return 'response'
+
+        self.assertTrue(iscoroutinefunction(view_function))
+        self.assertEqual(run(view_function('request')), 'async_decorator(async_decorator(response))')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(AsyncViewDecorator, 0),
+            mock.call(SyncViewDecorator),
+            mock.call(AsyncViewDecorator, 1),
+            mock.call('view_function', 'request'),
+        ])
+
+    def test_universal_view_decorator(self, mock_test_log):
+        @universal_view_decorator(decorator(0), async_decorator(1))
+        async def view_function(request):
+            test_log('view_function', request)
+            return 'response'
+
+        self.assertTrue(iscoroutinefunction(view_function))
+        self.assertEqual(run(view_function('request')), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('async_decorator', 1),
+            mock.call('view_function', 'request'),
+        ])
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestAsyncViewClassMethods(TestCase):
+    def test_decorated_async_methods_keep_the_view_class_async(self, mock_test_log):
+        class ViewClass(View):
+            @AsyncViewDecorator.universal_decorator
+            async def get(self, request):
+                test_log('get', request)
+                return 'response'
+
+            @universal_view_decorator(decorator(0))
+            async def post(self, request):
+                test_log('post', request)
+                return 'response'
+
+        self.assertTrue(ViewClass.view_is_async)
+        view = ViewClass.as_view()
+        self.assertTrue(iscoroutinefunction(view))
+
+    def test_universal_view_decorator_on_async_method(self, mock_test_log):
+        class ViewClass(View):
+            @universal_view_decorator(decorator(0), async_decorator(1))
+            async def get(self, request):
+                test_log('get', type(self), request)
+                return 'response'
+
+        self.assertEqual(run(ViewClass().get('request')), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('async_decorator', 1),
+            mock.call('get', ViewClass, 'request'),
+        ])
+
+    def test_concurrent_calls_of_a_decorated_async_method_get_their_own_view_class_instance(self, mock_test_log):
+        class ViewClass(View):
+            def __init__(self, name, **kwargs):
+                super(ViewClass, self).__init__(**kwargs)
+                self.name = name
+
+            @universal_view_decorator(async_decorator(0))
+            async def get(self, request):
+                await asyncio.sleep(0)
+                return self.name
+
+        async def call_concurrently():
+            return await asyncio.gather(*[ViewClass(name=i).get('request') for i in range(5)])
+
+        self.assertEqual(run(call_concurrently()), [0, 1, 2, 3, 4])
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestAsyncViewClasses(TestCase):
+    def test_universal_view_decorator(self, mock_test_log):
+        @universal_view_decorator(decorator(0), async_decorator(1))
+        class ViewClass(View):
+            async def get(self, request):
+                test_log('get', request)
+                return 'response'
+
+        view = ViewClass.as_view()
+        self.assertTrue(iscoroutinefunction(view))
+        request = mock.Mock(method='GET')
+        self.assertEqual(run(view(request)), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('async_decorator', 1),
+            mock.call('get', request),
+        ])
+
+    def test_view_decorator_base(self, mock_test_log):
+        @AsyncViewDecorator.universal_decorator
+        class ViewClass(View):
+            async def get(self, request):
+                test_log('get', request)
+                return 'response'
+
+        view = ViewClass.as_view()
+        self.assertTrue(iscoroutinefunction(view))
+        request = mock.Mock(method='GET')
+        self.assertEqual(run(view(request)), 'async_decorator(response)')
+
+    def test_coroutine_function_marker_is_restored_after_decorators_that_lose_it(self, mock_test_log):
+        def marker_losing_decorator(wrapped):
+            def wrapper(*args, **kwargs):
+                return wrapped(*args, **kwargs)
+            return wrapper
+
+        @universal_view_decorator(marker_losing_decorator)
+        class ViewClass(View):
+            async def get(self, request):
+                return 'response'
+
+        view = ViewClass.as_view()
+        self.assertTrue(iscoroutinefunction(view))
+        self.assertEqual(run(view(mock.Mock(method='GET'))), 'response')
+
+
+class TestSyncViewsRemainSync(TestCase):
+    def test_sync_views_arent_marked(self):
+        @SyncViewDecorator.universal_decorator
+        @universal_view_decorator(decorator(0))
+        def view_function(request):
+            return 'response'
+
+        @universal_view_decorator(decorator(0))
+        class ViewClass(View):
+            @SyncViewDecorator.universal_decorator
+            def get(self, request):
+                return 'response'
+
+        self.assertFalse(iscoroutinefunction(view_function))
+        self.assertFalse(ViewClass.view_is_async)
+        self.assertFalse(iscoroutinefunction(ViewClass.as_view()))
@@ -0,0 +1,20 @@
+from django.test import TestCase, override_settings
+
+from django_universal_view_decorator.decorators.view_decorator_base import _ViewDecoration
+from django_universal_view_decorator.five import iscoroutinefunction
+
+from .async_utils import run
+from .test_compiled_wrappers import MyViewDecorator
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=True)
+class TestAsyncCompiledWrappers(TestCase):
+    def test_async_view_function(self):
+        # compiled wrappers aren't generated for async views
+        @MyViewDecorator.universal_decorator
+        async def view_function(request):
+            return 'response'
+
+        self.assertIsNot(type(view_function), _ViewDecoration)
+        self.assertTrue(iscoroutinefunction(view_function))
+        self.assertEqual(run(view_function('request')), 'response')
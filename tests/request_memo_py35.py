@@ -0,0 +1,23 @@
+import asyncio
+
+from django.test import TestCase
+
+from django_universal_view_decorator.request_memo import get_request_memo
+
+from .async_utils import run
+from .test_request_memo import CheckUser, StoreUser, create_request
+
+
+class TestAsyncRequestMemo(TestCase):
+    def test_tasks_have_their_own_memo(self):
+        @StoreUser.universal_decorator
+        @CheckUser.universal_decorator
+        async def view_function(request):
+            await asyncio.sleep(0)
+            return get_request_memo()['user']
+
+        async def run_requests():
+            results = await asyncio.gather(view_function(create_request('a')), view_function(create_request('b')))
+            return results, get_request_memo()
+
+        self.assertEqual(run(run_requests()), (['a', 'b'], None))
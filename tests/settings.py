@@ -4,6 +4,12 @@ SECRET_KEY = 'TOP_SECRET'
 
 ROOT_URLCONF = 'tests.test_app.urls'
 
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django_universal_view_decorator',
+]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
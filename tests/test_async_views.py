@@ -0,0 +1,5 @@
+import sys
+
+# The async tests are in a separate module because they use syntax that isn't available before python 3.5.
+if sys.version_info >= (3, 5):
+    from .async_views_py35 import *  # noqa: F401,F403
@@ -0,0 +1,270 @@
+import sys
+import traceback
+
+import mock
+from django.conf.urls import url
+from django.test import RequestFactory, TestCase, override_settings
+from django.views.generic import View
+
+from django_universal_view_decorator import ViewDecoratorBase, universal_view_decorator
+from django_universal_view_decorator.decorators.compiled_wrappers import get_parameter_names
+from django_universal_view_decorator.decorators.view_decorator_base import _ViewDecoration
+
+try:
+    from django.urls import resolve
+except ImportError:
+    # django<1.10
+    from django.core.urlresolvers import resolve
+
+
+def test_log(*args, **kwargs):
+    pass
+
+
+# Test decorators
+
+
+class MyViewDecorator(ViewDecoratorBase):
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        test_log(MyViewDecorator, view_class_instance, args, kwargs)
+        return view_function(*args, **kwargs)
+
+
+class MyOtherViewDecorator(ViewDecoratorBase):
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        test_log(MyOtherViewDecorator)
+        return view_function(*args, **kwargs)
+
+
+def legacy_decorator(wrapped):
+    def wrapper(*args, **kwargs):
+        test_log(legacy_decorator)
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+class URLConf(object):
+    def __init__(self, *urlpatterns):
+        super(URLConf, self).__init__()
+        self.urlpatterns = list(urlpatterns)
+
+
+# Tests
+
+
+class TestGetParameterNames(TestCase):
+    def test_positional_parameters(self):
+        def view_function(request):
+            pass
+
+        def view_method(self, request):
+            pass
+        self.assertEqual(get_parameter_names(view_function), ('request',))
+        self.assertEqual(get_parameter_names(view_method), ('self', 'request'))
+
+    def test_generic_wrappers_are_used_in_case_of_url_arguments_varargs_kwargs_defaults_and_keyword_only_parameters(
+            self):
+        def view_function_without_parameters():
+            pass
+
+        def view_method_with_url_argument(self, request, pk):
+            pass
+
+        def view_function_with_varargs(request, *args):
+            pass
+
+        def view_function_with_kwargs(request, **kwargs):
+            pass
+
+        def view_function_with_default(request, page=1):
+            pass
+
+        def view_function_with_name_used_by_the_generated_code(_uvd_self, request):
+            pass
+
+        view_functions = [view_function_without_parameters, view_method_with_url_argument,
+                          view_function_with_varargs, view_function_with_kwargs, view_function_with_default,
+                          view_function_with_name_used_by_the_generated_code]
+        if sys.version_info[0] >= 3:
+            namespace = {}
+            exec('def view_function_with_keyword_only_parameter(request, *, pk): pass', namespace)
+            view_functions.append(namespace['view_function_with_keyword_only_parameter'])
+
+        for view_function in view_functions:
+            self.assertIsNone(get_parameter_names(view_function), view_function)
+
+    def test_not_a_python_function(self):
+        self.assertIsNone(get_parameter_names(len))
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=True)
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestCompiledWrappers(TestCase):
+    def test_view_function(self, mock_test_log):
+        @MyViewDecorator.universal_decorator
+        def view_function(request):
+            test_log('view_function', request)
+            return 'response'
+
+        self.assertIsInstance(view_function, _ViewDecoration)
+        self.assertIsNot(type(view_function).__call__, _ViewDecoration.__call__)
+        self.assertEqual(view_function.compiled_parameter_names, ('request',))
+        self.assertEqual(view_function.__name__, 'view_function')
+
+        self.assertEqual(view_function('request'), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(MyViewDecorator, None, ('request',), {}),
+            mock.call('view_function', 'request'),
+        ])
+
+    def test_wrong_number_of_args_fails_like_the_view_function(self, mock_test_log):
+        @MyViewDecorator.universal_decorator
+        def view_function(request):
+            pass
+
+        self.assertRaises(TypeError, view_function)
+        self.assertRaises(TypeError, view_function, 'request', 42)
+        self.assertRaises(TypeError, view_function, 'request', extra=43)
+        self.assertListEqual(mock_test_log.mock_calls, [])
+
+    def test_view_class_method(self, mock_test_log):
+        class ViewClass(View):
+            @MyViewDecorator.universal_decorator
+            def get(self, request):
+                test_log('get', type(self), request)
+                return 'response'
+
+        view_class_instance = ViewClass()
+        self.assertEqual(view_class_instance.get('request'), 'response')
+        self.assertEqual(ViewClass.as_view()(mock.Mock(method='GET')), 'response')
+        self.assertEqual(mock_test_log.mock_calls[:2], [
+            mock.call(MyViewDecorator, view_class_instance, ('request',), {}),
+            mock.call('get', ViewClass, 'request'),
+        ])
+        self.assertEqual(len(mock_test_log.mock_calls), 4)
+
+    def test_view_class_method_without_parameters(self, mock_test_log):
+        class ViewClass(View):
+            @MyViewDecorator.universal_decorator
+            def get(self):
+                return 'response'
+
+        view_class_instance = ViewClass()
+        self.assertEqual(view_class_instance.get(), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(MyViewDecorator, view_class_instance, (), {}),
+        ])
+
+    def test_stacked_decorators(self, mock_test_log):
+        class ViewClass(View):
+            @MyOtherViewDecorator.universal_decorator
+            @universal_view_decorator(legacy_decorator)
+            @MyViewDecorator.universal_decorator
+            def get(self, request):
+                test_log('get', request)
+                return 'response'
+
+        view_class_instance = ViewClass()
+        self.assertEqual(view_class_instance.get('request'), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(MyOtherViewDecorator),
+            mock.call(legacy_decorator),
+            mock.call(MyViewDecorator, view_class_instance, ('request',), {}),
+            mock.call('get', 'request'),
+        ])
+
+    def test_view_functions_with_the_same_parameter_names_share_the_generated_class(self, mock_test_log):
+        @MyViewDecorator.universal_decorator
+        def view_function_1(request):
+            pass
+
+        @MyOtherViewDecorator.universal_decorator
+        def view_function_2(request):
+            pass
+
+        @MyViewDecorator.universal_decorator
+        def view_function_3(req):
+            pass
+
+        self.assertIs(type(view_function_1), type(view_function_2))
+        self.assertIsNot(type(view_function_1), type(view_function_3))
+
+    def test_generic_wrappers_are_used_in_case_of_varargs(self, mock_test_log):
+        @MyViewDecorator.universal_decorator
+        def view_function(request, *args, **kwargs):
+            return 'response'
+
+        self.assertIs(type(view_function), _ViewDecoration)
+        self.assertEqual(view_function('request', pk=42), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(MyViewDecorator, None, ('request',), dict(pk=42)),
+        ])
+
+    def test_generated_source_is_shown_in_tracebacks(self, mock_test_log):
+        @MyViewDecorator.universal_decorator
+        def view_function(request):
+            raise ValueError
+
+        try:
+            view_function('request')
+        except ValueError:
+            formatted_traceback = traceback.format_exc()
+        self.assertIn('_uvd_self.call_view_function(', formatted_traceback)
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestUrlArguments(TestCase):
+    """ The setting doesn't change how the URL arguments reach the decorators. """
+    def _test_positional_url_arguments(self, mock_test_log):
+        def legacy_positional_decorator(wrapped):
+            def wrapper(request, *args):
+                test_log(legacy_positional_decorator, args)
+                return wrapped(request, *args)
+            return wrapper
+
+        @MyViewDecorator.universal_decorator
+        @universal_view_decorator(legacy_positional_decorator)
+        def view_function(request, pk):
+            return 'view_function {}'.format(pk)
+
+        class ViewClass(View):
+            @universal_view_decorator(legacy_positional_decorator)
+            @MyViewDecorator.universal_decorator
+            def get(self, request, pk):
+                return 'get {}'.format(pk)
+
+        urlconf = URLConf(url(r'^function/(\d+)/$', view_function), url(r'^class/(\d+)/$', ViewClass.as_view()))
+        request = RequestFactory().get('/')
+        for path, response in (('/function/5/', 'view_function 5'), ('/class/6/', 'get 6')):
+            resolver_match = resolve(path, urlconf)
+            self.assertEqual(resolver_match.func(request, *resolver_match.args, **resolver_match.kwargs), response)
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call(MyViewDecorator, None, (request, '5'), {}),
+            mock.call(legacy_positional_decorator, ('5',)),
+            mock.call(legacy_positional_decorator, ('6',)),
+            mock.call(MyViewDecorator, mock.ANY, (request, '6'), {}),
+        ])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=True)
+    def test_positional_url_arguments_with_compiled_wrappers(self, mock_test_log):
+        self._test_positional_url_arguments(mock_test_log)
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=False)
+    def test_positional_url_arguments_without_compiled_wrappers(self, mock_test_log):
+        self._test_positional_url_arguments(mock_test_log)
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_COMPILE_WRAPPERS=False)
+class TestCompiledWrappersDisabled(TestCase):
+    def test_view_function(self):
+        @MyViewDecorator.universal_decorator
+        def view_function(request):
+            pass
+
+        self.assertIs(type(view_function), _ViewDecoration)
+        self.assertIsNone(view_function.compiled_parameter_names)
+
+
+# The async tests are in a separate module because they use syntax that isn't available before python 3.5.
+if sys.version_info >= (3, 5):
+    from .compiled_wrappers_py35 import *  # noqa: F401,F403
@@ -0,0 +1,134 @@
+import mock
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator
+from django_universal_view_decorator.contrib.permissions import PermissionRequired, get_granted_permissions, \
+    has_permissions, permission_required
+
+
+class User(object):
+    """ A user that has the specified permissions and records its `has_perms()` calls. """
+    def __init__(self, *perms):
+        super(User, self).__init__()
+        self.perms = set(perms)
+        self.has_perms_calls = []
+
+    def has_perms(self, perm_list):
+        self.has_perms_calls.append(list(perm_list))
+        return set(perm_list) <= self.perms
+
+
+def create_request(method='get', *perms):
+    request = getattr(RequestFactory(), method)('/path/?a=1')
+    request.user = User(*perms)
+    return request
+
+
+class TestViewFunction(TestCase):
+    def test_stacked_decorators_are_checked_with_one_call(self):
+        @permission_required('app.a')
+        @permission_required(['app.b', 'app.c'])
+        def view_function(request):
+            return get_granted_permissions(request)
+
+        request = create_request('get', 'app.a', 'app.b', 'app.c')
+        self.assertEqual(view_function(request), frozenset(['app.a', 'app.b', 'app.c']))
+        self.assertListEqual(request.user.has_perms_calls, [['app.a', 'app.b', 'app.c']])
+
+    def test_redirects_to_login_page_without_permissions(self):
+        @permission_required('app.a')
+        def view_function(request):
+            return HttpResponse()
+
+        with self.settings(LOGIN_URL='/login/'):
+            response = view_function(create_request('get', 'app.b'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/login/?next=/path/%3Fa%3D1')
+
+        response = universal_view_decorator(permission_required('app.a', login_url='/other_login/'))(
+            view_function.view_function)(create_request('get'))
+        self.assertEqual(response['Location'], '/other_login/?next=/path/%3Fa%3D1')
+
+    def test_raise_exception(self):
+        @permission_required('app.a', raise_exception=True)
+        def view_function(request):
+            return HttpResponse()
+
+        self.assertRaises(PermissionDenied, view_function, create_request('get', 'app.b'))
+        self.assertEqual(view_function(create_request('get', 'app.a')).status_code, 200)
+
+
+class TestViewClass(TestCase):
+    def test_class_level_and_method_level_permissions_are_checked_with_one_call(self):
+        @permission_required('app.view')
+        class Base(View):
+            def get(self, request):
+                return HttpResponse()
+
+            @permission_required('app.change')
+            def post(self, request):
+                return HttpResponse()
+
+        @permission_required('app.special')
+        class ViewClass(Base):
+            pass
+
+        # the class level decorators have been merged
+        self.assertEqual(len(ViewClass._view_class_decorator_chain), 1)
+        view = ViewClass.as_view()
+
+        for method, expected_perms in (('get', ['app.special', 'app.view']),
+                                       ('head', ['app.special', 'app.view']),
+                                       ('post', ['app.change', 'app.special', 'app.view'])):
+            request = create_request(method, 'app.view', 'app.change', 'app.special')
+            self.assertEqual(view(request).status_code, 200)
+            self.assertListEqual(request.user.has_perms_calls, [expected_perms])
+
+        request = create_request('post', 'app.view', 'app.special')
+        self.assertEqual(view(request).status_code, 302)
+        self.assertEqual(Base.as_view()(create_request('get', 'app.view')).status_code, 200)
+
+    def test_merged_decorator_takes_the_settings_of_the_newest_decorator(self):
+        @permission_required('app.a')
+        class Base(View):
+            def get(self, request):
+                return HttpResponse()
+
+        @permission_required('app.b', raise_exception=True)
+        class ViewClass(Base):
+            pass
+
+        decorator, = ViewClass._view_class_decorator_chain.decorators
+        self.assertIsInstance(decorator, PermissionRequired)
+        self.assertEqual(decorator.perms, frozenset(['app.a', 'app.b']))
+        self.assertRaises(PermissionDenied, ViewClass.as_view(), create_request('get', 'app.a'))
+
+
+class TestHasPermissions(TestCase):
+    def test_granted_permissions_are_cached_on_the_request(self):
+        request = create_request('get', 'app.a', 'app.b')
+        self.assertTrue(has_permissions(request, ['app.a']))
+        self.assertTrue(has_permissions(request, ['app.a', 'app.b']))
+        self.assertTrue(has_permissions(request, ['app.b']))
+        self.assertFalse(has_permissions(request, ['app.a', 'app.c']))
+        self.assertTrue(has_permissions(request, []))
+        self.assertListEqual(request.user.has_perms_calls, [['app.a'], ['app.b'], ['app.c']])
+        self.assertEqual(get_granted_permissions(request), frozenset(['app.a', 'app.b']))
+
+    def test_view_reuses_the_permissions_checked_by_the_decorator(self):
+        @permission_required('app.a')
+        def view_function(request):
+            return has_permissions(request, ['app.a'])
+
+        request = create_request('get', 'app.a')
+        self.assertTrue(view_function(request))
+        self.assertEqual(len(request.user.has_perms_calls), 1)
+
+    def test_missing_user_permissions_are_checked_by_the_user(self):
+        request = create_request('get')
+        request.user = mock.Mock(has_perms=mock.Mock(return_value=False))
+        self.assertFalse(has_permissions(request, ['app.b', 'app.a']))
+        request.user.has_perms.assert_called_once_with(['app.a', 'app.b'])
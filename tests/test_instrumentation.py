@@ -0,0 +1,179 @@
+import mock
+from django.test import TestCase, override_settings
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator
+from django_universal_view_decorator import instrumentation
+from django_universal_view_decorator.five import full_qualname
+from django_universal_view_decorator.decorators.view_routine_decorator import ViewRoutineDecorator
+from django_universal_view_decorator.instrumentation import HistogramSink, LayerHistogram, LoggingSink, \
+    VIEW_LAYER_NAME, add_sink, remove_sink
+
+from .timing_utils import SlowViewDecorator, clock, slow_decorator
+
+
+class ListSink(object):
+    def __init__(self):
+        super(ListSink, self).__init__()
+        self.records = []
+
+    def record(self, view_name, layer_name, seconds):
+        self.records.append((view_name, layer_name, seconds))
+
+
+def layer(decorator):
+    return instrumentation.get_layer_name(decorator)
+
+
+# Tests
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        super(InstrumentationTestCase, self).setUp()
+        self.sink = add_sink(ListSink())
+        self.addCleanup(remove_sink, self.sink)
+        patcher = mock.patch.object(instrumentation, '_timer', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_INSTRUMENTATION=True)
+class TestInstrumentation(InstrumentationTestCase):
+    def test_view_function(self):
+        decorator_1, decorator_2 = slow_decorator(1), slow_decorator(2)
+
+        @universal_view_decorator(decorator_1, decorator_2)
+        def view_function(request):
+            clock.advance(4)
+            return 'response'
+
+        self.assertEqual(view_function('request'), 'response')
+        view_name = full_qualname(view_function.view_function)
+        self.assertListEqual(self.sink.records, [
+            (view_name, VIEW_LAYER_NAME, 4),
+            (view_name, layer(decorator_2), 2),
+            (view_name, layer(decorator_1), 1),
+            (view_name, layer(ViewRoutineDecorator), 0),
+        ])
+
+    def test_stacked_view_decorator_base_subclasses_on_view_class_method(self):
+        decorator_1 = slow_decorator(1)
+
+        class ViewClass(View):
+            @SlowViewDecorator.universal_decorator
+            @universal_view_decorator(decorator_1)
+            def get(self, request):
+                clock.advance(4)
+                return 'response'
+
+        self.assertEqual(ViewClass().get('request'), 'response')
+        view_name = full_qualname(ViewClass.__dict__['get'].view_function)
+        self.assertListEqual(self.sink.records, [
+            (view_name, VIEW_LAYER_NAME, 4),
+            (view_name, layer(decorator_1), 1),
+            (view_name, layer(ViewRoutineDecorator), 0),
+            (view_name, layer(SlowViewDecorator), 8),
+        ])
+
+    def test_view_class(self):
+        decorator_1, decorator_2, decorator_16 = slow_decorator(1), slow_decorator(2), slow_decorator(16)
+
+        @universal_view_decorator(decorator_1)
+        class Base(View):
+            @universal_view_decorator(decorator_16)
+            def get(self, request):
+                clock.advance(4)
+                return 'response'
+
+        @SlowViewDecorator.universal_decorator
+        @universal_view_decorator(decorator_2)
+        class ViewClass(Base):
+            pass
+
+        self.assertEqual(ViewClass.as_view()(mock.Mock(method='GET')), 'response')
+        view_name = full_qualname(ViewClass)
+        method_name = full_qualname(Base.__dict__['get'].view_function)
+        self.assertListEqual(self.sink.records, [
+            (method_name, VIEW_LAYER_NAME, 4),
+            (method_name, layer(decorator_16), 16),
+            (method_name, layer(ViewRoutineDecorator), 0),
+            # View.dispatch() and the view function created by View.as_view()
+            (view_name, VIEW_LAYER_NAME, 0),
+            (view_name, layer(decorator_1), 1),
+            (view_name, layer(decorator_2), 2),
+            (view_name, layer(SlowViewDecorator), 8),
+        ])
+
+    def test_exclusive_time_is_reported_when_the_view_raises(self):
+        decorator_1 = slow_decorator(1)
+
+        @universal_view_decorator(decorator_1)
+        def view_function(request):
+            clock.advance(4)
+            raise ValueError
+
+        self.assertRaises(ValueError, view_function, 'request')
+        self.assertListEqual([(layer_name, seconds) for _, layer_name, seconds in self.sink.records], [
+            (VIEW_LAYER_NAME, 4),
+            (layer(decorator_1), 1),
+            (layer(ViewRoutineDecorator), 0),
+        ])
+
+
+class TestInstrumentationDisabled(InstrumentationTestCase):
+    def test_chains_dont_contain_timing_code(self):
+        received_views = []
+
+        def decorator(wrapped):
+            received_views.append(wrapped)
+            return wrapped
+
+        def view_function(request):
+            return 'response'
+
+        decorated_view_function = universal_view_decorator(decorator)(view_function)
+        self.assertEqual(decorated_view_function('request'), 'response')
+        self.assertIs(decorated_view_function.view_function_to_call, view_function)
+        self.assertIs(decorated_view_function.call_view_function.__func__,
+                      ViewRoutineDecorator.__dict__['_call_view_function'])
+        self.assertIs(received_views[0], view_function)
+
+        @universal_view_decorator(decorator)
+        class ViewClass(View):
+            pass
+
+        as_view_function = ViewClass.as_view()
+        self.assertIs(received_views[1].view_class, ViewClass)
+        self.assertFalse(instrumentation.is_instrumented(as_view_function))
+        self.assertListEqual(self.sink.records, [])
+
+
+class TestHistogramSink(TestCase):
+    def test_histograms(self):
+        sink = HistogramSink(buckets=(1, 2, 5))
+        for seconds in (0.5, 1, 1.5, 3, 4, 7):
+            sink.record('view', 'layer', seconds)
+        sink.record('view', 'other_layer', 1)
+
+        histogram = sink.get_histogram('view', 'layer')
+        self.assertIsInstance(histogram, LayerHistogram)
+        self.assertEqual(list(histogram.counts), [2, 1, 2, 1])
+        self.assertEqual(histogram.count, 6)
+        self.assertEqual(histogram.total, 17)
+        self.assertEqual(histogram.max, 7)
+        self.assertEqual(histogram.percentile(50), 2)
+        self.assertEqual(histogram.percentile(90), 7)
+        self.assertEqual(sink.get_histogram('view', 'other_layer').count, 1)
+
+        sink.reset()
+        self.assertIsNone(sink.get_histogram('view', 'layer'))
+
+
+class TestLoggingSink(TestCase):
+    def test_logging(self):
+        logger = mock.Mock()
+        sink = LoggingSink(logger=logger)
+        sink.record('view', 'layer', 0.0000015)
+        logger.log.assert_called_once_with(10, '%(view)s %(layer)s %(microseconds).1fus', dict(
+            view='view', layer='layer', microseconds=mock.ANY))
@@ -0,0 +1,142 @@
+import mock
+from django.test import TestCase, override_settings
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator
+from django_universal_view_decorator import latency_budgets
+from django_universal_view_decorator.five import full_qualname
+
+from .timing_utils import SlowViewDecorator, clock, slow_decorator
+
+
+# Test decorators
+
+
+def budgeted(decorator, budget):
+    decorator.decorator_latency_budget = budget
+    return decorator
+
+
+class BudgetedSlowViewDecorator(SlowViewDecorator):
+    decorator_latency_budget = 5
+
+
+def slow_view(request):
+    clock.advance(100)
+    return 'response'
+
+
+# Tests
+
+
+class LatencyBudgetTestCase(TestCase):
+    def setUp(self):
+        super(LatencyBudgetTestCase, self).setUp()
+        latency_budgets.reset_warnings()
+        self.addCleanup(latency_budgets.reset_warnings)
+        patcher = mock.patch.object(latency_budgets, '_timer', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(latency_budgets, 'logger')
+        self.logger = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_warnings(self, expected_warnings):
+        self.assertListEqual([
+            (kwargs['view'], kwargs['layer'], kwargs['milliseconds'], kwargs['num_suppressed'])
+            for (_, kwargs), _ in self.logger.warning.call_args_list
+        ], [(view, layer, milliseconds, num_suppressed)
+            for view, layer, milliseconds, num_suppressed in expected_warnings])
+
+
+class TestLatencyBudgets(LatencyBudgetTestCase):
+    def test_view_function(self):
+        decorator_1, decorator_2 = budgeted(slow_decorator(1), 2), budgeted(slow_decorator(3), 2)
+        view_function = universal_view_decorator(decorator_1, decorator_2)(slow_view)
+
+        self.assertEqual(view_function('request'), 'response')
+        # The time of the inner layers and the view isn't attributed to the decorators.
+        self.assert_warnings([(full_qualname(slow_view), full_qualname(decorator_2), 3000, 0)])
+
+    def test_latency_budget_param(self):
+        decorator_1, decorator_2 = slow_decorator(1), slow_decorator(3)
+        view_function = universal_view_decorator(decorator_1, decorator_2, latency_budget=0.5)(slow_view)
+
+        self.assertEqual(view_function('request'), 'response')
+        self.assert_warnings([
+            (full_qualname(slow_view), full_qualname(decorator_2), 3000, 0),
+            (full_qualname(slow_view), full_qualname(decorator_1), 1000, 0),
+        ])
+
+    def test_setting_overrides_attribute(self):
+        decorator_1 = budgeted(slow_decorator(1), 2)
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGETS={full_qualname(decorator_1): 0.5}):
+            view_function = universal_view_decorator(decorator_1)(slow_view)
+
+        self.assertEqual(view_function('request'), 'response')
+        self.assert_warnings([(full_qualname(slow_view), full_qualname(decorator_1), 1000, 0)])
+
+    def test_view_decorator_base(self):
+        class ViewClass(View):
+            @BudgetedSlowViewDecorator.universal_decorator
+            def get(self, request):
+                clock.advance(100)
+                return 'response'
+
+        view_function = BudgetedSlowViewDecorator.universal_decorator(slow_view)
+        self.assertEqual(view_function('request'), 'response')
+        self.assertEqual(ViewClass().get('request'), 'response')
+        self.assert_warnings([
+            (full_qualname(slow_view), full_qualname(BudgetedSlowViewDecorator), 8000, 0),
+            (full_qualname(ViewClass.__dict__['get'].view_function), full_qualname(BudgetedSlowViewDecorator), 8000, 0),
+        ])
+
+    def test_view_class(self):
+        decorator_1, decorator_2 = budgeted(slow_decorator(1), 2), budgeted(slow_decorator(3), 2)
+
+        @universal_view_decorator(decorator_1)
+        class Base(View):
+            def get(self, request):
+                clock.advance(100)
+                return 'response'
+
+        @BudgetedSlowViewDecorator.universal_decorator
+        @universal_view_decorator(decorator_2)
+        class ViewClass(Base):
+            pass
+
+        self.assertEqual(ViewClass.as_view()(mock.Mock(method='GET')), 'response')
+        self.assert_warnings([
+            (full_qualname(ViewClass), full_qualname(decorator_2), 3000, 0),
+            (full_qualname(ViewClass), full_qualname(BudgetedSlowViewDecorator), 8000, 0),
+        ])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_LATENCY_BUDGET_WARNING_INTERVAL=1000)
+    def test_warnings_are_rate_limited(self):
+        decorator_1 = budgeted(slow_decorator(1), 0.5)
+        view_function = universal_view_decorator(decorator_1)(slow_view)
+        other_view_function = universal_view_decorator(decorator_1)(lambda request: 'response')
+
+        for _ in range(5):
+            view_function('request')
+        other_view_function('request')
+        clock.advance(1000)
+        view_function('request')
+        self.assert_warnings([
+            (full_qualname(slow_view), full_qualname(decorator_1), 1000, 0),
+            (full_qualname(other_view_function.view_function), full_qualname(decorator_1), 1000, 0),
+            (full_qualname(slow_view), full_qualname(decorator_1), 1000, 4),
+        ])
+
+    def test_chains_without_budgets_arent_measured(self):
+        received_views = []
+
+        def decorator(wrapped):
+            received_views.append(wrapped)
+            return wrapped
+
+        view_function = universal_view_decorator(decorator)(slow_view)
+        self.assertEqual(view_function('request'), 'response')
+        self.assertIsNone(view_function.view_decorator.latency_budgets)
+        self.assertIs(received_views[0], slow_view)
+        self.assert_warnings([])
@@ -0,0 +1,142 @@
+import functools
+
+import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.views.generic import View
+
+from django_universal_view_decorator import ViewDecoratorBase, universal_view_decorator
+from django_universal_view_decorator.decorators.view_routine_decorator import ViewRoutineDecorator
+from django_universal_view_decorator.five import full_qualname
+from django_universal_view_decorator.instrumentation import VIEW_LAYER_NAME
+from django_universal_view_decorator.query_accounting import assert_max_layer_queries, query_stats, \
+    recording_queries
+
+
+def run_queries(num_queries):
+    with connection.cursor() as cursor:
+        for _ in range(num_queries):
+            cursor.execute('SELECT 1')
+
+
+# Test decorators
+
+
+def querying_decorator(num_queries):
+    def decorator(wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            run_queries(num_queries)
+            return wrapped(*args, **kwargs)
+        return wrapper
+    decorator.__name__ = 'querying_decorator_{}'.format(num_queries)
+    decorator.__qualname__ = decorator.__name__
+    return decorator
+
+
+class QueryingViewDecorator(ViewDecoratorBase):
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        run_queries(4)
+        return view_function(*args, **kwargs)
+
+
+def counts(stats):
+    return [(view_name, layer_name, count) for (view_name, layer_name), (count, _) in stats.items()]
+
+
+# Tests
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_QUERY_ACCOUNTING=True)
+class TestQueryAccounting(TestCase):
+    def setUp(self):
+        super(TestQueryAccounting, self).setUp()
+        if not hasattr(connection, 'execute_wrappers'):
+            self.skipTest('connection.execute_wrapper() is available only in django 2.0+')
+
+    def test_view_function(self):
+        decorator_1, decorator_2 = querying_decorator(1), querying_decorator(2)
+
+        @universal_view_decorator(decorator_1, decorator_2)
+        def view_function(request):
+            run_queries(3)
+            return 'response'
+
+        with recording_queries() as stats:
+            self.assertEqual(view_function('request'), 'response')
+        run_queries(1)
+        view_name = full_qualname(view_function.view_function)
+        self.assertListEqual(counts(stats), sorted([
+            (view_name, full_qualname(decorator_1), 1),
+            (view_name, full_qualname(decorator_2), 2),
+            (view_name, VIEW_LAYER_NAME, 3),
+        ]))
+        count, seconds = stats.get(view_name, full_qualname(decorator_2))
+        self.assertEqual(count, 2)
+        self.assertGreater(seconds, 0)
+        self.assertEqual(stats.get(view_name, full_qualname(ViewRoutineDecorator)), (0, 0.0))
+        self.assertListEqual(connection.execute_wrappers, [])
+
+    def test_view_class(self):
+        decorator_1 = querying_decorator(1)
+
+        @universal_view_decorator(decorator_1)
+        class ViewClass(View):
+            @QueryingViewDecorator.universal_decorator
+            def get(self, request):
+                run_queries(2)
+                return 'response'
+
+        with recording_queries() as stats:
+            self.assertEqual(ViewClass.as_view()(mock.Mock(method='GET')), 'response')
+        view_name = full_qualname(ViewClass)
+        self.assertListEqual(counts(stats), sorted([
+            (view_name, full_qualname(decorator_1), 1),
+            (view_name + '.get', full_qualname(QueryingViewDecorator), 4),
+            (view_name + '.get', VIEW_LAYER_NAME, 2),
+        ]))
+
+    def test_query_stats(self):
+        decorator_1 = querying_decorator(1)
+        view_function = universal_view_decorator(decorator_1)(lambda request: 'response')
+        view_name = full_qualname(view_function.view_function)
+        self.addCleanup(query_stats.reset)
+
+        view_function('request')
+        view_function('request')
+        self.assertEqual(query_stats.get(view_name, full_qualname(decorator_1))[0], 2)
+
+    def test_assert_max_layer_queries(self):
+        decorator_1, decorator_2 = querying_decorator(1), querying_decorator(2)
+
+        @universal_view_decorator(decorator_1, decorator_2)
+        def view_function(request):
+            run_queries(3)
+            return 'response'
+
+        view_name = full_qualname(view_function.view_function)
+        with assert_max_layer_queries(2):
+            view_function('request')
+        with self.assertRaises(AssertionError) as context:
+            with assert_max_layer_queries(1):
+                view_function('request')
+        self.assertEqual(str(context.exception), '1 layer(s) exceeded the limit of 1 queries:\n{} {}: 2 queries'.format(
+            view_name, full_qualname(decorator_2)))
+        self.assertRaisesRegexp(AssertionError, VIEW_LAYER_NAME + ': 3 queries',
+                                self._call_with_max_layer_queries, view_function, 2, [VIEW_LAYER_NAME])
+
+    @staticmethod
+    def _call_with_max_layer_queries(view_function, max_queries, layer_names):
+        with assert_max_layer_queries(max_queries, layer_names):
+            view_function('request')
+
+
+class TestQueryAccountingDisabled(TestCase):
+    def test_queries_arent_recorded(self):
+        decorator_1 = querying_decorator(1)
+        view_function = universal_view_decorator(decorator_1)(lambda request: 'response')
+
+        with recording_queries() as stats:
+            view_function('request')
+        self.assertListEqual(stats.items(), [])
+        self.assertIs(view_function.view_function_to_call, view_function.view_function)
@@ -0,0 +1,125 @@
+import sys
+import threading
+
+import mock
+from django.test import TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import ViewDecoratorBase
+from django_universal_view_decorator.request_memo import get_request_memo, memoized
+
+
+# Test decorators
+
+
+class StoreUser(ViewDecoratorBase):
+    """ Stores the user of the request in the request memo. """
+    uses_request_memo = True
+
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        decoration_instance.request_memo['user'] = args[0].user
+        return view_function(*args, **kwargs)
+
+
+class CheckUser(ViewDecoratorBase):
+    """ Reads the user stored by an outer layer. """
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        assert decoration_instance.request_memo['user'] is args[0].user
+        return view_function(*args, **kwargs)
+
+
+class ResolveTenant(ViewDecoratorBase):
+    uses_request_memo = True
+
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        memoized('tenant', args[0].resolve_tenant)
+        return view_function(*args, **kwargs)
+
+
+class PassThrough(ViewDecoratorBase):
+    pass
+
+
+def create_request(user='user'):
+    return mock.Mock(user=user, method='GET', resolve_tenant=mock.Mock(return_value='tenant'))
+
+
+# Tests
+
+
+class TestRequestMemo(TestCase):
+    def test_view_function(self):
+        @StoreUser.universal_decorator
+        @CheckUser.universal_decorator
+        def view_function(request):
+            return memoized('tenant', request.resolve_tenant), get_request_memo()
+
+        request = create_request()
+        tenant, memo = view_function(request)
+        self.assertEqual(tenant, 'tenant')
+        self.assertDictEqual(memo, {'user': 'user', 'tenant': 'tenant'})
+        # the scope has been closed
+        self.assertIsNone(get_request_memo())
+        # every request has its own memo
+        self.assertIsNot(view_function(create_request())[1], memo)
+
+    def test_view_class(self):
+        @ResolveTenant.universal_decorator
+        class ViewClass(View):
+            @ResolveTenant.universal_decorator
+            def get(self, request):
+                return memoized('tenant', request.resolve_tenant)
+
+        request = create_request()
+        self.assertEqual(ViewClass.as_view()(request), 'tenant')
+        # the inner layer and the view have reused the value computed by the class level layer
+        request.resolve_tenant.assert_called_once_with()
+        self.assertIsNone(get_request_memo())
+
+    def test_scope_is_closed_when_the_view_raises(self):
+        @ResolveTenant.universal_decorator
+        def view_function(request):
+            raise ValueError(get_request_memo())
+
+        with self.assertRaises(ValueError) as context:
+            view_function(create_request())
+        self.assertDictEqual(context.exception.args[0], {'tenant': 'tenant'})
+        self.assertIsNone(get_request_memo())
+
+    def test_chains_without_memo_users_dont_open_a_scope(self):
+        @PassThrough.universal_decorator
+        def view_function(request):
+            return get_request_memo(), memoized('tenant', request.resolve_tenant)
+
+        @CheckUser.universal_decorator
+        def checking_view_function(request):
+            pass
+
+        self.assertEqual(view_function(create_request()), (None, 'tenant'))
+        # the python 2 unbound methods have a __func__ attribute too
+        self.assertIs(view_function.call_view_function.__func__,
+                      getattr(PassThrough._call_view_function, '__func__', PassThrough._call_view_function))
+        self.assertRaisesRegexp(RuntimeError, 'uses_request_memo = True', checking_view_function, create_request())
+
+    def test_threads_have_their_own_memo(self):
+        # both threads are in their memo scope at the same time
+        events = {'a': threading.Event(), 'b': threading.Event()}
+        results = {}
+
+        @StoreUser.universal_decorator
+        def view_function(request):
+            events[request.user].set()
+            events['b' if request.user == 'a' else 'a'].wait(5)
+            results[request.user] = get_request_memo()['user']
+
+        threads = [threading.Thread(target=view_function, args=(create_request(user),)) for user in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertDictEqual(results, {'a': 'a', 'b': 'b'})
+
+
+# The async tests are in a separate module because they use syntax that isn't available before python 3.5.
+if sys.version_info >= (3, 5):
+    from .request_memo_py35 import *  # noqa: F401,F403
@@ -0,0 +1,338 @@
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import functools
+import itertools
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.views.generic import View
+
+from django_universal_view_decorator import ViewDecoratorBase, universal_view_decorator
+from django_universal_view_decorator import tracing
+from django_universal_view_decorator.five import full_qualname
+from django_universal_view_decorator.decorators.view_routine_decorator import ViewRoutineDecorator
+from django_universal_view_decorator.instrumentation import VIEW_LAYER_NAME, get_layer_name, is_instrumented
+
+from .timing_utils import clock, slow_decorator
+
+
+# Test decorators
+
+
+one_second_decorator = slow_decorator(1)
+
+
+def short_circuiting_decorator(wrapped):
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        return 'redirect'
+    return wrapper
+
+
+class MyViewDecorator(ViewDecoratorBase):
+    pass
+
+
+def describe_spans(trace):
+    return [(depth, span.layer_name, span.start, span.duration) for depth, span in trace.iter_spans()]
+
+
+# Tests
+
+
+class TracingTestCase(TestCase):
+    def setUp(self):
+        super(TracingTestCase, self).setUp()
+        tracing.clear_traces()
+        self.addCleanup(tracing.clear_traces)
+        for name, value in (('_timer', clock), ('_request_counter', itertools.count())):
+            patcher = mock.patch.object(tracing, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        clock.time = 0
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE=3)
+class TestTracing(TracingTestCase):
+    def test_view_function(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            clock.advance(4)
+            return 'response'
+
+        for _ in range(7):
+            self.assertEqual(view_function('request'), 'response')
+        # the 1st, 4th and 7th requests
+        traces = tracing.get_traces()
+        self.assertEqual(len(traces), 3)
+        self.assertListEqual(describe_spans(traces[1]), [
+            (0, get_layer_name(ViewRoutineDecorator), 0, 5),
+            (1, get_layer_name(one_second_decorator), 0, 5),
+            (2, VIEW_LAYER_NAME, 1, 4),
+        ])
+        self.assertIsNone(traces[1].request)
+        self.assertEqual(traces[1].root.view_name, full_qualname(view_function.view_function))
+        self.assertEqual(traces[1].duration, 5)
+
+    def test_view_class(self):
+        @universal_view_decorator(one_second_decorator)
+        class ViewClass(View):
+            @MyViewDecorator.universal_decorator
+            def get(self, request):
+                return HttpResponse()
+
+        ViewClass.as_view()(RequestFactory().get('/path/'))
+        trace, = tracing.get_traces()
+        self.assertEqual(trace.request, 'GET /path/')
+        view_name = full_qualname(ViewClass)
+        method_name = full_qualname(ViewClass.__dict__['get'].view_function)
+        self.assertListEqual([(depth, span.view_name, span.layer_name) for depth, span in trace.iter_spans()], [
+            (0, view_name, get_layer_name(one_second_decorator)),
+            (1, view_name, VIEW_LAYER_NAME),
+            (2, method_name, get_layer_name(MyViewDecorator)),
+            (3, method_name, VIEW_LAYER_NAME),
+        ])
+
+    def test_short_circuit_and_exception(self):
+        @universal_view_decorator(one_second_decorator, short_circuiting_decorator)
+        def short_circuited_view(request):
+            return 'response'
+
+        @universal_view_decorator(one_second_decorator)
+        def failing_view(request):
+            raise ValueError('failure')
+
+        with tracing.sampling():
+            self.assertEqual(short_circuited_view('request'), 'redirect')
+            self.assertRaises(ValueError, failing_view, 'request')
+        short_circuit_trace, exception_trace = tracing.get_traces()
+        exception_repr = repr(ValueError('failure'))
+        spans = [span for _, span in short_circuit_trace.iter_spans()]
+        self.assertListEqual([(span.layer_name, span.short_circuited) for span in spans], [
+            (get_layer_name(ViewRoutineDecorator), False),
+            (get_layer_name(one_second_decorator), False),
+            (get_layer_name(short_circuiting_decorator), True),
+        ])
+        self.assertListEqual([(span.layer_name, span.exception) for _, span in exception_trace.iter_spans()], [
+            (get_layer_name(ViewRoutineDecorator), exception_repr),
+            (get_layer_name(one_second_decorator), exception_repr),
+            (VIEW_LAYER_NAME, exception_repr),
+        ])
+        self.assertIn(' short-circuited', tracing.format_trace(short_circuit_trace))
+        self.assertIn(' raised ' + exception_repr, tracing.format_trace(exception_trace))
+
+    def test_sampling_override(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return 'response'
+
+        with tracing.sampling(False):
+            for _ in range(4):
+                view_function('request')
+        self.assertListEqual(tracing.get_traces(), [])
+        with tracing.sampling():
+            for _ in range(2):
+                view_function('request')
+        self.assertEqual(len(tracing.get_traces()), 2)
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_TRACE_BUFFER_SIZE=2)
+    def test_ring_buffer(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            clock.advance(4)
+            return 'response'
+
+        with tracing.sampling():
+            for _ in range(3):
+                view_function('request')
+        traces = tracing.get_traces()
+        self.assertEqual(len(traces), 2)
+        self.assertListEqual([trace.root.start for trace in traces], [0, 0])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE=0)
+    def test_zero_sample_rate_traces_only_forced_requests(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return 'response'
+
+        view_function('request')
+        self.assertListEqual(tracing.get_traces(), [])
+        with tracing.sampling():
+            view_function('request')
+        self.assertEqual(len(tracing.get_traces()), 1)
+
+
+class TestTracingDisabled(TracingTestCase):
+    def test_chains_dont_contain_tracing_code(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return 'response'
+
+        with tracing.sampling():
+            view_function('request')
+        self.assertListEqual(tracing.get_traces(), [])
+        self.assertFalse(is_instrumented(view_function))
+
+    def test_chains_built_with_tracing_enabled_are_traced(self):
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE=0):
+            @universal_view_decorator(one_second_decorator)
+            def view_function(request):
+                return 'response'
+
+        # the chain of universal_view_decorator is composed by the first call
+        with tracing.sampling():
+            view_function('request')
+        trace, = tracing.get_traces()
+        self.assertListEqual([span.layer_name for _, span in trace.iter_spans()], [
+            get_layer_name(ViewRoutineDecorator), get_layer_name(one_second_decorator), VIEW_LAYER_NAME,
+        ])
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE=0)
+class TestTraceFile(TracingTestCase):
+    def setUp(self):
+        super(TestTraceFile, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.trace_file = os.path.join(directory, 'traces.jsonl')
+
+    def test_traces_are_appended_to_the_file(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            raise ValueError('failure')
+
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=self.trace_file), tracing.sampling():
+            for _ in range(2):
+                self.assertRaises(ValueError, view_function, RequestFactory().post('/path/'))
+        with open(self.trace_file) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertDictEqual(json.loads(lines[0]), tracing.trace_to_dict(tracing.get_traces()[0]))
+
+        traces = tracing.read_traces(self.trace_file)
+        self.assertListEqual([tracing.format_trace(trace) for trace in traces],
+                             [tracing.format_trace(trace) for trace in tracing.get_traces()])
+        self.assertEqual(traces[0].request, 'POST /path/')
+        self.assertListEqual(describe_spans(traces[0]), describe_spans(tracing.get_traces()[0]))
+
+    def test_invalid_lines_are_skipped(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return 'response'
+
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=self.trace_file), tracing.sampling():
+            view_function('request')
+        with open(self.trace_file, 'a') as f:
+            f.write('{"timestamp": 0, "req')
+        self.assertEqual(len(tracing.read_traces(self.trace_file)), 1)
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_TRACE_BUFFER_SIZE=3)
+    def test_the_file_is_rotated_at_the_buffer_size(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return HttpResponse()
+
+        def read_paths(path):
+            with open(path) as f:
+                return [json.loads(line)['request'] for line in f]
+
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=self.trace_file), tracing.sampling():
+            for index in range(4):
+                view_function(RequestFactory().get('/view/{}/'.format(index)))
+            # a trace appended by another process is counted too
+            with open(self.trace_file, 'a') as f:
+                f.write(json.dumps(tracing.trace_to_dict(tracing.get_traces()[-1])) + '\n')
+            view_function(RequestFactory().get('/view/5/'))
+            view_function(RequestFactory().get('/view/6/'))
+
+        rotated_file = self.trace_file + tracing.ROTATED_FILE_SUFFIX
+        self.assertListEqual(read_paths(rotated_file), ['GET /view/3/', 'GET /view/3/', 'GET /view/5/'])
+        self.assertListEqual(read_paths(self.trace_file), ['GET /view/6/'])
+        self.assertListEqual([trace.request for trace in tracing.read_traces(self.trace_file)],
+                             ['GET /view/3/', 'GET /view/3/', 'GET /view/5/', 'GET /view/6/'])
+
+    def test_the_file_is_written_without_holding_the_lock(self):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return 'response'
+
+        def write_trace(*args):
+            self.assertFalse(tracing._traces_lock.locked())
+
+        with mock.patch.object(tracing, '_write_trace', side_effect=write_trace) as mock_write_trace, \
+                self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=self.trace_file), tracing.sampling():
+            view_function('request')
+        self.assertEqual(mock_write_trace.call_count, 1)
+
+    @mock.patch.object(tracing, 'logger')
+    def test_failing_write_doesnt_fail_the_request(self, mock_logger):
+        @universal_view_decorator(one_second_decorator)
+        def view_function(request):
+            return 'response'
+
+        trace_file = os.path.join(self.trace_file, 'missing_directory', 'traces.jsonl')
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=trace_file), tracing.sampling():
+            self.assertEqual(view_function('request'), 'response')
+        self.assertEqual(len(tracing.get_traces()), 1)
+        self.assertEqual(mock_logger.warning.call_count, 1)
+
+
+class TestViewDecoratorTracesCommand(TracingTestCase):
+    def setUp(self):
+        super(TestViewDecoratorTracesCommand, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.trace_file = os.path.join(directory, 'traces.jsonl')
+
+    def call_command(self, *args, **kwargs):
+        stdout = StringIO()
+        call_command('view_decorator_traces', *args, stdout=stdout, **kwargs)
+        return stdout.getvalue()
+
+    def write_traces(self, num_requests):
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_SAMPLE_RATE=0):
+            @universal_view_decorator(one_second_decorator)
+            def view_function(request):
+                return HttpResponse()
+
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=self.trace_file), tracing.sampling():
+            for index in range(num_requests):
+                view_function(RequestFactory().get('/view/{}/'.format(index)))
+        return view_function
+
+    def test_prints_the_traces_of_the_trace_file(self):
+        view_function = self.write_traces(2)
+        # the command runs in another process
+        tracing.clear_traces()
+        with self.settings(UNIVERSAL_VIEW_DECORATOR_TRACE_FILE=self.trace_file):
+            lines = self.call_command().splitlines()
+
+        self.assertEqual(len(lines), 2 * 4)
+        self.assertTrue(lines[0].endswith(' GET /view/0/ (1000000.0us)'), lines[0])
+        self.assertListEqual(lines[1:4], [
+            '  {} [{}] +0.0us 1000000.0us'.format(get_layer_name(ViewRoutineDecorator),
+                                                  full_qualname(view_function.view_function)),
+            '    {} +0.0us 1000000.0us'.format(get_layer_name(one_second_decorator)),
+            '      {} +1000000.0us 0.0us'.format(VIEW_LAYER_NAME),
+        ])
+        self.assertTrue(lines[4].endswith(' GET /view/1/ (1000000.0us)'), lines[4])
+
+    def test_file_and_last_options(self):
+        self.write_traces(3)
+        lines = self.call_command(file=self.trace_file, last=1).splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].endswith(' GET /view/2/ (1000000.0us)'), lines[0])
+
+    def test_missing_trace_file(self):
+        self.assertRaisesRegexp(CommandError, 'UNIVERSAL_VIEW_DECORATOR_TRACE_FILE', self.call_command)
+        self.assertRaisesRegexp(CommandError, 'Failed to read the trace file', self.call_command,
+                                file=self.trace_file)
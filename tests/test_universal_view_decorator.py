@@ -358,3 +358,47 @@ class TestDuplicateIdParamHasToBeSpecified(TestCase):
         with self.assertRaisesRegexp(ValueError, re.escape(
                 r"You have used duplicate decorator related parameters without the 'duplicate_id' parameter")):
             universal_view_decorator(decorator(0), duplicate_handler_func=lambda duplicate_id, duplicates: None)
+
+    def test_duplicate_merge_func_without_duplicate_id_fails(self):
+        with self.assertRaisesRegexp(ValueError, re.escape(
+                r"You have used duplicate decorator related parameters without the 'duplicate_id' parameter")):
+            universal_view_decorator(decorator(0), duplicate_merge_func=lambda duplicate_id, decorators: None)
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestDecoratorDuplicateHandlingParamsDontAddCallLayers(TestCase):
+    def test_original_decorator_is_applied_to_view_function(self, mock_test_log):
+        decorator_1 = decorator(1)
+
+        @universal_view_decorator(decorator_1, duplicate_id='id', duplicate_priority=1)
+        def view_function(request, *args, **kwargs):
+            return 'response'
+
+        with mock.patch.object(Decorator, '__call__', autospec=True, side_effect=Decorator.__call__) as mock_call:
+            self.assertEqual(view_function('request'), 'response')
+            mock_call.assert_called_once_with(decorator_1, mock.ANY)
+
+    def test_original_decorator_is_in_the_view_class_decorator_chain(self, mock_test_log):
+        decorator_1 = decorator(1)
+        decorator_2 = decorator(2)
+
+        @universal_view_decorator(decorator_1, duplicate_id='id', duplicate_priority=1)
+        @universal_view_decorator(decorator_2)
+        class ViewClass(View):
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch', ViewClass)
+                return 'response'
+
+        self.assertEqual(ViewClass._view_class_decorator_chain.decorators, (decorator_2, decorator_1))
+        accumulated_decorator = ViewClass._accumulated_view_class_decorators[0]['decorator']
+        self.assertEqual(accumulated_decorator.decorator_duplicate_id, 'id')
+        self.assertEqual(accumulated_decorator.decorator_duplicate_priority, 1)
+        self.assertEqual(accumulated_decorator.decorator_id, 1)
+
+        response = ViewClass.as_view()('request')
+        self.assertEqual(response, 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 1),
+            mock.call('decorator', 2),
+            mock.call('dispatch', ViewClass),
+        ])
@@ -1,9 +1,14 @@
 import functools
+import threading
+
 import mock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.views.generic import View
 
-from django_universal_view_decorator.decorators.view_class_decorator import view_class_decorator, ViewClassDecorator
+from django_universal_view_decorator.decorators.decorator_with_attributes import DecoratorWithAttributes
+from django_universal_view_decorator.decorators.view_class_decorator import view_class_decorator, ViewClassDecorator, \
+    ViewClassDecoratorChain, AccumulatedViewClassDecorator, AccumulatedViewClassDecorators, \
+    resolve_pending_view_class_decorations
 
 
 def test_log(*args, **kwargs):
@@ -184,3 +189,356 @@ class TestDecorationErrors(TestCase):
             view_class_decorator(decorator(0)),
             NonViewClass
         )
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestHookedAsViewCache(TestCase):
+    def test_hooked_as_view_is_created_only_once_per_view_class(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class Base(View):
+            pass
+
+        class Derived(Base):
+            pass
+
+        self.assertIs(Base.as_view, Base.as_view)
+        self.assertIs(Derived.as_view, Derived.as_view)
+        self.assertIsNot(Base.as_view, Derived.as_view)
+
+    def test_cache_is_invalidated_by_decorating_the_view_class_again(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class ViewClass(View):
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch')
+                return 'response'
+
+        self.assertEqual(ViewClass.as_view()('request'), 'response')
+        hooked_as_view = ViewClass.as_view
+
+        view_class_decorator(decorator(1))(ViewClass)
+        self.assertIsNot(ViewClass.as_view, hooked_as_view)
+        self.assertEqual(ViewClass.as_view()('request'), 'response')
+
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('dispatch'),
+            mock.call('decorator', 1),
+            mock.call('decorator', 0),
+            mock.call('dispatch'),
+        ])
+
+    def test_cache_of_subclass_is_invalidated_by_decorating_its_base_class_later(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class Base(View):
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch')
+                return 'response'
+
+        class Derived(Base):
+            pass
+
+        self.assertEqual(Derived.as_view()('request'), 'response')
+        view_class_decorator(decorator(1))(Base)
+        self.assertEqual(Derived.as_view()('request'), 'response')
+
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('dispatch'),
+            mock.call('decorator', 1),
+            mock.call('decorator', 0),
+            mock.call('dispatch'),
+        ])
+
+
+class TestViewClassDecoratorChain(TestCase):
+    def test_chain_contains_the_decorators_in_application_order(self):
+        decorator_0, decorator_1, decorator_2 = decorator(0), decorator(1), decorator(2)
+
+        @view_class_decorator(decorator_0)
+        class Base(View):
+            pass
+
+        @view_class_decorator(decorator_1, decorator_2)
+        class Derived(Base):
+            pass
+
+        chain = Derived._view_class_decorator_chain
+        self.assertIsInstance(chain, ViewClassDecoratorChain)
+        self.assertEqual(chain.decorators, (decorator_0, decorator_2, decorator_1))
+        self.assertEqual(chain.view_classes, (Base, Derived, Derived))
+        self.assertEqual(len(chain), 3)
+        self.assertEqual(Base._view_class_decorator_chain.decorators, (decorator_0,))
+
+    def test_records_are_grouped_by_http_method_when_the_chain_is_created(self):
+        decorator_0, decorator_1, decorator_2 = decorator(0), decorator(1), decorator(2)
+
+        @view_class_decorator(decorator_0, DecoratorWithAttributes(decorator_1, dict(decorator_methods='post')),
+                              DecoratorWithAttributes(decorator_2, dict(decorator_methods=('get',))))
+        class ViewClass(View):
+            def get(self, request):
+                pass
+
+        chain = ViewClass._view_class_decorator_chain
+        records = dict(zip(chain.decorators, chain.records))
+        self.assertEqual(chain.default_records, (records[decorator_0],))
+        self.assertDictEqual(chain.method_records, {
+            'GET': (records[decorator_2], records[decorator_0]),
+            'POST': (records[decorator_1], records[decorator_0]),
+        })
+        self.assertEqual(chain.head_records, (records[decorator_2], records[decorator_0]))
+
+        # as_view() doesn't walk the accumulated decorators
+        with mock.patch.object(AccumulatedViewClassDecorators, '__reversed__') as mock_reversed, \
+                mock.patch.object(AccumulatedViewClassDecorators, '__iter__') as mock_iter:
+            view = ViewClass.as_view()
+        self.assertFalse(mock_reversed.called or mock_iter.called)
+        self.assertEqual(sorted(view.method_chains), ['GET', 'HEAD', 'POST'])
+
+    def test_chain_is_immutable(self):
+        @view_class_decorator(decorator(0))
+        class ViewClass(View):
+            pass
+
+        chain = ViewClass._view_class_decorator_chain
+        with self.assertRaises(AttributeError):
+            chain.decorators = ()
+        with self.assertRaises(AttributeError):
+            del chain.view_classes
+        with self.assertRaises(AttributeError):
+            chain.new_attribute = None
+
+
+class TestAccumulatedViewClassDecorators(TestCase):
+    def setUp(self):
+        self.records = [AccumulatedViewClassDecorator(decorator(i), View) for i in range(5)]
+        self.base = AccumulatedViewClassDecorators().prepend(self.records[3:])
+        self.derived = self.base.prepend(self.records[1:3]).prepend(self.records[:1])
+
+    def test_sequence(self):
+        self.assertEqual(len(self.derived), 5)
+        self.assertListEqual(list(self.derived), self.records)
+        self.assertListEqual(list(reversed(self.derived)), self.records[::-1])
+        self.assertListEqual([self.derived[i] for i in range(-5, 5)], self.records * 2)
+        self.assertEqual(self.derived[1:3], tuple(self.records[1:3]))
+        with self.assertRaises(IndexError):
+            self.derived[5]
+
+    def test_prepend_shares_the_records_of_the_tail(self):
+        self.assertIs(self.derived.tail.tail, self.base)
+        self.assertEqual(self.base.records, tuple(self.records[3:]))
+        self.assertIs(self.base.prepend([]), self.base)
+        self.assertIsNone(AccumulatedViewClassDecorators().prepend(self.records).tail)
+
+    def test_duplicate_index_is_shared_if_the_prepended_records_have_no_duplicate_id(self):
+        self.assertIs(self.derived.duplicate_index, self.base.duplicate_index)
+        record = AccumulatedViewClassDecorator(mock.Mock(decorator_duplicate_id='id'), View)
+        accumulated = self.derived.prepend([record])
+        self.assertDictEqual(accumulated.duplicate_index, {'id': ((6, record),)})
+        self.assertDictEqual(self.derived.duplicate_index, {})
+
+    def test_immutability(self):
+        with self.assertRaises(AttributeError):
+            self.derived.records = ()
+        with self.assertRaises(AttributeError):
+            self.records[0].decorator = None
+        with self.assertRaises(AttributeError):
+            del self.records[0].view_class
+
+    def test_records_can_be_accessed_like_dicts(self):
+        record = self.records[0]
+        self.assertIs(record['decorator'], record.decorator)
+        self.assertIs(record['view_class'], View)
+        self.assertDictEqual(dict(record), dict(decorator=record.decorator, view_class=View))
+        with self.assertRaises(KeyError):
+            record['records']
+        self.assertEqual(record, AccumulatedViewClassDecorator(record.decorator, View))
+        self.assertNotEqual(record, self.records[1])
+
+
+@override_settings(UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=True)
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestLazyDecoration(TestCase):
+    def test_decoration_is_resolved_on_the_first_as_view_access(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class Base(View):
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch')
+                return 'response'
+
+        @view_class_decorator(decorator(1))
+        @view_class_decorator(decorator(2))
+        class Derived(Base):
+            pass
+
+        self.assertEqual(len(Derived.__dict__['_pending_view_class_decorators']), 2)
+        self.assertNotIn('_view_class_decorator_chain', Base.__dict__)
+        self.assertNotIn('_view_class_decorator_chain', Derived.__dict__)
+
+        self.assertEqual(Derived.as_view()('request'), 'response')
+        self.assertNotIn('_pending_view_class_decorators', Base.__dict__)
+        self.assertNotIn('_pending_view_class_decorators', Derived.__dict__)
+        self.assertEqual(len(Base._view_class_decorator_chain), 1)
+        self.assertEqual(len(Derived._view_class_decorator_chain), 3)
+
+        self.assertEqual(Base.as_view()('request'), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 1),
+            mock.call('decorator', 2),
+            mock.call('decorator', 0),
+            mock.call('dispatch'),
+            mock.call('decorator', 0),
+            mock.call('dispatch'),
+        ])
+
+    def test_undecorated_subclass_of_lazily_decorated_view_class(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class Base(View):
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        class Derived(Base):
+            pass
+
+        self.assertEqual(Derived.as_view()('request'), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 0)])
+
+    def test_as_view_method_is_hooked_only_on_the_first_decorated_ancestor_view_class(self, mock_test_log):
+        with mock.patch.object(ViewClassDecorator, '_ViewClassDecorator__decorate_the_as_view_method',
+                               wraps=getattr(ViewClassDecorator, '_ViewClassDecorator__decorate_the_as_view_method')) \
+                               as mock_decorate_the_as_view_method:
+            @view_class_decorator(decorator(0))
+            class Base(View):
+                pass
+
+            @view_class_decorator(decorator(1))
+            class Derived(Base):
+                pass
+
+            mock_decorate_the_as_view_method.assert_not_called()
+            Derived.as_view()
+            mock_decorate_the_as_view_method.assert_called_once_with(Base)
+        self.assertNotIn('as_view', Derived.__dict__)
+
+    def test_as_view_defined_by_the_lazily_decorated_view_class_is_hooked(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class ViewClass(View):
+            @classmethod
+            def as_view(cls, **initkwargs):
+                test_log('as_view')
+                return super(ViewClass, cls).as_view(**initkwargs)
+
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        self.assertEqual(ViewClass.as_view()('request'), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('as_view'),
+            mock.call('decorator', 0),
+        ])
+
+    def test_eager_decoration_of_a_subclass_resolves_the_lazily_decorated_base(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class Base(View):
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        with override_settings(UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=False):
+            @view_class_decorator(decorator(1))
+            class Derived(Base):
+                pass
+
+        self.assertNotIn('_pending_view_class_decorators', Base.__dict__)
+        self.assertEqual(Derived.as_view()('request'), 'response')
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 1),
+            mock.call('decorator', 0),
+        ])
+
+    def test_resolve_all_pending_decorations(self, mock_test_log):
+        resolve_pending_view_class_decorations()
+
+        @view_class_decorator(decorator(0))
+        class Base(View):
+            pass
+
+        @view_class_decorator(decorator(1))
+        class Derived(Base):
+            pass
+
+        self.assertEqual(resolve_pending_view_class_decorations(), 2)
+        self.assertEqual(resolve_pending_view_class_decorations(), 0)
+        self.assertEqual(len(Derived._view_class_decorator_chain), 2)
+
+    def test_errors_are_raised_on_resolution(self, mock_test_log):
+        class NonViewClass(object):
+            pass
+
+        view_class_decorator(decorator(0))(NonViewClass)
+        self.assertRaisesMessage(
+            TypeError,
+            "The decorated view class ({}) doesn't have an as_view() method.".format(NonViewClass),
+            getattr, NonViewClass, 'as_view'
+        )
+
+    def test_concurrent_first_as_view_calls_resolve_the_decoration_once(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        class ViewClass(View):
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        num_threads = 8
+        start = threading.Event()
+        responses = []
+
+        def call_view():
+            start.wait(5)
+            responses.append(ViewClass.as_view()('request'))
+
+        with mock.patch.object(ViewClassDecorator, '_decorate', autospec=True,
+                               side_effect=ViewClassDecorator._decorate) as mock_decorate:
+            threads = [threading.Thread(target=call_view) for _ in range(num_threads)]
+            for thread in threads:
+                thread.start()
+            start.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(responses, ['response'] * num_threads)
+        self.assertEqual(mock_decorate.call_count, 1)
+        self.assertEqual(mock_test_log.mock_calls, [mock.call('decorator', 0)] * num_threads)
+
+    def test_as_view_access_waits_for_the_resolution_in_progress_in_another_thread(self, mock_test_log):
+        @view_class_decorator(decorator(0))
+        @view_class_decorator(decorator(1))
+        class ViewClass(View):
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        decorating = threading.Event()
+        proceed = threading.Event()
+        responses = {}
+        original_decorate = ViewClassDecorator._decorate
+
+        def slow_decorate(view_class_decorator, view_class):
+            decorating.set()
+            proceed.wait(5)
+            return original_decorate(view_class_decorator, view_class)
+
+        def call_view(thread_name):
+            responses[thread_name] = ViewClass.as_view()('request')
+
+        with mock.patch.object(ViewClassDecorator, '_decorate', autospec=True, side_effect=slow_decorate):
+            resolving_thread = threading.Thread(target=call_view, args=('resolving',))
+            resolving_thread.start()
+            decorating.wait(5)
+            waiting_thread = threading.Thread(target=call_view, args=('waiting',))
+            waiting_thread.start()
+            # the second thread can't get the as_view() of the view class until the resolution is complete
+            waiting_thread.join(0.1)
+            self.assertNotIn('waiting', responses)
+            proceed.set()
+            resolving_thread.join()
+            waiting_thread.join()
+
+        self.assertDictEqual(responses, {'resolving': 'response', 'waiting': 'response'})
+        self.assertEqual(mock_test_log.mock_calls, [mock.call('decorator', 0), mock.call('decorator', 1)] * 2)
@@ -3,6 +3,7 @@ import mock
 from django.test import TestCase
 from django.views.generic import View
 
+from django_universal_view_decorator import universal_view_decorator
 from django_universal_view_decorator.decorators.view_class_decorator import view_class_decorator
 
 
@@ -37,8 +38,8 @@ class Decorator(object):
 decorator = Decorator
 
 
-def _my_handle_duplicate_id(duplicate_id, duplicates, decorators):
-    return [item.copy() for item in decorators]
+def _my_handle_duplicate_id(duplicate_id, duplicates):
+    return [item['decorator'] for item in duplicates]
 
 
 @mock.patch.object(view_class_decorator, '_handle_duplicate_id', wraps=_my_handle_duplicate_id)
@@ -66,11 +67,6 @@ class TestHandleDuplicateIdCallsMadeAsExpected(TestCase):
         mock_handle_duplicate_id.assert_called_once_with(1, [
             dict(decorator=self.decorator_1, group='new', view_class=C1, index=0),
             dict(decorator=self.decorator_1, group='new', view_class=C1, index=2),
-        ], [
-            dict(decorator=self.decorator_1, group='new', view_class=C1),
-            dict(decorator=self.decorator_2, group='new', view_class=C1),
-            dict(decorator=self.decorator_1, group='new', view_class=C1),
-            dict(decorator=self.decorator_0, group='old', view_class=C0),
         ])
 
         mock_handle_duplicate_id.reset_mock()
@@ -91,13 +87,6 @@ class TestHandleDuplicateIdCallsMadeAsExpected(TestCase):
         mock_handle_duplicate_id.assert_called_once_with(0, [
             dict(decorator=self.decorator_0, group='new', view_class=C3, index=0),
             dict(decorator=self.decorator_0, group='old', view_class=C0, index=5),
-        ], [
-            dict(decorator=self.decorator_0, group='new', view_class=C3),
-            dict(decorator=self.decorator_3, group='old', view_class=C2),
-            dict(decorator=self.decorator_1, group='old', view_class=C1),
-            dict(decorator=self.decorator_2, group='old', view_class=C1),
-            dict(decorator=self.decorator_1, group='old', view_class=C1),
-            dict(decorator=self.decorator_0, group='old', view_class=C0),
         ])
 
     def test_only_new_duplicates(self, mock_handle_duplicate_id):
@@ -108,10 +97,6 @@ class TestHandleDuplicateIdCallsMadeAsExpected(TestCase):
         mock_handle_duplicate_id.assert_called_once_with(0, [
             dict(decorator=self.decorator_0, group='new', view_class=C0, index=0),
             dict(decorator=self.decorator_0, group='new', view_class=C0, index=2),
-        ], [
-            dict(decorator=self.decorator_0, group='new', view_class=C0),
-            dict(decorator=self.decorator_1, group='new', view_class=C0),
-            dict(decorator=self.decorator_0, group='new', view_class=C0),
         ])
 
     def test_new_and_old_duplicate(self, mock_handle_duplicate_id):
@@ -135,10 +120,6 @@ class TestHandleDuplicateIdCallsMadeAsExpected(TestCase):
         mock_handle_duplicate_id.assert_called_once_with(0, [
             dict(decorator=self.decorator_0, group='new', view_class=C2, index=0),
             dict(decorator=self.decorator_0, group='old', view_class=C0, index=2),
-        ], [
-            dict(decorator=self.decorator_0, group='new', view_class=C2),
-            dict(decorator=self.decorator_1, group='old', view_class=C1),
-            dict(decorator=self.decorator_0, group='old', view_class=C0),
         ])
 
     def test_duplicate_between_two_view_class_decorators_applied_to_the_same_class(self, mock_handle_duplicate_id):
@@ -153,11 +134,6 @@ class TestHandleDuplicateIdCallsMadeAsExpected(TestCase):
         mock_handle_duplicate_id.assert_called_once_with(0, [
             dict(decorator=self.decorator_0, group='new', view_class=C0, index=0),
             dict(decorator=self.decorator_0, group='old', view_class=C0, index=2),
-        ], [
-            dict(decorator=self.decorator_0, group='new', view_class=C0),
-            dict(decorator=self.decorator_1, group='old', view_class=C0),
-            dict(decorator=self.decorator_0, group='old', view_class=C0),
-            dict(decorator=self.decorator_2, group='old', view_class=C0),
         ])
 
     def test_duplicate_between_both_new_new_and_old_decorators_at_the_same_time(self, mock_handle_duplicate_id):
@@ -178,20 +154,10 @@ class TestHandleDuplicateIdCallsMadeAsExpected(TestCase):
             mock.call(0, [
                 dict(decorator=self.decorator_0, group='new', view_class=C1, index=1),
                 dict(decorator=self.decorator_0, group='old', view_class=C0, index=3),
-            ], [
-                dict(decorator=self.decorator_1, group='new', view_class=C1),
-                dict(decorator=self.decorator_0, group='new', view_class=C1),
-                dict(decorator=self.decorator_1, group='new', view_class=C1),
-                dict(decorator=self.decorator_0, group='old', view_class=C0),
             ]),
             mock.call(1, [
                 dict(decorator=self.decorator_1, group='new', view_class=C1, index=0),
                 dict(decorator=self.decorator_1, group='new', view_class=C1, index=2),
-            ], [
-                dict(decorator=self.decorator_1, group='new', view_class=C1),
-                dict(decorator=self.decorator_0, group='new', view_class=C1),
-                dict(decorator=self.decorator_1, group='new', view_class=C1),
-                dict(decorator=self.decorator_0, group='old', view_class=C0),
             ]),
         ], any_order=True)
 
@@ -247,7 +213,7 @@ class TestDuplicateHandlerFuncCalledAsExpected(TestCase):
             pass
 
         mock_test_log.assert_called_once_with(self.decorator0_dup_id0, 0, mock.ANY)
-        mock_handle_duplicate_id.assert_called_once_with(class_decorator, 0, mock.ANY, mock.ANY)
+        mock_handle_duplicate_id.assert_called_once_with(class_decorator, 0, mock.ANY)
         self.assertFalse(mock_default_duplicate_handler_func.called)
 
     def test_second_duplicate_handler_called_if_first_decorator_doesnt_have_a_duplicate_handler(
@@ -267,7 +233,7 @@ class TestDuplicateHandlerFuncCalledAsExpected(TestCase):
             pass
 
         mock_test_log.assert_called_once_with(self.decorator1_dup_id0, 0, mock.ANY)
-        mock_handle_duplicate_id.assert_called_once_with(class_decorator, 0, mock.ANY, mock.ANY)
+        mock_handle_duplicate_id.assert_called_once_with(class_decorator, 0, mock.ANY)
         self.assertFalse(mock_default_duplicate_handler_func.called)
 
     def test_default_duplicate_handler_called_if_duplicate_decorators_have_no_handler(
@@ -288,7 +254,7 @@ class TestDuplicateHandlerFuncCalledAsExpected(TestCase):
             pass
 
         self.assertFalse(mock_test_log.called)
-        mock_handle_duplicate_id.assert_called_once_with(class_decorator, 0, mock.ANY, mock.ANY)
+        mock_handle_duplicate_id.assert_called_once_with(class_decorator, 0, mock.ANY)
         mock_default_duplicate_handler_func.assert_called_once_with(class_decorator, 0, mock.ANY)
 
 
@@ -643,3 +609,209 @@ class TestDefaultDuplicateHandlerFuncLogic(TestCase):
             mock.call('decorator', 1),
             mock.call('dispatch'),
         ])
+
+
+class TestDuplicateIndex(TestCase):
+    def _get_decorators(self, view_class):
+        return [item['decorator'] for item in view_class._accumulated_view_class_decorators]
+
+    def _get_duplicate_positions(self, view_class):
+        duplicate_index = view_class._accumulated_view_class_decorators.duplicate_index
+        return dict((duplicate_id, tuple(position for position, record in items))
+                    for duplicate_id, items in duplicate_index.items())
+
+    def test_accumulated_decorator_records_are_shared_with_the_base_class(self):
+        @view_class_decorator(decorator(0), decorator(1))
+        class C0(View):
+            pass
+
+        @view_class_decorator(decorator(2))
+        class C1(C0):
+            pass
+
+        self.assertIs(C1._accumulated_view_class_decorators[1], C0._accumulated_view_class_decorators[0])
+        self.assertIs(C1._accumulated_view_class_decorators[2], C0._accumulated_view_class_decorators[1])
+        self.assertIs(C1._accumulated_view_class_decorators.tail, C0._accumulated_view_class_decorators)
+
+    def test_duplicates_are_found_in_a_deep_hierarchy(self):
+        shared_decorators = [decorator('shared', level=level) for level in range(30)]
+        view_class = View
+        for level in range(30):
+            view_class = view_class_decorator(decorator(level), shared_decorators[level])(
+                type('C{}'.format(level), (view_class,), {}))
+
+        # the default duplicate handler keeps the oldest 'shared' duplicate
+        duplicate_ids = [item.duplicate_id for item in self._get_decorators(view_class)]
+        self.assertListEqual(duplicate_ids, list(range(29, 0, -1)) + [0, 'shared'])
+        self.assertIs(self._get_decorators(view_class)[-1], shared_decorators[0])
+        self.assertDictEqual(self._get_duplicate_positions(view_class),
+                             dict([(level, (level + 2,)) for level in range(30)] + [('shared', (1,))]))
+
+    def test_index_is_rebuilt_after_deleting_accumulated_decorators(self):
+        @view_class_decorator(decorator(0), decorator(1), decorator(2))
+        class C0(View):
+            pass
+
+        # the new decorator(1) replaces the old one
+        new_decorator_1 = decorator(1, decorator_duplicate_keep_newest=True)
+
+        @view_class_decorator(new_decorator_1)
+        class C1(C0):
+            pass
+
+        self.assertListEqual([item.duplicate_id for item in self._get_decorators(C1)], [1, 0, 2])
+        self.assertDictEqual(self._get_duplicate_positions(C1), {0: (2,), 1: (3,), 2: (1,)})
+        # the accumulated decorators of the base class have been modified so they can't be shared
+        self.assertIsNone(C1._accumulated_view_class_decorators.tail)
+
+        newest_decorator_2 = decorator(2, decorator_duplicate_keep_newest=True)
+
+        @view_class_decorator(newest_decorator_2)
+        class C2(C1):
+            pass
+
+        self.assertListEqual(self._get_decorators(C2), [newest_decorator_2, new_decorator_1,
+                                                        self._get_decorators(C0)[0]])
+        # the index of the base class hasn't been modified
+        self.assertDictEqual(self._get_duplicate_positions(C1), {0: (2,), 1: (3,), 2: (1,)})
+
+
+def requires(*tags):
+    def decorator(wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            test_log('requires', sorted(tags))
+            return wrapped(*args, **kwargs)
+        return wrapper
+    decorator.tags = tags
+    decorator.decorator_duplicate_id = 'requires'
+    decorator.decorator_duplicate_merge_func = _merge_requires
+    return decorator
+
+
+def _merge_requires(duplicate_id, decorators):
+    return requires(*set(tag for decorator in decorators for tag in decorator.tags))
+
+
+class TestMergeDuplicates(TestCase):
+    def _get_decorators(self, view_class):
+        return [item['decorator'] for item in view_class._accumulated_view_class_decorators]
+
+    @mock.patch(__name__ + '.test_log')
+    def test_duplicates_are_merged_into_one_decorator(self, mock_test_log):
+        @view_class_decorator(requires('a'))
+        class C0(View):
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch')
+                return 'response'
+
+        @view_class_decorator(requires('b'), decorator(0))
+        class C1(C0):
+            pass
+
+        @view_class_decorator(requires('c'))
+        class C2(C1):
+            pass
+
+        self.assertEqual(C1.as_view()('request'), 'response')
+        self.assertEqual(C2.as_view()('request'), 'response')
+        self.assertEqual(C0.as_view()('request'), 'response')
+        # the merged decorator takes the position of the oldest duplicate
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('requires', ['a', 'b']),
+            mock.call('dispatch'),
+            mock.call('decorator', 0),
+            mock.call('requires', ['a', 'b', 'c']),
+            mock.call('dispatch'),
+            mock.call('requires', ['a']),
+            mock.call('dispatch'),
+        ])
+        self.assertEqual(len(C2._view_class_decorator_chain), 2)
+
+    def test_merged_decorator_takes_the_position_of_the_oldest_duplicate(self):
+        @view_class_decorator(decorator(0), requires('a'))
+        class C0(View):
+            pass
+
+        @view_class_decorator(requires('b'))
+        class C1(C0):
+            pass
+
+        decorators = self._get_decorators(C1)
+        self.assertEqual(len(decorators), 2)
+        self.assertIs(decorators[0], C0._accumulated_view_class_decorators[0]['decorator'])
+        self.assertEqual(sorted(decorators[1].tags), ['a', 'b'])
+        self.assertIs(C1._accumulated_view_class_decorators[1].view_class, C0)
+
+    def test_merged_decorator_takes_the_position_of_the_newest_duplicate_with_keep_newest(self):
+        @view_class_decorator(decorator(0), requires('a'))
+        class C0(View):
+            pass
+
+        newest = requires('b')
+        newest.decorator_duplicate_keep_newest = True
+
+        @view_class_decorator(newest)
+        class C1(C0):
+            pass
+
+        decorators = self._get_decorators(C1)
+        self.assertEqual(sorted(decorators[0].tags), ['a', 'b'])
+        self.assertEqual(decorators[1].duplicate_id, 0)
+        self.assertIs(C1._accumulated_view_class_decorators[0].view_class, C1)
+
+    def test_merge_func_receives_the_unwrapped_decorators_from_the_oldest_to_the_newest(self):
+        received = []
+
+        def merge_func(duplicate_id, decorators):
+            received.append((duplicate_id, decorators))
+            return decorators[-1]
+
+        decorator_0, decorator_1 = decorator('x', data=0), decorator('x', data=1)
+
+        @universal_view_decorator(decorator_0, duplicate_id='x', duplicate_merge_func=merge_func)
+        class C0(View):
+            pass
+
+        @view_class_decorator(decorator_1)
+        class C1(C0):
+            pass
+
+        self.assertListEqual(received, [('x', [decorator_0, decorator_1])])
+
+    def test_merged_decorator_inherits_the_duplicate_attributes(self):
+        def merge_func(duplicate_id, decorators):
+            return decorator(None, data=[item.data for item in decorators])
+
+        @universal_view_decorator(decorator('x', data=0), duplicate_id='x', duplicate_merge_func=merge_func)
+        class C0(View):
+            pass
+
+        @view_class_decorator(decorator('x', data=1))
+        class C1(C0):
+            pass
+
+        @view_class_decorator(decorator('x', data=2))
+        class C2(C1):
+            pass
+
+        merged_decorator, = self._get_decorators(C2)
+        self.assertEqual(merged_decorator.decorator_duplicate_id, 'x')
+        self.assertEqual(merged_decorator.data, [[0, 1], 2])
+
+    def test_duplicate_handler_func_takes_precedence(self):
+        handler_func = mock.Mock(side_effect=_my_handle_duplicate_id)
+        merge_func = mock.Mock()
+
+        @view_class_decorator(decorator('x', decorator_duplicate_handler_func=handler_func,
+                                        decorator_duplicate_merge_func=merge_func))
+        class C0(View):
+            pass
+
+        @view_class_decorator(decorator('x'))
+        class C1(C0):
+            pass
+
+        self.assertTrue(handler_func.called)
+        self.assertFalse(merge_func.called)
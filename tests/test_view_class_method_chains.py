@@ -0,0 +1,160 @@
+import functools
+import sys
+
+import mock
+from django.http import HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import RequestFactory, TestCase
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator, universal_view_decorator_with_args
+
+
+def test_log(*args, **kwargs):
+    pass
+
+
+# Test decorators
+
+
+def decorator(decorator_id):
+    def decorate(wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            test_log('decorator', decorator_id)
+            return wrapped(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class ViewClass(View):
+    def get(self, request):
+        test_log('get')
+        return HttpResponse()
+
+    def post(self, request):
+        test_log('post')
+        return HttpResponse()
+
+    def put(self, request):
+        test_log('put')
+        return HttpResponse()
+
+
+def call_view(view, method):
+    return view(getattr(RequestFactory(), method)('/'))
+
+
+# Tests
+
+
+@mock.patch(__name__ + '.test_log')
+class TestMethodChains(TestCase):
+    def test_decorators_are_applied_only_to_the_specified_methods(self, mock_test_log):
+        @universal_view_decorator(decorator(0))
+        @universal_view_decorator(decorator(1), decorator(2), methods=('post', 'put'))
+        @universal_view_decorator(decorator(3))
+        class C0(ViewClass):
+            pass
+
+        view = C0.as_view()
+        for method in ('get', 'post', 'put'):
+            call_view(view, method)
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0), mock.call('decorator', 3), mock.call('get'),
+            mock.call('decorator', 0), mock.call('decorator', 1), mock.call('decorator', 2), mock.call('decorator', 3),
+            mock.call('post'),
+            mock.call('decorator', 0), mock.call('decorator', 1), mock.call('decorator', 2), mock.call('decorator', 3),
+            mock.call('put'),
+        ])
+        self.assertEqual(sorted(view.method_chains), ['POST', 'PUT'])
+        self.assertIs(view.view_class, C0)
+
+    def test_inherited_method_restricted_decorators(self, mock_test_log):
+        @universal_view_decorator(decorator(0), methods='POST')
+        class C0(ViewClass):
+            pass
+
+        put_decorator = universal_view_decorator_with_args(decorator, methods=['put'])
+
+        @put_decorator(1)
+        class C1(C0):
+            pass
+
+        view = C1.as_view()
+        for method in ('get', 'post', 'put'):
+            call_view(view, method)
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('get'),
+            mock.call('decorator', 0), mock.call('post'),
+            mock.call('decorator', 1), mock.call('put'),
+        ])
+        self.assertEqual(sorted(view.method_chains), ['POST', 'PUT'])
+
+    def test_head_requests_pass_the_get_decorators_if_the_view_class_has_no_head_handler(self, mock_test_log):
+        @universal_view_decorator(decorator(0), methods=('get',))
+        @universal_view_decorator(decorator(1), methods=('head',))
+        class C0(ViewClass):
+            pass
+
+        view = C0.as_view()
+        for method in ('get', 'head'):
+            call_view(view, method)
+        # django calls the get() handler for HEAD requests
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0), mock.call('get'),
+            mock.call('decorator', 0), mock.call('decorator', 1), mock.call('get'),
+        ])
+        self.assertEqual(sorted(view.method_chains), ['GET', 'HEAD'])
+
+    def test_head_requests_skip_the_get_decorators_if_the_view_class_has_a_head_handler(self, mock_test_log):
+        @universal_view_decorator(decorator(0), methods=('get',))
+        class C0(ViewClass):
+            def head(self, request):
+                test_log('head')
+                return HttpResponse()
+
+        view = C0.as_view()
+        for method in ('get', 'head'):
+            call_view(view, method)
+        self.assertListEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0), mock.call('get'),
+            mock.call('head'),
+        ])
+
+    def test_chains_without_method_restrictions_arent_wrapped(self, mock_test_log):
+        @universal_view_decorator(decorator(0))
+        class C0(ViewClass):
+            pass
+
+        self.assertFalse(hasattr(C0.as_view(), 'method_chains'))
+
+    def test_attributes_of_the_method_chains_are_visible_to_the_middlewares(self, mock_test_log):
+        @universal_view_decorator(csrf_exempt, methods=('post',))
+        class C0(ViewClass):
+            pass
+
+        view = C0.as_view()
+        self.assertTrue(view.csrf_exempt)
+        # the middleware skips the CSRF check of the view function
+        request = RequestFactory().post('/')
+        self.assertIsNone(CsrfViewMiddleware(lambda request: None).process_view(request, view, (), {}))
+        self.assertEqual(view(request).status_code, 200)
+        # the chains that aren't exempt still check CSRF
+        with mock.patch('django.middleware.csrf.logger'):
+            self.assertEqual(call_view(view, 'put').status_code, 403)
+        self.assertEqual(call_view(view, 'get').status_code, 200)
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('post'), mock.call('get')])
+
+    def test_methods_param_with_view_function_fails(self, mock_test_log):
+        def view_function(request):
+            pass
+
+        self.assertRaisesRegexp(TypeError, "The 'methods' parameter can be used only with view classes",
+                                universal_view_decorator(decorator(0), methods=('post',)), view_function)
+
+
+# The async tests are in a separate module because they use syntax that isn't available before python 3.5.
+if sys.version_info >= (3, 5):
+    from .view_class_method_chains_py35 import *  # noqa: F401,F403
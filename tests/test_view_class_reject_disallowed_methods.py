@@ -0,0 +1,130 @@
+import functools
+import sys
+
+import mock
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator
+from django_universal_view_decorator.decorators.view_class_decorator import get_allowed_methods
+
+
+def test_log(*args, **kwargs):
+    pass
+
+
+# Test decorators
+
+
+def decorator(decorator_id):
+    def decorate(wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            test_log('decorator', decorator_id)
+            return wrapped(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@universal_view_decorator(decorator(0), reject_disallowed_methods=True)
+class GetOnlyView(View):
+    def get(self, request):
+        return HttpResponse()
+
+
+def call_view(view, method):
+    return view(getattr(RequestFactory(), method)('/path/'))
+
+
+# Tests
+
+
+@mock.patch('django_universal_view_decorator.decorators.view_class_decorator.django_request_logger')
+@mock.patch(__name__ + '.test_log')
+class TestRejectDisallowedMethods(TestCase):
+    def test_disallowed_method_is_rejected_before_the_decorator(self, mock_test_log, mock_logger):
+        view = GetOnlyView.as_view()
+        request = RequestFactory().post('/path/')
+        response = view(request)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET, HEAD, OPTIONS')
+        # the same log message as the one of django's `View.http_method_not_allowed()`
+        mock_logger.warning.assert_called_once_with('Method Not Allowed (%s): %s', 'POST', '/path/',
+                                                    extra={'status_code': 405, 'request': request})
+        self.assertListEqual(mock_test_log.mock_calls, [])
+
+    def test_allowed_methods_run_the_decorators(self, mock_test_log, mock_logger):
+        view = GetOnlyView.as_view()
+        for method in ('get', 'head', 'options'):
+            self.assertEqual(call_view(view, method).status_code, 200)
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 0)] * 3)
+        self.assertIs(view.view_class, GetOnlyView)
+
+    def test_disallowed_methods_are_rejected_before_all_decorators_of_the_chain(self, mock_test_log, mock_logger):
+        @universal_view_decorator(decorator(2))
+        @universal_view_decorator(decorator(1), methods=('post',))
+        class ViewClass(GetOnlyView):
+            pass
+
+        view = ViewClass.as_view()
+        self.assertEqual(call_view(view, 'post').status_code, 405)
+        self.assertListEqual(mock_test_log.mock_calls, [])
+        self.assertEqual(call_view(view, 'get').status_code, 200)
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 2), mock.call('decorator', 0)])
+
+    def test_http_method_names(self, mock_test_log, mock_logger):
+        @universal_view_decorator(decorator(0), reject_disallowed_methods=True)
+        class ViewClass(View):
+            http_method_names = ['get', 'post']
+
+            def get(self, request):
+                return HttpResponse()
+
+            def put(self, request):
+                return HttpResponse()
+
+        self.assertListEqual(get_allowed_methods(ViewClass), ['GET'])
+        self.assertEqual(call_view(ViewClass.as_view(), 'put').status_code, 405)
+        self.assertListEqual(mock_test_log.mock_calls, [])
+
+    def test_http_method_names_of_the_initkwargs(self, mock_test_log, mock_logger):
+        self.assertListEqual(get_allowed_methods(GetOnlyView, dict(http_method_names=['get'])), ['GET'])
+        view = GetOnlyView.as_view(http_method_names=['get'])
+        self.assertEqual(call_view(view, 'options').status_code, 405)
+        self.assertListEqual(mock_test_log.mock_calls, [])
+        self.assertEqual(call_view(view, 'get').status_code, 200)
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 0)])
+
+    def test_custom_http_method_not_allowed_is_respected(self, mock_test_log, mock_logger):
+        @universal_view_decorator(decorator(1))
+        class ViewClass(GetOnlyView):
+            def http_method_not_allowed(self, request, *args, **kwargs):
+                return HttpResponse('custom')
+
+        self.assertIsNone(get_allowed_methods(ViewClass))
+        self.assertEqual(call_view(ViewClass.as_view(), 'post').content, b'custom')
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 1), mock.call('decorator', 0)])
+
+    def test_decorators_run_for_disallowed_methods_without_the_parameter(self, mock_test_log, mock_logger):
+        @universal_view_decorator(decorator(0))
+        class ViewClass(View):
+            def get(self, request):
+                return HttpResponse()
+
+        self.assertEqual(call_view(ViewClass.as_view(), 'post').status_code, 405)
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 0)])
+        self.assertListEqual(mock_logger.mock_calls, [])
+
+    def test_parameter_with_view_function_fails(self, mock_test_log, mock_logger):
+        def view_function(request):
+            pass
+
+        decorate = universal_view_decorator(decorator(0), reject_disallowed_methods=True)
+        self.assertRaisesRegexp(TypeError, "The 'reject_disallowed_methods' parameter can be used only with view "
+                                           "classes", decorate, view_function)
+
+
+# The async tests are in a separate module because they use syntax that isn't available before python 3.5.
+if sys.version_info >= (3, 5):
+    from .view_class_reject_disallowed_methods_py35 import *  # noqa: F401,F403
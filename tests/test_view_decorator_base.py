@@ -1,3 +1,5 @@
+import inspect
+
 import mock
 from django.test import TestCase
 from django.views.generic import View
@@ -317,3 +319,82 @@ class TestInternals(TestCase):
             mock.call('decorator', 'testing_default_call_view_function_implementation'),
             mock.call('view_function', 'request'),
         ])
+
+    def test_view_method_lookup_binds_a_prebuilt_wrapper_to_the_view_class_instance(self):
+        class ViewClass(View):
+            @MyViewDecorator.universal_decorator
+            def get(self, request, *args, **kwargs):
+                """ get docstring """
+                return 'response'
+
+        view_class_instance = ViewClass()
+        bound_0 = view_class_instance.get
+        bound_1 = ViewClass().get
+        self.assertIs(bound_0.__self__, view_class_instance)
+        self.assertIs(bound_0.__func__, bound_1.__func__)
+        self.assertEqual(bound_0.__name__, 'get')
+        self.assertEqual(bound_0.__doc__, ' get docstring ')
+        self.assertEqual(bound_0('request'), 'response')
+
+    def test_stacked_decorations_are_fused(self):
+        def view_function(request):
+            return 'response'
+
+        inner = MyViewDecorator()(view_function)
+        outer = MyViewDecoratorWithArg(42)(inner)
+        self.assertIs(outer.wrapped, inner)
+        self.assertIs(outer.view_function, view_function)
+        self.assertEqual(outer.stages, (
+            (outer, outer.call_view_function),
+            (inner, inner.call_view_function),
+        ))
+
+    def test_stacked_decorations_add_only_the_call_frame_of_their_call_view_function(self):
+        class FrameCounter(ViewDecoratorBase):
+            def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+                return view_function(*args, **kwargs)
+
+        def view_function(request):
+            return len(inspect.stack(0))
+
+        class ViewClass(View):
+            def get(self, request):
+                return len(inspect.stack(0))
+
+        def stack_depth_increase(num_decorators, view, *args):
+            decorated = view
+            for _ in range(num_decorators):
+                decorated = FrameCounter()(decorated)
+            return decorated(*args) - view(*args)
+
+        # The first decoration adds its __call__ (or view method wrapper) frame, the
+        # further stacked ones add only the frame of their _call_view_function.
+        self.assertEqual(stack_depth_increase(4, view_function, 'request') -
+                         stack_depth_increase(1, view_function, 'request'), 3)
+
+        class DecoratedViewClass(ViewClass):
+            get = FrameCounter()(FrameCounter()(FrameCounter()(FrameCounter()(ViewClass.get))))
+
+        class SinglyDecoratedViewClass(ViewClass):
+            get = FrameCounter()(ViewClass.get)
+
+        self.assertEqual(DecoratedViewClass().get('request') - SinglyDecoratedViewClass().get('request'), 3)
+
+    def test_view_function_passed_to_an_outer_stage_looks_like_the_decorated_view(self):
+        received_view_functions = []
+
+        class RecordingDecorator(ViewDecoratorBase):
+            def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+                received_view_functions.append(view_function)
+                return view_function(*args, **kwargs)
+
+        class ViewClass(View):
+            @RecordingDecorator()
+            @MyViewDecorator()
+            def get(self, request):
+                """ get docstring """
+                return 'response'
+
+        self.assertEqual(ViewClass().get('request'), 'response')
+        self.assertEqual(received_view_functions[0].__name__, 'get')
+        self.assertEqual(received_view_functions[0].__doc__, ' get docstring ')
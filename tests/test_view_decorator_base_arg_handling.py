@@ -4,6 +4,7 @@ import mock
 from django.test import TestCase
 
 from django_universal_view_decorator import ViewDecoratorBase
+from django_universal_view_decorator.five import getfullargspec
 
 
 def test_log(*args, **kwargs):
@@ -329,3 +330,56 @@ class TestAreDecoratorArgs(TestCase):
         result = ViewDecoratorBase._are_decorator_args((42,), {})
         self.assertTrue(result)
         self.assertFalse(mock_is_decorator_arg.called)
+
+
+class TestNumRequiredArgsAndUniversalDecoratorCaching(TestCase):
+    def test_values_are_calculated_only_once_per_class(self):
+        class MyDecorator(ViewDecoratorBase):
+            def __init__(self, arg=None):
+                super(MyDecorator, self).__init__()
+
+        with mock.patch(ViewDecoratorBase.__module__ + '.getfullargspec',
+                        side_effect=getfullargspec) as mock_getfullargspec:
+            self.assertEqual(MyDecorator.num_required_args, -1)
+            self.assertEqual(MyDecorator.num_required_args, -1)
+            self.assertIs(MyDecorator.universal_decorator, MyDecorator.universal_decorator)
+            self.assertEqual(mock_getfullargspec.call_count, 1)
+
+    def test_subclass_doesnt_use_the_cached_values_of_its_base_class(self):
+        class MyDecorator(ViewDecoratorBase):
+            pass
+
+        self.assertIsNone(MyDecorator.num_required_args)
+        base_universal_decorator = MyDecorator.universal_decorator
+
+        class MySubDecorator(MyDecorator):
+            def __init__(self, arg):
+                super(MySubDecorator, self).__init__()
+
+        self.assertEqual(MySubDecorator.num_required_args, 1)
+        self.assertIsNot(MySubDecorator.universal_decorator, base_universal_decorator)
+        self.assertIsNone(MyDecorator.num_required_args)
+        self.assertIs(MyDecorator.universal_decorator, base_universal_decorator)
+
+    def test_cache_is_invalidated_when_init_is_replaced(self):
+        class MyDecorator(ViewDecoratorBase):
+            pass
+
+        self.assertIsNone(MyDecorator.num_required_args)
+        universal_decorator = MyDecorator.universal_decorator
+
+        def __init__(self, arg, arg2=None):
+            super(MyDecorator, self).__init__()
+        MyDecorator.__init__ = __init__
+
+        self.assertEqual(MyDecorator.num_required_args, 1)
+        self.assertIsNot(MyDecorator.universal_decorator, universal_decorator)
+
+    def test_explicit_num_required_args_class_attribute_is_respected(self):
+        class MyDecorator(ViewDecoratorBase):
+            num_required_args = 0
+
+        universal_decorator = MyDecorator.universal_decorator
+        self.assertIs(MyDecorator.universal_decorator, universal_decorator)
+        MyDecorator.num_required_args = 1
+        self.assertIsNot(MyDecorator.universal_decorator, universal_decorator)
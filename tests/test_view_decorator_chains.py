@@ -0,0 +1,225 @@
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import functools
+
+import mock
+from django.conf.urls import include, url
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import ViewDecoratorBase, universal_view_decorator
+from django_universal_view_decorator.five import full_qualname
+from django_universal_view_decorator.introspection import Layer, benchmark_view, describe_view, \
+    get_stub_url_kwargs, iter_url_pattern_views
+
+from .test_app.decorators import increase_integer_view_arg
+
+
+def test_log(*args, **kwargs):
+    pass
+
+
+# Test decorators
+
+
+def legacy_decorator(wrapped):
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        test_log(legacy_decorator)
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+def legacy_decorator_2(wrapped):
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+def non_wrapping_decorator(wrapped):
+    def wrapper(*args, **kwargs):
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+class MyViewDecorator(ViewDecoratorBase):
+    pass
+
+
+class URLConf(object):
+    def __init__(self, *urlpatterns):
+        super(URLConf, self).__init__()
+        self.urlpatterns = list(urlpatterns)
+
+
+def layer_names(chain):
+    return [layer.name for layer in chain.layers]
+
+
+# Tests
+
+
+class TestIterURLPatternViews(TestCase):
+    def test_included_patterns(self):
+        def view_function(request):
+            pass
+
+        included = URLConf(url(r'^view/(?P<number>\d+)/$', view_function, name='view', kwargs=dict(extra=5)))
+        urlconf = URLConf(
+            url(r'^prefix/', include((included, 'app'), namespace='ns')),
+            url(r'^other/$', view_function),
+        )
+        url_pattern_views = list(iter_url_pattern_views(urlconf))
+        self.assertListEqual([(v.pattern, v.name, v.callback) for v in url_pattern_views], [
+            ('^prefix/^view/(?P<number>\\d+)/$', 'ns:view', view_function),
+            ('^other/$', None, view_function),
+        ])
+        self.assertDictEqual(get_stub_url_kwargs(url_pattern_views[0]), dict(number='1', extra=5))
+        self.assertDictEqual(get_stub_url_kwargs(url_pattern_views[1]), {})
+
+
+class TestDescribeView(TestCase):
+    def test_view_function(self):
+        @MyViewDecorator.universal_decorator
+        @universal_view_decorator(legacy_decorator, legacy_decorator_2)
+        def view_function(request):
+            pass
+
+        view_description = describe_view(view_function)
+        self.assertEqual(view_description.view_name, full_qualname(view_function.view_function))
+        self.assertIsNone(view_description.view_class)
+        self.assertEqual(len(view_description.chains), 1)
+        chain = view_description.chains[0]
+        self.assertEqual(chain.name, 'view function')
+        self.assertListEqual(chain.layers, [
+            Layer(full_qualname(MyViewDecorator), None),
+            Layer(full_qualname(legacy_decorator), None),
+            Layer(full_qualname(legacy_decorator_2), None),
+        ])
+        # __call__, 2 call_view_function and 2 legacy decorators
+        self.assertEqual(chain.num_frames, 5)
+
+    def test_undecorated_view_function(self):
+        def view_function(request):
+            pass
+
+        view_description = describe_view(view_function)
+        self.assertListEqual(view_description.chains, [])
+
+    def test_view_class(self):
+        @universal_view_decorator(legacy_decorator)
+        class Base(View):
+            @universal_view_decorator(legacy_decorator)
+            def get(self, request):
+                pass
+
+        @MyViewDecorator.universal_decorator
+        @universal_view_decorator(legacy_decorator_2)
+        class ViewClass(Base):
+            pass
+
+        view_description = describe_view(ViewClass.as_view())
+        self.assertIs(view_description.view_class, ViewClass)
+        self.assertListEqual([chain.name for chain in view_description.chains], ['class', 'get'])
+        class_chain, get_chain = view_description.chains
+        self.assertListEqual(class_chain.layers, [
+            Layer(full_qualname(MyViewDecorator), ViewClass),
+            Layer(full_qualname(legacy_decorator_2), ViewClass),
+            Layer(full_qualname(legacy_decorator), Base),
+        ])
+        # 2 legacy decorators, the __call__ and the call_view_function of MyViewDecorator
+        self.assertEqual(class_chain.num_frames, 4)
+        self.assertIsNone(class_chain.decoration)
+        self.assertListEqual(layer_names(get_chain), [full_qualname(legacy_decorator)])
+        # the method wrapper, call_view_function, the legacy decorator and the trampoline
+        self.assertEqual(get_chain.num_frames, 4)
+
+    def test_view_class_wrapped_in_urlconf(self):
+        @universal_view_decorator(legacy_decorator)
+        class ViewClass(View):
+            pass
+
+        wrapped_view = universal_view_decorator(legacy_decorator_2)(ViewClass.as_view())
+        view_description = describe_view(wrapped_view)
+        self.assertIs(view_description.view_class, ViewClass)
+        self.assertListEqual([chain.name for chain in view_description.chains], ['class'])
+
+        # The view class can't be found if a decorator doesn't copy the view_class attribute.
+        view_description = describe_view(non_wrapping_decorator(ViewClass.as_view()))
+        self.assertIsNone(view_description.view_class)
+        self.assertListEqual(view_description.chains, [])
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestBenchmarkView(TestCase):
+    def test_view_function_is_not_called(self, mock_test_log):
+        view_function_mock = mock.Mock()
+        view_function = universal_view_decorator(legacy_decorator)(lambda request: view_function_mock())
+
+        overheads = benchmark_view(describe_view(view_function), 'request', number=10)
+        self.assertListEqual(list(overheads), ['view function'])
+        view_function_mock.assert_not_called()
+        # 3 repeats
+        self.assertEqual(mock_test_log.call_count, 30)
+
+    def test_view_class(self, mock_test_log):
+        get_mock = mock.Mock()
+
+        @universal_view_decorator(legacy_decorator)
+        class ViewClass(View):
+            @universal_view_decorator(legacy_decorator)
+            def get(self, request):
+                get_mock()
+
+        overheads = benchmark_view(describe_view(ViewClass.as_view()), 'request', number=10)
+        self.assertListEqual(list(overheads), ['class', 'get'])
+        get_mock.assert_not_called()
+        self.assertEqual(mock_test_log.call_count, 60)
+
+
+class TestViewDecoratorChainsCommand(TestCase):
+    def call_command(self, *args, **kwargs):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('view_decorator_chains', *args, stdout=stdout, stderr=stderr, **kwargs)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_root_urlconf(self):
+        stdout, _ = self.call_command(filter='view_subclass2')
+        # tests.test_app.decorators.increase_integer_view_arg.<locals>.decorator under python 3
+        decorator_name = full_qualname(increase_integer_view_arg())
+        self.assertEqual(stdout, '\n'.join([
+            r'^view_subclass2/(?P<number>\d{1,5})/$ [view_subclass2] -> tests.test_app.views.ViewSubclass2 '
+            r'(5 frames)',
+            '    class (5 frames):',
+            '        tests.test_app.decorators._IntegerizeViewArg (from tests.test_app.views.ViewSubclass2)',
+            '        {} (from tests.test_app.views.ViewSubclass2)'.format(decorator_name),
+            '        {} (from tests.test_app.views.ViewSubclass)'.format(decorator_name),
+            '        {} (from tests.test_app.views.ViewClass)'.format(decorator_name),
+            '',
+        ]))
+
+    def test_sort_by_frames(self):
+        stdout, _ = self.call_command(sort='frames')
+        lines = [line for line in stdout.splitlines() if not line.startswith(' ')]
+        self.assertListEqual([line.split(' -> ')[1] for line in lines], [
+            'tests.test_app.views.ViewSubclass (8 frames)',
+            'tests.test_app.views.ViewClass (7 frames)',
+            'tests.test_app.views.ViewSubclass2 (5 frames)',
+            'tests.test_app.views.regular_view_function (4 frames)',
+        ])
+
+    def test_bench(self):
+        stdout, stderr = self.call_command(bench=True, number=10, filter='view_class/')
+        self.assertRegexpMatches(stdout, r'\n    class \(3 frames, -?\d+\.\d\d us/call\):\n')
+        # The class-level chain integerizes the number URL arg of the get() chain.
+        self.assertIn('\n    get (4 frames, bench failed):\n', stdout)
+        self.assertEqual(stderr, 'Benchmarking the get chain of tests.test_app.views.ViewClass failed: '
+                                 'AssertionError()\n')
+
+    def test_sort_by_overhead_requires_bench(self):
+        self.assertRaisesRegexp(CommandError, '--bench', self.call_command, sort='overhead')
@@ -1,6 +1,8 @@
 import functools
+import threading
+
 import mock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.views.generic import View
 
 from django_universal_view_decorator.decorators.view_routine_decorator import view_routine_decorator
@@ -135,3 +137,198 @@ class TestStackedDecoration(TestCase):
             mock.call('decorator', 4),
             mock.call('dispatch', 'request'),
         ])
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestDecoratorChainComposition(TestCase):
+    """ The chain of wrapped decorators is composed only once per decoration (in case of view class methods only with
+    the `UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE` setting) unless one of the decorators opts out by
+    having a `decorator_compose_per_call` attribute with a True value. """
+
+    def test_regular_view_function_chain_is_composed_once(self, mock_test_log):
+        decorator_1 = decorator(1)
+
+        @view_routine_decorator(decorator_1)
+        def view_function(request, *args, **kwargs):
+            test_log('view_function', request, *args, **kwargs)
+            return 'response'
+
+        with mock.patch.object(Decorator, '__call__', autospec=True, side_effect=Decorator.__call__) as mock_call:
+            self.assertEqual(view_function('request_0'), 'response')
+            self.assertEqual(view_function('request_1'), 'response')
+            mock_call.assert_called_once_with(decorator_1, mock.ANY)
+
+        self.assertEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 1),
+            mock.call('view_function', 'request_0'),
+            mock.call('decorator', 1),
+            mock.call('view_function', 'request_1'),
+        ])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_view_class_method_chain_is_composed_once_for_all_instances_and_subclasses(self, mock_test_log):
+        class ViewClass(View):
+            @view_routine_decorator(decorator(1), decorator(2))
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch', type(self), request, *args, **kwargs)
+                return 'response'
+
+        class ViewSubclass(ViewClass):
+            pass
+
+        with mock.patch.object(Decorator, '__call__', autospec=True, side_effect=Decorator.__call__) as mock_call:
+            self.assertEqual(ViewClass.as_view()('request_0'), 'response')
+            self.assertEqual(ViewSubclass.as_view()('request_1'), 'response')
+            self.assertEqual(ViewClass.as_view()('request_2'), 'response')
+            self.assertEqual(mock_call.call_count, 2)
+
+        self.assertEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 1),
+            mock.call('decorator', 2),
+            mock.call('dispatch', ViewClass, 'request_0'),
+            mock.call('decorator', 1),
+            mock.call('decorator', 2),
+            mock.call('dispatch', ViewSubclass, 'request_1'),
+            mock.call('decorator', 1),
+            mock.call('decorator', 2),
+            mock.call('dispatch', ViewClass, 'request_2'),
+        ])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_view_class_method_called_recursively_through_the_composed_chain(self, mock_test_log):
+        class ViewClass(View):
+            def __init__(self, depth=0, **kwargs):
+                super(ViewClass, self).__init__(**kwargs)
+                self.depth = depth
+
+            @view_routine_decorator(decorator(1))
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch', self.depth, request)
+                if self.depth < 2:
+                    ViewClass(depth=self.depth + 1).dispatch(request)
+                test_log('dispatch_end', self.depth)
+                return 'response'
+
+        self.assertEqual(ViewClass.as_view()('request'), 'response')
+        self.assertEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 1),
+            mock.call('dispatch', 0, 'request'),
+            mock.call('decorator', 1),
+            mock.call('dispatch', 1, 'request'),
+            mock.call('decorator', 1),
+            mock.call('dispatch', 2, 'request'),
+            mock.call('dispatch_end', 2),
+            mock.call('dispatch_end', 1),
+            mock.call('dispatch_end', 0),
+        ])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_decorator_can_opt_out_and_get_composed_per_call(self, mock_test_log):
+        decorator_1 = decorator(1)
+        decorator_1.decorator_compose_per_call = True
+
+        class ViewClass(View):
+            @view_routine_decorator(decorator(0), decorator_1)
+            def dispatch(self, request, *args, **kwargs):
+                test_log('dispatch', request)
+                return 'response'
+
+        with mock.patch.object(Decorator, '__call__', autospec=True, side_effect=Decorator.__call__) as mock_call:
+            self.assertEqual(ViewClass.as_view()('request_0'), 'response')
+            self.assertEqual(ViewClass.as_view()('request_1'), 'response')
+            self.assertEqual(mock_call.call_count, 4)
+
+        self.assertEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 0),
+            mock.call('decorator', 1),
+            mock.call('dispatch', 'request_0'),
+            mock.call('decorator', 0),
+            mock.call('decorator', 1),
+            mock.call('dispatch', 'request_1'),
+        ])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_chain_of_a_decoration_isnt_reused_by_a_decoration_that_wraps_it(self, mock_test_log):
+        def dispatch(self, request, *args, **kwargs):
+            test_log('dispatch', request)
+            return 'response'
+
+        inner = view_routine_decorator(decorator(2))(dispatch)
+
+        class ViewClass(View):
+            pass
+
+        # calling the inner decoration composes and caches its chain
+        self.assertEqual(inner.__get__(ViewClass(), ViewClass)('request_0'), 'response')
+        ViewClass.dispatch = view_routine_decorator(decorator(1))(inner)
+        self.assertEqual(ViewClass.as_view()('request_1'), 'response')
+
+        self.assertEqual(mock_test_log.mock_calls, [
+            mock.call('decorator', 2),
+            mock.call('dispatch', 'request_0'),
+            mock.call('decorator', 1),
+            mock.call('decorator', 2),
+            mock.call('dispatch', 'request_1'),
+        ])
+
+    def test_view_class_method_chain_is_composed_around_the_bound_method_by_default(self, mock_test_log):
+        received = []
+
+        def receiving_decorator(wrapped):
+            received.append(wrapped)
+            return wrapped
+
+        class ViewClass(View):
+            @view_routine_decorator(decorator(1), receiving_decorator)
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        view_class_instance = ViewClass()
+        self.assertEqual(view_class_instance.dispatch('request_0'), 'response')
+        self.assertEqual(view_class_instance.dispatch('request_1'), 'response')
+        self.assertEqual(len(received), 2)
+        self.assertIs(received[0].__self__, view_class_instance)
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call('decorator', 1)] * 2)
+
+
+def call_on_another_thread(wrapped):
+    """ A decorator that calls the view on another thread (e.g.: to enforce a timeout). """
+    @functools.wraps(wrapped)
+    def wrapper(*args, **kwargs):
+        outcome = {}
+
+        def target():
+            try:
+                outcome['response'] = wrapped(*args, **kwargs)
+            except Exception as ex:
+                outcome['exception'] = ex
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        if 'exception' in outcome:
+            raise outcome['exception']
+        return outcome['response']
+    return wrapper
+
+
+class TestViewClassMethodCalledOnAnotherThread(TestCase):
+    def test_decorator_calls_the_view_class_method_on_another_thread(self):
+        class ViewClass(View):
+            @view_routine_decorator(call_on_another_thread)
+            def dispatch(self, request, *args, **kwargs):
+                return self, threading.current_thread()
+
+        view_class_instance, thread = ViewClass.as_view()('request')
+        self.assertIsInstance(view_class_instance, ViewClass)
+        self.assertIsNot(thread, threading.current_thread())
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_composed_chain_fails_when_the_decorator_calls_the_view_class_method_on_another_thread(self):
+        class ViewClass(View):
+            @view_routine_decorator(call_on_another_thread)
+            def dispatch(self, request, *args, **kwargs):
+                return 'response'
+
+        self.assertRaisesRegexp(RuntimeError, 'has been called outside of the context of the request .*'
+                                              'UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE',
+                                ViewClass.as_view(), 'request')
@@ -0,0 +1,234 @@
+import gc
+import os
+
+import mock
+from django.conf.urls import include, url
+from django.test import RequestFactory, TestCase, override_settings
+from django.views.generic import View
+
+import django_universal_view_decorator
+from django_universal_view_decorator import ViewDecoratorBase, universal_view_decorator
+from django_universal_view_decorator.decorators.view_routine_decorator import ViewRoutineDecorator
+from django_universal_view_decorator.warm_up import freeze, warm_up, warm_up_if_enabled
+
+
+def test_log(*args, **kwargs):
+    pass
+
+
+# Test decorators
+
+
+def legacy_decorator(wrapped):
+    def wrapper(*args, **kwargs):
+        test_log(legacy_decorator)
+        return wrapped(*args, **kwargs)
+    return wrapper
+
+
+class MyViewDecorator(ViewDecoratorBase):
+    pass
+
+
+class URLConf(object):
+    def __init__(self, *urlpatterns):
+        super(URLConf, self).__init__()
+        self.urlpatterns = list(urlpatterns)
+
+
+# Tests
+
+
+@mock.patch(__name__ + '.test_log', wraps=test_log)
+class TestWarmUp(TestCase):
+    def test_view_function(self, mock_test_log):
+        @universal_view_decorator(legacy_decorator)
+        def view_function(request):
+            return 'response'
+
+        result = warm_up(URLConf(url(r'^view_function/$', view_function)))
+        self.assertEqual((result.num_views, result.num_chains), (1, 1))
+        self.assertIn('composed_view_function', view_function.__dict__)
+
+        with mock.patch.object(ViewRoutineDecorator, '_compose') as mock_compose:
+            self.assertEqual(view_function('request'), 'response')
+            mock_compose.assert_not_called()
+        self.assertListEqual(mock_test_log.mock_calls, [mock.call(legacy_decorator)])
+
+    def test_stacked_view_function_decorations(self, mock_test_log):
+        @MyViewDecorator.universal_decorator
+        @universal_view_decorator(legacy_decorator)
+        @MyViewDecorator.universal_decorator
+        @universal_view_decorator(legacy_decorator)
+        def view_function(request):
+            return 'response'
+
+        self.assertEqual(warm_up(URLConf(url(r'^view_function/$', view_function))).num_chains, 2)
+        with mock.patch.object(ViewRoutineDecorator, '_compose') as mock_compose:
+            self.assertEqual(view_function('request'), 'response')
+            mock_compose.assert_not_called()
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_view_class_method(self, mock_test_log):
+        class ViewClass(View):
+            @universal_view_decorator(legacy_decorator)
+            def get(self, request):
+                return 'response'
+
+        class ViewSubclass(ViewClass):
+            pass
+
+        result = warm_up(URLConf(
+            url(r'^view_class/$', ViewClass.as_view()),
+            url(r'^view_subclass/$', ViewSubclass.as_view()),
+        ))
+        self.assertEqual((result.num_views, result.num_chains), (2, 1))
+
+        with mock.patch.object(ViewRoutineDecorator, '_compose') as mock_compose:
+            self.assertEqual(ViewSubclass.as_view()(mock.Mock(method='GET')), 'response')
+            mock_compose.assert_not_called()
+
+    def test_view_class_method_chains_are_composed_per_request_by_default(self, mock_test_log):
+        class ViewClass(View):
+            @universal_view_decorator(legacy_decorator)
+            def get(self, request):
+                return 'response'
+
+        self.assertEqual(warm_up(URLConf(url(r'^view_class/$', ViewClass.as_view()))).num_chains, 0)
+        self.assertNotIn('composed_view_method', ViewClass.__dict__['get'].__dict__)
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    def test_view_wrapped_by_urlconf_decorators(self, mock_test_log):
+        @universal_view_decorator(legacy_decorator)
+        def view_function(request):
+            return 'response'
+
+        class ViewClass(View):
+            @universal_view_decorator(legacy_decorator)
+            def get(self, request):
+                return 'response'
+
+        def urlconf_decorator(wrapped):
+            def wrapper(*args, **kwargs):
+                return wrapped(*args, **kwargs)
+            wrapper.__wrapped__ = wrapped
+            return wrapper
+
+        result = warm_up(URLConf(
+            url(r'^view_function/$', urlconf_decorator(view_function)),
+            url(r'^view_class/$', urlconf_decorator(ViewClass.as_view())),
+        ))
+        self.assertEqual((result.num_views, result.num_chains), (2, 2))
+
+    def test_lazily_decorated_view_class_in_included_urlconf(self, mock_test_log):
+        with override_settings(UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=True):
+            @universal_view_decorator(legacy_decorator)
+            class ViewClass(View):
+                def get(self, request):
+                    return 'response'
+
+        # Creating the view function with `View.as_view()` skips the resolution of the lazy decoration.
+        view_function = View.as_view.__func__(ViewClass)
+        self.assertIn('_pending_view_class_decorators', ViewClass.__dict__)
+
+        result = warm_up(URLConf(url(r'^included/', include([url(r'^view_class/$', view_function)]))))
+        self.assertEqual((result.num_views, result.num_chains), (1, 1))
+        self.assertNotIn('_pending_view_class_decorators', ViewClass.__dict__)
+        self.assertIn('_decorated_as_view_cache', ViewClass.__dict__)
+
+    def test_repeated_warm_up_has_nothing_to_do(self, mock_test_log):
+        @universal_view_decorator(legacy_decorator)
+        def view_function(request):
+            return 'response'
+
+        urlconf = URLConf(url(r'^view_function/$', view_function), url(r'^view_function_2/$', view_function))
+        self.assertEqual(warm_up(urlconf).num_chains, 1)
+        result = warm_up(urlconf)
+        self.assertEqual((result.num_views, result.num_chains), (2, 0))
+        self.assertGreaterEqual(result.duration, 0)
+
+    def test_root_urlconf(self, mock_test_log):
+        self.assertEqual(warm_up().num_views, 4)
+
+
+class TestWarmUpIfEnabled(TestCase):
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_WARM_UP=True)
+    def test_enabled(self):
+        self.assertEqual(warm_up_if_enabled().num_views, 4)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(warm_up_if_enabled())
+
+
+class TestFreeze(TestCase):
+    def _get_library_allocations(self, prepare, function):
+        """ Returns the statistics of the library modules that have more allocated memory after the call of function
+        than before (the net growth: the objects function allocates and frees aren't included). Tracing starts before
+        calling prepare so the memory freed by function is traced too. """
+        try:
+            import tracemalloc
+        except ImportError:
+            self.skipTest('tracemalloc is available only under python 3.4+')
+        library_dir = os.path.dirname(django_universal_view_decorator.__file__)
+        library_filter = tracemalloc.Filter(True, os.path.join(library_dir, '*'))
+        tracemalloc.start()
+        try:
+            prepare()
+            # A full collection clears the free lists that would keep the memory of freed objects traced.
+            gc.collect()
+            snapshot_before = tracemalloc.take_snapshot().filter_traces([library_filter])
+            function()
+            gc.collect()
+            snapshot_after = tracemalloc.take_snapshot().filter_traces([library_filter])
+        finally:
+            tracemalloc.stop()
+        return [stat for stat in snapshot_after.compare_to(snapshot_before, 'filename') if stat.size_diff > 0]
+
+    def _create_views(self):
+        @MyViewDecorator.universal_decorator
+        @universal_view_decorator(legacy_decorator)
+        def view_function(request):
+            return 'response'
+
+        @universal_view_decorator(legacy_decorator)
+        class ViewClass(View):
+            @universal_view_decorator(legacy_decorator)
+            @MyViewDecorator.universal_decorator
+            def get(self, request):
+                return 'response'
+
+        return view_function, ViewClass.as_view()
+
+    def _serve_requests(self, views):
+        request = RequestFactory().get('/')
+        for view in views:
+            self.assertEqual(view(request), 'response')
+
+    @mock.patch('gc.freeze', create=True)
+    def test_serving_requests_after_freeze_causes_no_net_growth_in_the_library(self, mock_gc_freeze):
+        views = self._create_views()
+        urlconf = URLConf(*[url(r'^{}/$'.format(index), view) for index, view in enumerate(views)])
+        self.assertListEqual(self._get_library_allocations(lambda: freeze(urlconf),
+                                                           lambda: self._serve_requests(views)), [])
+
+    def test_serving_requests_without_freeze_causes_net_growth_in_the_library(self):
+        views = self._create_views()
+        self.assertNotEqual(self._get_library_allocations(lambda: None, lambda: self._serve_requests(views)), [])
+
+    @override_settings(UNIVERSAL_VIEW_DECORATOR_COMPOSE_VIEW_METHOD_CHAINS_ONCE=True)
+    @mock.patch('gc.freeze', create=True)
+    def test_decorated_view_classes_outside_of_the_urlconf_are_finalized(self, mock_gc_freeze):
+        with override_settings(UNIVERSAL_VIEW_DECORATOR_LAZY_CLASS_DECORATION=True):
+            @universal_view_decorator(legacy_decorator)
+            class ViewClass(View):
+                @universal_view_decorator(legacy_decorator)
+                def get(self, request):
+                    return 'response'
+
+        result = freeze(URLConf())
+        self.assertEqual(result.num_views, 0)
+        self.assertGreaterEqual(result.num_chains, 2)
+        self.assertNotIn('_pending_view_class_decorators', ViewClass.__dict__)
+        self.assertIn('_decorated_as_view_cache', ViewClass.__dict__)
+        self.assertIn('composed_view_method', ViewClass.__dict__['get'].__dict__)
+        mock_gc_freeze.assert_called_once_with()
@@ -0,0 +1,41 @@
+""" Helpers of the tests that measure the time of the decorator layers (instrumentation, tracing, latency budgets).
+The tests patch the timer of the measured module with `clock`. """
+import functools
+
+from django_universal_view_decorator import ViewDecoratorBase
+
+
+class Clock(object):
+    """ A fake timer: the decorators and views of the tests advance it. """
+    def __init__(self):
+        super(Clock, self).__init__()
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+
+clock = Clock()
+
+
+def slow_decorator(seconds):
+    """ Returns a decorator that advances the clock by `seconds` before calling the view. The name of the decorator
+    (and of its layer) contains `seconds`. """
+    def decorator(wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            clock.advance(seconds)
+            return wrapped(*args, **kwargs)
+        return wrapper
+    decorator.__name__ = 'slow_decorator_{}'.format(seconds)
+    decorator.__qualname__ = decorator.__name__
+    return decorator
+
+
+class SlowViewDecorator(ViewDecoratorBase):
+    def _call_view_function(self, decoration_instance, view_class_instance, view_function, *args, **kwargs):
+        clock.advance(8)
+        return view_function(*args, **kwargs)
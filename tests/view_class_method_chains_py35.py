@@ -0,0 +1,41 @@
+import functools
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator
+from django_universal_view_decorator.five import iscoroutinefunction
+
+from .async_utils import run
+
+
+def call_view(view, method):
+    return view(getattr(RequestFactory(), method)('/'))
+
+
+class TestAsyncMethodChains(TestCase):
+    def test_async_view_class(self):
+        calls = []
+
+        def async_decorator(wrapped):
+            @functools.wraps(wrapped)
+            async def wrapper(*args, **kwargs):
+                calls.append('decorator')
+                return await wrapped(*args, **kwargs)
+            return wrapper
+
+        @universal_view_decorator(async_decorator, methods=('post',))
+        class AsyncViewClass(View):
+            async def get(self, request):
+                return HttpResponse()
+
+            async def post(self, request):
+                return HttpResponse()
+
+        view = AsyncViewClass.as_view()
+        self.assertTrue(iscoroutinefunction(view))
+        run(call_view(view, 'get'))
+        self.assertListEqual(calls, [])
+        run(call_view(view, 'post'))
+        self.assertListEqual(calls, ['decorator'])
@@ -0,0 +1,37 @@
+import functools
+
+import mock
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.views.generic import View
+
+from django_universal_view_decorator import universal_view_decorator
+
+from .async_utils import run
+
+
+def call_view(view, method):
+    return view(getattr(RequestFactory(), method)('/path/'))
+
+
+@mock.patch('django_universal_view_decorator.decorators.view_class_decorator.django_request_logger')
+class TestAsyncRejectDisallowedMethods(TestCase):
+    def test_async_view_class(self, mock_logger):
+        calls = []
+
+        def decorator(wrapped):
+            @functools.wraps(wrapped)
+            def wrapper(*args, **kwargs):
+                calls.append('decorator')
+                return wrapped(*args, **kwargs)
+            return wrapper
+
+        @universal_view_decorator(decorator, reject_disallowed_methods=True)
+        class AsyncViewClass(View):
+            async def get(self, request):
+                return HttpResponse()
+
+        view = AsyncViewClass.as_view()
+        self.assertEqual(run(call_view(view, 'post')).status_code, 405)
+        self.assertEqual(run(call_view(view, 'get')).status_code, 200)
+        self.assertListEqual(calls, ['decorator'])